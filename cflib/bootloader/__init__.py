@@ -25,12 +25,14 @@
 """
 Bootloading utilities for the Crazyflie.
 """
+import hashlib
 import json
 import logging
 import sys
 import time
 import zipfile
 from collections import namedtuple
+from contextlib import contextmanager
 from typing import Callable
 from typing import List
 from typing import NoReturn
@@ -60,14 +62,36 @@ FlashArtifact = namedtuple('FlashArtifact', ['content', 'target', 'release'])
 class Bootloader:
     """Bootloader utility for the Crazyflie"""
 
-    def __init__(self, clink=None):
+    # Number of times a deck upload is resumed after a failure
+    DECK_UPLOAD_RETRIES = 3
+
+    # Phases of flashing, used as keys in phase_timings
+    PHASE_RESET = 'reset'
+    PHASE_WRITE = 'write'
+    PHASE_VERIFY = 'verify'
+    PHASE_DECKS = 'decks'
+
+    # First page of each sector of the STM32F405 flash, in 1 kB pages. A
+    # sector is erased when a write starts at its first page.
+    STM32F405_SECTOR_PAGES = (0, 16, 32, 48, 64, 128, 256, 384, 512, 640, 768, 896)
+
+    # Validity token of flash manifests, change if the format changes
+    MANIFEST_VERSION = b'\x02'
+
+    def __init__(self, clink=None, cache=None):
         """Init the communication class by starting to communicate with the
         link given. clink is the link address used after resetting to the
         bootloader.
 
         The device is actually considered in firmware mode.
+
+        cache is a MemoryCache where a manifest of the page hashes of the
+        last image flashed to each Crazyflie is kept, it is used by
+        incremental flashing to find the changed pages without reading back
+        the flash.
         """
         self.clink = clink
+        self._cache = cache
         self.in_loader = False
 
         self.page_size = 0
@@ -80,6 +104,12 @@ class Bootloader:
 
         self.warm_booted = False
 
+        # Seconds spent in each completed phase of the last flash_full()
+        self.phase_timings = {}
+        # True when the MCU firmware of the last flash_full() has been
+        # written, and verified if asked to
+        self.firmware_flashed = False
+
         # Outgoing callbacks for progress and flash termination
         self.progress_cb = None  # type: Optional[Callable[[str, int], None]]
         self.error_cb = None  # type: Optional[Callable[[str], None]]
@@ -214,20 +244,25 @@ class Bootloader:
         return any(deck.name in ['bcAI:gap8', 'bcAI:esp'] for deck in decks.values())
 
     def flash(self, filename: str, targets: List[Target], cf=None, enable_console_log: Optional[bool] = False,
-              boot_delay: Optional[float] = 0.0):
+              boot_delay: Optional[float] = 0.0, artifacts: Optional[List[FlashArtifact]] = None,
+              verify: bool = False, incremental: bool = False):
+        """
+        Flash .zip or bin .file to list of targets.
+
+        Artifacts that are already parsed with get_flash_artifacts() can be
+        passed in, filename is then not read. If verify is set the flash is
+        read back and compared to the images after writing. If incremental
+        is set only the pages that differ from the current flash are
+        written, and then verified.
+        """
         # Separate flash targets from decks
         platform = self._get_platform_id()
         flash_targets = [t for t in targets if t.platform == platform]
         deck_targets = [t for t in targets if t.platform == 'deck']
 
         # Fetch artifacts from source file
-        artifacts = self._get_flash_artifacts_from_zip(filename)
-        if len(artifacts) == 0:
-            if len(targets) == 1:
-                content = open(filename, 'br').read()
-                artifacts = [FlashArtifact(content, targets[0], None)]
-            else:
-                raise (Exception('Cannot flash a .bin to more than one target!'))
+        if artifacts is None:
+            artifacts = self.get_flash_artifacts(filename, targets)
 
         # Separate artifacts for flash and decks
         flash_artifacts = [a for a in artifacts if a.target.platform == platform]
@@ -266,6 +301,45 @@ class Bootloader:
             should_flash_nrf_sd = False
 
         if should_flash_nrf_sd:
+            self._flash_nrf51_sd(flash_artifacts)
+        else:
+            print('No need to flash nRF soft device')
+
+        # Remove the softdevice+bootloader from the list of artifacts to flash
+        flash_artifacts = [a for a in flash_artifacts if a.target.type !=
+                           'bootloader+softdevice']  # Also filter for nRF51 here?
+
+        # Flash the MCU flash
+        if len(targets) == 0 or len(flash_targets) > 0:
+            with self._timed(self.PHASE_WRITE):
+                self._flash_flash(flash_artifacts, flash_targets, incremental=incremental)
+            if verify:
+                with self._timed(self.PHASE_VERIFY):
+                    self._verify_flash(flash_artifacts)
+            self.firmware_flashed = True
+
+        # Flash the decks
+        deck_update_msg = 'Deck update skipped.'
+        if len(targets) == 0 or len(deck_targets) > 0:
+            # only in warm boot
+            if self.warm_booted:
+                with self._timed(self.PHASE_DECKS):
+                    self._flash_decks(deck_artifacts, deck_targets, cf, enable_console_log, boot_delay)
+                deck_update_msg = 'Deck update complete.'
+            else:
+                print('Skipping updating deck on coldboot')
+                deck_update_msg = 'Deck update skipped in ColdBoot mode.'
+
+        if self.progress_cb:
+            self.progress_cb(
+                f'({len(flash_artifacts)}/{len(flash_artifacts)}) Flashing done! {deck_update_msg}',
+                int(100))
+        else:
+            print('')
+
+    def _flash_nrf51_sd(self, flash_artifacts: List[FlashArtifact]):
+        """Flash the nRF51 soft device and bootloader and reconnect to the new bootloader"""
+        with self._timed(self.PHASE_WRITE):
             print('Should flash nRF soft device')
             rf51_sdbl_list = [x for x in flash_artifacts if x.target.type == 'bootloader+softdevice']
             if len(rf51_sdbl_list) != 1:
@@ -292,56 +366,32 @@ class Bootloader:
             print('Reconnected to new bootloader')
             self._cload.check_link_and_get_info()
             self._cload.request_info_update(TargetTypes.NRF51)
-        else:
-            print('No need to flash nRF soft device')
-
-        # Remove the softdevice+bootloader from the list of artifacts to flash
-        flash_artifacts = [a for a in flash_artifacts if a.target.type !=
-                           'bootloader+softdevice']  # Also filter for nRF51 here?
-
-        # Flash the MCU flash
-        if len(targets) == 0 or len(flash_targets) > 0:
-            self._flash_flash(flash_artifacts, flash_targets)
-
-        # Flash the decks
-        deck_update_msg = 'Deck update skipped.'
-        if len(targets) == 0 or len(deck_targets) > 0:
-            # only in warm boot
-            if self.warm_booted:
-                if self.progress_cb:
-                    self.progress_cb('Restarting firmware to update decks.', int(0))
-
-                # Reset to firmware mode
-                self.reset_to_firmware(boot_delay=boot_delay)
-                self.close()
-                time.sleep(2)
-
-                # Flash all decks and reboot after each deck
-                current_index = 0
-                while current_index != -1:
-                    current_index = self._flash_deck_incrementally(deck_artifacts, deck_targets, current_index,
-                                                                   enable_console_log=enable_console_log,
-                                                                   boot_delay=boot_delay)
-                    if self.progress_cb:
-                        self.progress_cb('Deck updated! Restarting...', int(100))
-                    if current_index != -1:
-                        PowerSwitch(self.clink).reboot_to_fw()
-                        time.sleep(5.0 + boot_delay)
-
-                # Put the crazyflie back in Bootloader mode to exit the function in the same state we entered it
-                self.start_bootloader(warm_boot=True, cf=cf)
-
-                deck_update_msg = 'Deck update complete.'
-            else:
-                print('Skipping updating deck on coldboot')
-                deck_update_msg = 'Deck update skipped in ColdBoot mode.'
 
+    def _flash_decks(self, deck_artifacts: List[FlashArtifact], deck_targets: List[Target], cf=None,
+                     enable_console_log: Optional[bool] = False, boot_delay: Optional[float] = 0.0):
+        """Restart the firmware, flash the decks and go back to the bootloader"""
         if self.progress_cb:
-            self.progress_cb(
-                f'({len(flash_artifacts)}/{len(flash_artifacts)}) Flashing done! {deck_update_msg}',
-                int(100))
-        else:
-            print('')
+            self.progress_cb('Restarting firmware to update decks.', int(0))
+
+        # Reset to firmware mode
+        self.reset_to_firmware(boot_delay=boot_delay)
+        self.close()
+        time.sleep(2)
+
+        # Flash all decks and reboot after each deck
+        current_index = 0
+        while current_index != -1:
+            current_index = self._flash_deck_incrementally(deck_artifacts, deck_targets, current_index,
+                                                           enable_console_log=enable_console_log,
+                                                           boot_delay=boot_delay)
+            if self.progress_cb:
+                self.progress_cb('Deck updated! Restarting...', int(100))
+            if current_index != -1:
+                PowerSwitch(self.clink).reboot_to_fw()
+                time.sleep(5.0 + boot_delay)
+
+        # Put the crazyflie back in Bootloader mode to exit the function in the same state we entered it
+        self.start_bootloader(warm_boot=True, cf=cf)
 
     def flash_full(self, cf: Optional[Crazyflie] = None,
                    filename: Optional[str] = None,
@@ -350,11 +400,17 @@ class Bootloader:
                    info_cb: Optional[Callable[[int, TargetTypes], NoReturn]] = None,
                    progress_cb: Optional[Callable[[str, int], NoReturn]] = None,
                    terminate_flash_cb: Optional[Callable[[], bool]] = None,
-                   enable_console_log: Optional[bool] = False):
+                   enable_console_log: Optional[bool] = False,
+                   artifacts: Optional[List[FlashArtifact]] = None,
+                   verify: bool = False,
+                   incremental: bool = False):
         """
         Flash .zip or bin .file to list of targets.
         Reset to firmware when done.
         """
+        self.phase_timings = {}
+        self.firmware_flashed = False
+
         # Get the required boot delay
         boot_delay = self._get_boot_delay(cf=cf)
 
@@ -363,8 +419,9 @@ class Bootloader:
         if terminate_flash_cb is not None:
             self.terminate_flashing_cb = terminate_flash_cb
 
-        if not self.start_bootloader(warm_boot=warm, cf=cf):
-            raise Exception('Could not connect to bootloader')
+        with self._timed(self.PHASE_RESET):
+            if not self.start_bootloader(warm_boot=warm, cf=cf):
+                raise Exception('Could not connect to bootloader')
 
         if info_cb is not None:
             connected = (self.get_target(TargetTypes.STM32),)
@@ -372,11 +429,36 @@ class Bootloader:
                 connected += (self.get_target(TargetTypes.NRF51),)
             info_cb(self.protocol_version, connected)
 
-        if filename is not None:
-            self.flash(filename, targets, cf, enable_console_log=enable_console_log, boot_delay=boot_delay)
-            self.reset_to_firmware(boot_delay=5.0)
+        if filename is not None or artifacts is not None:
+            self.flash(filename, targets, cf, enable_console_log=enable_console_log, boot_delay=boot_delay,
+                       artifacts=artifacts, verify=verify, incremental=incremental)
+            with self._timed(self.PHASE_RESET):
+                self.reset_to_firmware(boot_delay=5.0)
+
+    @contextmanager
+    def _timed(self, phase):
+        """Add the time spent in the block to phase_timings if it completes"""
+        start = time.time()
+        yield
+        self.phase_timings[phase] = self.phase_timings.get(phase, 0.0) + time.time() - start
+
+    @staticmethod
+    def get_flash_artifacts(filename: str, targets: List[Target]) -> List[FlashArtifact]:
+        """
+        Read the artifacts to flash from a .zip or a .bin file. A .bin file
+        can only be flashed to one target.
+        """
+        artifacts = Bootloader._get_flash_artifacts_from_zip(filename)
+        if len(artifacts) == 0:
+            if len(targets) == 1:
+                content = open(filename, 'br').read()
+                artifacts = [FlashArtifact(content, targets[0], None)]
+            else:
+                raise (Exception('Cannot flash a .bin to more than one target!'))
+        return artifacts
 
-    def _get_flash_artifacts_from_zip(self, filename):
+    @staticmethod
+    def _get_flash_artifacts_from_zip(filename):
         if not zipfile.is_zipfile(filename):
             return []
 
@@ -430,9 +512,128 @@ class Bootloader:
 
         return flash_artifacts
 
-    def _flash_flash(self, artifacts: List[FlashArtifact], targets: List[Target]):
+    def _flash_flash(self, artifacts: List[FlashArtifact], targets: List[Target], incremental: bool = False):
         for (i, artifact) in enumerate(artifacts):
-            self._internal_flash(artifact, i + 1, len(artifacts))
+            self._internal_flash(artifact, i + 1, len(artifacts), incremental=incremental)
+
+    def _verify_flash(self, artifacts: List[FlashArtifact]):
+        """Read back the flashed images and compare them to the artifacts"""
+        for artifact in artifacts:
+            t_data = self._cload.targets[TargetTypes.from_string(artifact.target.target)]
+            if self.progress_cb:
+                self.progress_cb('Verifying {}...'.format(TargetTypes.to_string(t_data.id)), 100)
+
+            image = bytes(artifact.content)
+            differing = self._differing_pages(image, t_data, t_data.start_page,
+                                              range(self._page_count(image, t_data)))
+            if differing:
+                raise Exception('Verification of {} failed at page {}'.format(
+                    TargetTypes.to_string(t_data.id), t_data.start_page + differing[0]))
+
+    @staticmethod
+    def _page_count(image, t_data):
+        return int((len(image) - 1) / t_data.page_size) + 1
+
+    def _differing_pages(self, image, t_data, start_page, pages):
+        """Read back pages and return the ones that differ from the image, relative to start_page"""
+        differing = []
+        for i in pages:
+            if self.terminate_flashing_cb and self.terminate_flashing_cb():
+                raise Exception('Flashing terminated')
+
+            expected = image[i * t_data.page_size:(i + 1) * t_data.page_size]
+            actual = self._cload.read_flash(t_data.addr, start_page + i)
+            if actual is None or bytes(actual[:len(expected)]) != expected:
+                differing.append(i)
+        return differing
+
+    def _changed_pages(self, image, t_data, start_page):
+        """
+        The pages of an image that differ from the flash, relative to
+        start_page and extended to whole erase units. The manifest of the
+        last flashed image is used if there is one for the Crazyflie,
+        otherwise the flash is read back.
+
+        :return: The changed pages and the pages to verify after writing
+         them. These are all pages when the manifest was used, as the
+         pages that are not written have not been read back.
+        """
+        page_count = self._page_count(image, t_data)
+
+        manifest = self._fetch_manifest(t_data, start_page, page_count)
+        if manifest is not None:
+            hashes = self._page_hashes(image, t_data)
+            changed = {i for i in range(page_count) if manifest[i * 20:(i + 1) * 20] != hashes[i]}
+        else:
+            changed = set(self._differing_pages(image, t_data, start_page, range(page_count)))
+
+        pages = []
+        for unit in self._erase_units(t_data, start_page, page_count):
+            if any(i in changed for i in unit):
+                pages += unit
+
+        if manifest is not None and pages:
+            return pages, list(range(page_count))
+        return pages, pages
+
+    def _erase_units(self, t_data, start_page, page_count):
+        """
+        Group the pages of an image by the flash unit they are erased with.
+        The sector mapping of the bootloader describes the STM32, the pages
+        of other targets are erased one by one.
+        """
+        sectors = None
+        if t_data.id == TargetTypes.STM32:
+            sectors = self._cload.mapping
+            if sectors is None and t_data.page_size == 1024:
+                sectors = self.STM32F405_SECTOR_PAGES
+
+        units = []
+        for i in range(page_count):
+            if not units or sectors is None or (start_page + i) in sectors:
+                units.append([])
+            units[-1].append(i)
+        return units
+
+    @staticmethod
+    def _page_hashes(image, t_data):
+        return [hashlib.sha1(image[i:i + t_data.page_size]).digest()
+                for i in range(0, len(image), t_data.page_size)]
+
+    def _manifest_key(self, t_data, start_page):
+        return self._cache.make_key('flash', t_data.cpuid, TargetTypes.to_string(t_data.id), start_page)
+
+    def _manifest_token(self, t_data, start_page, page_count):
+        """
+        The first and last pages of the image in flash and its length are
+        used to check that a manifest is still valid. An image flashed by
+        another tool changes the vector table at the start, the end of the
+        code or the length.
+        """
+        hasher = hashlib.sha1(page_count.to_bytes(4, 'little'))
+        for page_number in sorted({start_page, start_page + page_count - 1}):
+            page = self._cload.read_flash(t_data.addr, page_number)
+            if page is None:
+                return None
+            hasher.update(page)
+        return self.MANIFEST_VERSION + hasher.digest()
+
+    def _fetch_manifest(self, t_data, start_page, page_count):
+        """The page hashes of the image last flashed to the Crazyflie, None if unknown"""
+        if self._cache is None or not self._cache.enabled:
+            return None
+        token = self._manifest_token(t_data, start_page, page_count)
+        if token is None:
+            return None
+        return self._cache.fetch(self._manifest_key(t_data, start_page), token)
+
+    def _store_manifest(self, image, t_data, start_page):
+        if self._cache is None or not self._cache.enabled:
+            return
+        token = self._manifest_token(t_data, start_page, self._page_count(image, t_data))
+        if token is not None:
+            self._cache.insert(self._manifest_key(t_data, start_page), token,
+                               b''.join(self._page_hashes(image, t_data)))
 
     def reset_to_firmware(self, boot_delay: float = 0.0) -> bool:
         status = False
@@ -446,12 +647,18 @@ class Bootloader:
 
         return status
 
+    @property
+    def in_bootloader(self) -> bool:
+        """True while the link to the bootloader is open"""
+        return self._cload is not None and self._cload.link is not None
+
     def close(self):
         if self._cload:
             self._cload.close()
             self._cload.link = None
 
-    def _internal_flash(self, artifact: FlashArtifact, current_file_number=1, total_files=1, page_override=None):
+    def _internal_flash(self, artifact: FlashArtifact, current_file_number=1, total_files=1, page_override=None,
+                        incremental=False):
 
         target_info = self._cload.targets[TargetTypes.from_string(artifact.target.target)]
 
@@ -496,9 +703,16 @@ class Bootloader:
                 (len(image) - 1), int(len(image) / t_data.page_size) + 1)))
             sys.stdout.flush()
 
-        # For each page
+        # For each page, or each changed page if flashing incrementally
+        pages = list(range(0, self._page_count(image, t_data)))
+        verify_pages = []
+        if incremental:
+            pages, verify_pages = self._changed_pages(bytes(image), t_data, start_page)
+            factor = 100.0 / len(pages) if pages else 0
+            logger.info('{} of {} pages changed'.format(len(pages), self._page_count(image, t_data)))
+
         ctr = 0  # Buffer counter
-        for i in range(0, int((len(image) - 1) / t_data.page_size) + 1):
+        for (n, i) in enumerate(pages):
             if self.terminate_flashing_cb and self.terminate_flashing_cb():
                 raise Exception('Flashing terminated')
 
@@ -526,8 +740,9 @@ class Bootloader:
                 sys.stdout.write('.')
                 sys.stdout.flush()
 
-            # Flash when the complete buffers are full
-            if ctr >= t_data.buffer_pages:
+            # Flash when the complete buffers are full, or when the next page
+            # does not follow this one
+            if ctr >= t_data.buffer_pages or n + 1 == len(pages) or pages[n + 1] != i + 1:
                 if self.progress_cb:
                     self.progress_cb('{} ({}/{}) Writing buffer to {}...'.format(
                         type_of_binary,
@@ -555,30 +770,25 @@ class Bootloader:
 
                 ctr = 0
 
-        if ctr > 0:
+        if verify_pages:
+            # The pages that were read back and found to be equal before
+            # writing are not verified again
             if self.progress_cb:
-                self.progress_cb('{} ({}/{}) Writing buffer to {}...'.format(
+                self.progress_cb('{} ({}/{}) Verifying {}...'.format(
                     type_of_binary,
                     current_file_number,
                     total_files,
                     TargetTypes.to_string(t_data.id)),
                     int(progress))
-            else:
-                sys.stdout.write('%d' % ctr)
-                sys.stdout.flush()
-            if not self._cload.write_flash(
-                    t_data.addr, 0,
-                    (start_page + (int((len(image) - 1) / t_data.page_size)) -
-                     (ctr - 1)), ctr):
-                if self.progress_cb:
-                    self.progress_cb(
-                        'Error during flash operation (code {})'.format(
-                            self._cload.error_code),
-                        int(progress))
-                else:
-                    print('\nError during flash operation (code %d). Maybe'
-                          ' wrong radio link?' % self._cload.error_code)
-                raise Exception()
+            differing = self._differing_pages(bytes(image), t_data, start_page, verify_pages)
+            if differing:
+                if self._cache is not None:
+                    self._cache.invalidate(self._manifest_key(t_data, start_page))
+                raise Exception('Verification of {} failed at page {}'.format(
+                    TargetTypes.to_string(t_data.id), start_page + differing[0]))
+
+        if page_override is None:
+            self._store_manifest(bytes(image), t_data, start_page)
 
         sys.stdout.write('\n')
         sys.stdout.flush()
@@ -597,6 +807,17 @@ class Bootloader:
         # Crazyflie at appropriate places.
         print(text, end='')
 
+    def _requery_deck(self, scf, deck_index):
+        """Reconnect if the link is lost and get a new DeckMemory for the deck, None on failure"""
+        try:
+            if not scf.is_link_open():
+                scf.open_link()
+            deck_mems = scf.cf.mem.get_mems(MemoryElement.TYPE_DECK_MEMORY)
+            return deck_memory.SyncDeckMemoryManager(deck_mems[0]).query_decks().get(deck_index)
+        except Exception as e:
+            logger.warning(f'Failed to reconnect to deck: {str(e)}')
+            return None
+
     def _flash_deck_incrementally(self, artifacts: List[FlashArtifact], targets: List[Target], start_index: int,
                                   enable_console_log: Optional[bool] = False, boot_delay=0.0):
         flash_all_targets = len(targets) == 0
@@ -695,9 +916,19 @@ class Bootloader:
                         frame = frames[int(percent) % 4]
                         print(f'{frame} {percent}% {msg}')
 
-                # Flash the new firmware
+                # Flash the new firmware, resume from the last acknowledged block on failures
                 deck.set_fw_new_flash_size(len(deck_artifact.content))
-                result = deck.write_sync(0, deck_artifact.content, progress_cb)
+                upload = deck_memory.DeckUpload(0, deck_artifact.content)
+                result = upload.write_sync(deck, progress_cb)
+                for _ in range(self.DECK_UPLOAD_RETRIES):
+                    if result:
+                        break
+                    logger.warning(f'Deck {deck.name} upload failed at 0x{upload.offset:X}, resuming')
+                    deck = self._requery_deck(scf, deck_index)
+                    if deck is None or not deck.is_bootloader_active:
+                        break
+                    result = upload.write_sync(deck, progress_cb)
+
                 if result:
                     if self.progress_cb:
                         self.progress_cb(f'Deck {deck.name} updated successful!', 100)
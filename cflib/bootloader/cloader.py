@@ -27,9 +27,9 @@ Crazyflie radio bootloader for flashing firmware.
 """
 import binascii
 import logging
-import math
 import struct
 import time
+from collections import deque
 
 import cflib.crtp
 from .boottypes import Target
@@ -42,9 +42,18 @@ __all__ = ['Cloader']
 logger = logging.getLogger(__name__)
 
 
+class _NoAnswer(Exception):
+    """A bootloader request was not answered after all retries"""
+
+
 class Cloader:
     """Bootloader utility for the Crazyflie"""
 
+    # Max number of requests sent to the bootloader before waiting for replies
+    DEFAULT_WINDOW_SIZE = 8
+    # Number of data bytes in flash and buffer packets
+    DATA_PER_PACKET = 25
+
     def __init__(self, link, info_cb=None, in_boot_cb=None):
         """Init the communication class by starting to communicate with the
         link given. clink is the link address used after resetting to the
@@ -67,6 +76,8 @@ class Cloader:
         self._info_cb = info_cb
         self._in_boot_cb = in_boot_cb
 
+        self.window_size = self.DEFAULT_WINDOW_SIZE
+
         self.targets = {}
         self.mapping = None
         self._available_boot_uri = ('radio://0/110/2M/E7E7E7E7E7', 'radio://0/0/2M/E7E7E7E7E7')
@@ -110,8 +121,13 @@ class Cloader:
                 self.link.send_packet(pk)
                 time.sleep(0.5)
 
+                # Stay on the Crazyradio that was used to reach the firmware
+                devid = '0'
+                if self.link.uri.startswith('radio://'):
+                    devid = self.link.uri.split('/')[2]
+
                 self.link.close()
-                self.link = cflib.crtp.get_link_driver(f'radio://0/0/2M/{address}?safelink=0')
+                self.link = cflib.crtp.get_link_driver(f'radio://{devid}/0/2M/{address}?safelink=0')
                 time.sleep(0.5)
                 return True
         self.link.close()
@@ -250,93 +266,127 @@ class Cloader:
 
     def upload_buffer(self, target_id, page, address, buff):
         """Upload data into a buffer on the Crazyflie"""
-        # print len(buff)
-        count = 0
-        pk = CRTPPacket()
-        pk.set_header(0xFF, 0xFF)
-        pk.data = struct.pack('=BBHH', target_id, 0x14, page, address)
-
-        for i in range(0, len(buff)):
-            pk.data.append(buff[i])
-
-            count += 1
-
-            if count > 24:
-                self.link.send_packet(pk)
-                count = 0
-                pk = CRTPPacket()
-                pk.set_header(0xFF, 0xFF)
-                pk.data = struct.pack('=BBHH', target_id, 0x14, page,
-                                      i + address + 1)
-
-        self.link.send_packet(pk)
+        # The buffer load command is not answered, the packets are acked by
+        # the radio and are sent back to back.
+        for offset in range(0, max(len(buff), 1), self.DATA_PER_PACKET):
+            pk = CRTPPacket()
+            pk.set_header(0xFF, 0xFF)
+            pk.data = struct.pack('=BBHH', target_id, 0x14, page, address + offset) + \
+                bytes(buff[offset:offset + self.DATA_PER_PACKET])
+            self.link.send_packet(pk)
 
     def read_flash(self, addr=0xFF, page=0x00):
         """Read back a flash page from the Crazyflie and return it"""
-        buff = bytearray()
-
         page_size = self.targets[addr].page_size
 
-        for i in range(0, int(math.ceil(page_size / 25.0))):
-            pk = None
-            retry_counter = 5
-            while ((not pk or pk.header != 0xFF or
-                    struct.unpack('<BBHH', pk.data[0:6]) != (addr, 0x1C, page, (i * 25))) and
-                    retry_counter >= 0):
-                pk = CRTPPacket()
-                pk.set_header(0xFF, 0xFF)
-                pk.data = struct.pack('<BBHH', addr, 0x1C, page, (i * 25))
-                self.link.send_packet(pk)
+        requests = []
+        for offset in range(0, page_size, self.DATA_PER_PACKET):
+            pk = CRTPPacket()
+            pk.set_header(0xFF, 0xFF)
+            pk.data = struct.pack('<BBHH', addr, 0x1C, page, offset)
+            requests.append((bytes(pk.data), pk))
 
-                pk = self.link.receive_packet(1)
-                retry_counter -= 1
-            if (retry_counter < 0):
-                return None
-            else:
-                buff += pk.data[6:]
+        try:
+            replies = self._transact(requests, timeout=1, window_size=self.window_size)
+        except _NoAnswer as e:
+            logger.warning('Could not read page {}: {}'.format(page, e))
+            return None
+
+        buff = bytearray()
+        for key, pk in requests:
+            buff += replies[key].data[6:]
 
         # For some reason we get one byte extra here...
         return buff[0:page_size]
 
     def write_flash(self, addr, page_buffer, target_page, page_count):
         """Initiate flashing of data in the buffer to flash."""
-        # print "Write page", flashPage
-        # print "Writing page [%d] and [%d] forward" % (flashPage, nPage)
-        pk = None
-
         # Flushing downlink ...
         pk = self.link.receive_packet(0)
         while pk is not None:
             pk = self.link.receive_packet(0)
 
-        retry_counter = 5
-        # print "Flasing to 0x{:X}".format(addr)
-        while ((not pk or pk.header != 0xFF or len(pk.data) < 2 or
-                struct.unpack('<BB', pk.data[0:2]) != (addr, 0x18)) and
-               retry_counter >= 0):
-            pk = CRTPPacket()
-            pk.set_header(0xFF, 0xFF)
-            pk.data = struct.pack('<BBHHH', addr, 0x18, page_buffer,
-                                  target_page, page_count)
-            self.link.send_packet(pk)
-
-            # Timeout for writing to flash is raised from 1s (used elsewhere
-            # in this module) to 2.5s because it may take more than a second
-            # to erase a page on the STM32F405.
-            #
-            # See https://github.com/bitcraze/crazyflie-lib-python/issues/98
-            # for more details.
-            pk = self.link.receive_packet(2.5)
-            retry_counter -= 1
-
-        if retry_counter < 0:
+        pk = CRTPPacket()
+        pk.set_header(0xFF, 0xFF)
+        pk.data = struct.pack('<BBHHH', addr, 0x18, page_buffer,
+                              target_page, page_count)
+        key = struct.pack('<BB', addr, 0x18)
+
+        # Timeout for writing to flash is raised from 1s (used elsewhere
+        # in this module) to 2.5s because it may take more than a second
+        # to erase a page on the STM32F405.
+        #
+        # See https://github.com/bitcraze/crazyflie-lib-python/issues/98
+        # for more details.
+        try:
+            replies = self._transact([(key, pk)], timeout=2.5)
+        except _NoAnswer as e:
+            logger.warning('Could not write flash: {}'.format(e))
             self.error_code = -1
             return False
 
+        pk = replies[key]
         self.error_code = pk.data[3]
 
         return pk.data[2] == 1
 
+    def _transact(self, requests, timeout, retries=5, window_size=1, total_timeout=None):
+        """
+        Send requests to the bootloader and wait for the replies. Up to
+        window_size requests are outstanding at the same time, replies are
+        matched to requests using the start of the reply data. A request is
+        sent again when it has not been answered within timeout, whatever
+        other packets arrive in the meantime.
+
+        @param requests List of (key, packet) where key is the expected start
+                        of the reply data
+        @param total_timeout Seconds for all requests, by default long
+                             enough to send each of them retries times
+        @return A dictionary of replies keyed by key
+        @raise _NoAnswer if a request was not answered after retries
+               attempts or all of them within total_timeout
+        """
+        if total_timeout is None:
+            total_timeout = timeout * (retries + 1) * len(requests)
+        give_up = time.monotonic() + total_timeout
+
+        pending = deque(requests)
+        # key -> [packet, retries left, deadline]
+        outstanding = {}
+        replies = {}
+
+        while len(pending) > 0 or len(outstanding) > 0:
+            now = time.monotonic()
+            while len(pending) > 0 and len(outstanding) < window_size:
+                key, pk = pending.popleft()
+                outstanding[key] = [pk, retries, now + timeout]
+                self.link.send_packet(pk)
+
+            if now >= give_up:
+                raise _NoAnswer('No answer within {} s'.format(total_timeout))
+            for request in outstanding.values():
+                if request[2] <= now:
+                    if request[1] <= 0:
+                        raise _NoAnswer('No answer after {} retries'.format(retries))
+                    request[1] -= 1
+                    request[2] = now + timeout
+                    self.link.send_packet(request[0])
+
+            wait = min([request[2] for request in outstanding.values()] + [give_up]) - now
+            answer = self.link.receive_packet(max(wait, 0.001))
+            if answer is None:
+                continue
+
+            if answer.header != 0xFF:
+                continue
+            for key in outstanding:
+                if bytes(answer.data[0:len(key)]) == key:
+                    replies[key] = answer
+                    del outstanding[key]
+                    break
+
+        return replies
+
     def decode_cpu_id(self, cpuid):
         """Decode the CPU id into a string"""
         ret = ()
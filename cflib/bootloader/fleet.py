@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+#
+# ,---------,       ____  _ __
+# |  ,-^-,  |      / __ )(_) /_______________ _____  ___
+# | (  O  ) |     / __  / / __/ ___/ ___/ __ `/_  / / _ \
+# | / ,--'  |    / /_/ / / /_/ /__/ /  / /_/ / / /_/  __/
+#    +------`   /_____/_/\__/\___/_/   \__,_/ /___/\___/
+#
+# Copyright (C) 2026 Bitcraze AB
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, in version 3.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+Flashing of many Crazyflies at the same time.
+"""
+import logging
+import time
+from collections import deque
+from collections import namedtuple
+from threading import Lock
+from threading import Thread
+
+from cflib.bootloader import Bootloader
+from cflib.crtp.radiodriver import RadioManager
+
+logger = logging.getLogger(__name__)
+
+# Outcome of flashing one Crazyflie. timings is a `dict` keyed by phase
+# (see Bootloader.PHASE_*) with the seconds spent in the phase over all
+# attempts, elapsed is the time from the start of the fleet flash until the
+# Crazyflie was done and error is the last error, None on success.
+FleetFlashResult = namedtuple('FleetFlashResult',
+                              'success attempts timings elapsed error')
+
+
+class FleetFlashReport(namedtuple('FleetFlashReport', 'results duration')):
+    """
+    Outcome of flashing a fleet. results is a `dict` keyed by URI with
+    FleetFlashResult values and duration is the total time in seconds.
+    """
+
+    PHASES = (Bootloader.PHASE_RESET, Bootloader.PHASE_WRITE,
+              Bootloader.PHASE_VERIFY, Bootloader.PHASE_DECKS)
+
+    @property
+    def success(self):
+        return all(result.success for result in self.results.values())
+
+    @property
+    def failed(self):
+        return sorted(uri for uri, result in self.results.items()
+                      if not result.success)
+
+    def phase_totals(self):
+        """The seconds spent in each phase, summed over all Crazyflies"""
+        totals = dict.fromkeys(self.PHASES, 0.0)
+        for result in self.results.values():
+            for phase, seconds in result.timings.items():
+                totals[phase] = totals.get(phase, 0.0) + seconds
+        return totals
+
+    def summary(self):
+        """A table with the phase timings of each Crazyflie"""
+        columns = ['uri', 'result', 'tries'] + list(self.PHASES) + ['total']
+        rows = []
+        for uri in sorted(self.results):
+            result = self.results[uri]
+            rows.append([uri, 'ok' if result.success else 'FAILED', str(result.attempts)] +
+                        ['{:.1f}'.format(result.timings.get(phase, 0.0)) for phase in self.PHASES] +
+                        ['{:.1f}'.format(result.elapsed)])
+
+        widths = [max(len(row[i]) for row in [columns] + rows) for i in range(len(columns))]
+        lines = ['  '.join(cell.ljust(width) for cell, width in zip(row, widths)).rstrip()
+                 for row in [columns] + rows]
+
+        lines.append('{} of {} Crazyflies flashed in {:.1f} s'.format(
+            len(self.results) - len(self.failed), len(self.results), self.duration))
+        for uri in self.failed:
+            lines.append('{}: {}'.format(uri, self.results[uri].error))
+
+        return '\n'.join(lines)
+
+
+class FleetFlasher:
+    """
+    Flashes the same firmware to many Crazyflies.
+
+    The release file is read once and the Crazyflies are flashed in
+    parallel, one worker thread per Crazyradio. More than one Crazyflie can
+    be flashed at the same time on a Crazyradio, their transfers are then
+    interleaved on the dongle. Links that are not radio links are all
+    flashed in parallel.
+
+    A Crazyflie that fails is retried. If the firmware was already written
+    to it the retry resumes with the decks.
+    """
+
+    DEFAULT_COPTERS_PER_DONGLE = 1
+    DEFAULT_RETRIES = 2
+
+    def __init__(self, filename, targets=None, copters_per_dongle=DEFAULT_COPTERS_PER_DONGLE,
+                 retries=DEFAULT_RETRIES, verify=False, incremental=False, bootloader_factory=Bootloader):
+        """
+        :param filename: The .zip or .bin file to flash
+        :param targets: A list of Target to flash, all targets in the file
+         if empty
+        :param copters_per_dongle: The number of Crazyflies on the same
+         Crazyradio that are flashed at the same time
+        :param retries: The number of times a failed Crazyflie is retried
+        :param verify: Read back and compare the flash after writing it
+        :param incremental: Only write the pages that have changed
+        :param bootloader_factory: Called with a URI to create the
+         Bootloader used for a Crazyflie
+        """
+        self._targets = list(targets) if targets else []
+        self._copters_per_dongle = copters_per_dongle
+        self._retries = retries
+        self._verify = verify
+        self._incremental = incremental
+        self._bootloader_factory = bootloader_factory
+        self._lock = Lock()
+
+        self.artifacts = Bootloader.get_flash_artifacts(filename, self._targets)
+
+    def flash(self, uris, progress_cb=None, completed_cb=None):
+        """
+        Flash the Crazyflies and wait until all of them are done.
+
+        :param uris: The URIs of the Crazyflies, in firmware mode
+        :param progress_cb: Called with (uri, message, percent) from the
+         worker threads
+        :param completed_cb: Called with (uri, FleetFlashResult) when a
+         Crazyflie is done
+        :return: A FleetFlashReport
+        """
+        self._progress_cb = progress_cb
+        self._completed_cb = completed_cb
+        self._results = {}
+        self._start_time = time.time()
+
+        pending = {}
+        for uri in uris:
+            pending.setdefault(RadioManager.dongle_of(uri), deque()).append(uri)
+
+        workers = []
+        for queue in pending.values():
+            for _ in range(min(self._copters_per_dongle, len(queue))):
+                worker = Thread(target=self._work, args=(queue,), daemon=True)
+                worker.start()
+                workers.append(worker)
+
+        for worker in workers:
+            worker.join()
+
+        return FleetFlashReport(dict(self._results), time.time() - self._start_time)
+
+    def _work(self, queue):
+        """Flash Crazyflies from a dongle queue until it is empty"""
+        while True:
+            with self._lock:
+                if not queue:
+                    return
+                uri = queue.popleft()
+
+            result = self._flash_copter(uri)
+
+            with self._lock:
+                self._results[uri] = result
+
+            if self._completed_cb:
+                self._completed_cb(uri, result)
+
+    def _flash_copter(self, uri):
+        timings = {}
+        targets = self._targets
+        error = None
+        attempts = 0
+
+        while attempts <= self._retries:
+            attempts += 1
+            bootloader = self._bootloader_factory(uri)
+            try:
+                bootloader.flash_full(warm=True, targets=targets, artifacts=self.artifacts, verify=self._verify,
+                                      incremental=self._incremental,
+                                      progress_cb=lambda message, percent: self._progress(uri, message, percent))
+                error = None
+            except Exception as e:
+                error = str(e) or type(e).__name__
+                logger.info('Flashing {} failed (attempt {}): {}'.format(uri, attempts, error))
+                self._leave_bootloader(uri, bootloader)
+                bootloader.close()
+
+            for phase, seconds in bootloader.phase_timings.items():
+                timings[phase] = timings.get(phase, 0.0) + seconds
+
+            if error is None:
+                break
+
+            if self._firmware_done(bootloader):
+                deck_targets = self._deck_targets(targets)
+                if deck_targets:
+                    targets = deck_targets
+
+        return FleetFlashResult(error is None, attempts, timings, time.time() - self._start_time, error)
+
+    def _leave_bootloader(self, uri, bootloader):
+        """
+        Restart the firmware of a Crazyflie left in the bootloader by a
+        failure. The retry warm boots through the firmware URI and would not
+        find it otherwise.
+        """
+        if not bootloader.in_bootloader:
+            return
+        try:
+            bootloader.reset_to_firmware(boot_delay=5.0)
+        except Exception as e:
+            logger.info('Could not reset {} to firmware: {}'.format(uri, e))
+
+    def _firmware_done(self, bootloader):
+        """True if the firmware was written, and verified if required"""
+        return bootloader.firmware_flashed
+
+    def _deck_targets(self, targets):
+        """The deck targets among targets, or in the artifacts if targets is empty"""
+        if targets:
+            return [t for t in targets if t.platform == 'deck']
+        return [a.target for a in self.artifacts if a.target.platform == 'deck']
+
+    def _progress(self, uri, message, percent):
+        if self._progress_cb:
+            self._progress_cb(uri, message, percent)
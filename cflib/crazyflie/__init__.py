@@ -49,6 +49,7 @@ from .link_statistics import LinkStatistics
 from .localization import Localization
 from .log import Log
 from .mem import Memory
+from .mem import MemoryCache
 from .param import Param
 from .platformservice import PlatformService
 from .supervisor import Supervisor
@@ -121,7 +122,8 @@ class Crazyflie():
         self.log = Log(self)
         self.console = Console(self)
         self.param = Param(self)
-        self.mem = Memory(self)
+        self.mem = Memory(self, cache=MemoryCache(ro_cache=ro_cache,
+                                                  rw_cache=rw_cache))
         self.platform = PlatformService(self)
         self.appchannel = Appchannel(self)
         self.link_statistics = LinkStatistics(self)
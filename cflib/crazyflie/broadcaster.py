@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+#
+# ,---------,       ____  _ __
+# |  ,-^-,  |      / __ )(_) /_______________ _____  ___
+# | (  O  ) |     / __  / / __/ ___/ ___/ __ `/_  / / _ \
+# | / ,--'  |    / /_/ / / /_/ /__/ /  / /_/ / / /_/  __/
+#    +------`   /_____/_/\__/\___/_/   \__,_/ /___/\___/
+#
+# Copyright (C) 2026 Bitcraze AB
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, in version 3.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+Swarm wide commands over a broadcast link.
+
+Example:
+```python
+with Broadcaster('radiobroadcast://0/80/2M?repeat=3') as broadcaster:
+    broadcaster.high_level_commander.takeoff(0.5, 2.0)
+    time.sleep(3.0)
+    broadcaster.high_level_commander.land(0.0, 2.0)
+```
+"""
+import logging
+
+import cflib.crtp
+from cflib.crazyflie.high_level_commander import HighLevelCommander
+from cflib.crazyflie.localization import Localization
+from cflib.crazyflie.supervisor import Supervisor
+
+__author__ = 'Bitcraze AB'
+__all__ = ['Broadcaster']
+
+logger = logging.getLogger(__name__)
+
+
+class _BroadcastPlatform:
+    """The protocol version can not be queried over a broadcast link"""
+
+    def __init__(self, protocol_version):
+        self._protocol_version = protocol_version
+
+    def get_protocol_version(self):
+        return self._protocol_version
+
+
+class Broadcaster:
+    """
+    Sends commands to all Crazyflies on a channel in one transmission, over
+    a broadcast link (radiobroadcast://). It stands in for a Crazyflie for
+    the HighLevelCommander, Localization and Supervisor so that the same
+    API is used for the whole swarm, use group masks to address a part of
+    it.
+
+    There is no downlink, nothing can be read from the Crazyflies and all
+    of them must run firmware with the same CRTP protocol version.
+    """
+
+    DEFAULT_PROTOCOL_VERSION = 12
+
+    def __init__(self, link_uri, protocol_version=DEFAULT_PROTOCOL_VERSION):
+        """
+        :param link_uri: The broadcast link URI
+        :param protocol_version: The CRTP protocol version of the firmware
+         of the Crazyflies
+        """
+        self.link_uri = link_uri
+        self.link = None
+        self.platform = _BroadcastPlatform(protocol_version)
+
+        self.high_level_commander = HighLevelCommander(self)
+        self.loc = Localization(self)
+        self.supervisor = Supervisor(self)
+
+    def open_link(self):
+        self.link = cflib.crtp.get_link_driver(self.link_uri)
+        if self.link is None:
+            raise Exception('No driver found or malformed URI: {}'.format(self.link_uri))
+
+    def close_link(self):
+        if self.link is not None:
+            self.link.close()
+            self.link = None
+
+    def is_link_open(self):
+        return self.link is not None
+
+    def send_packet(self, pk):
+        """Send a packet to all Crazyflies on the channel"""
+        if self.link is not None:
+            self.link.send_packet(pk)
+
+    def add_port_callback(self, port, cb):
+        """Nothing is ever received on a broadcast link"""
+        pass
+
+    def remove_port_callback(self, port, cb):
+        pass
+
+    def __enter__(self):
+        self.open_link()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close_link()
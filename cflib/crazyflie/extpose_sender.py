@@ -0,0 +1,199 @@
+# -*- coding: utf-8 -*-
+#
+# ,---------,       ____  _ __
+# |  ,-^-,  |      / __ )(_) /_______________ _____  ___
+# | (  O  ) |     / __  / / __/ ___/ ___/ __ `/_  / / _ \
+# | / ,--'  |    / /_/ / / /_/ /__/ /  / /_/ / / /_/  __/
+#    +------`   /_____/_/\__/\___/_/   \__,_/ /___/\___/
+#
+# Copyright (C) 2026 Bitcraze AB
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, in version 3.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+Streaming of external poses to many Crazyflies, for instance from a motion
+capture system, packed several Crazyflies per packet.
+
+Example:
+```python
+with Broadcaster('radiobroadcast://0/80/2M') as broadcaster:
+    sender = PackedExtPoseSender({1: broadcaster, 2: broadcaster})
+    sender.start()
+    # From the motion capture frame callback
+    sender.update(1, (0.0, 0.0, 0.5), (0.0, 0.0, 0.0, 1.0))
+```
+"""
+import logging
+import time
+from collections import namedtuple
+from threading import Event
+from threading import Lock
+from threading import Thread
+
+__author__ = 'Bitcraze AB'
+__all__ = ['PackedExtPoseSender', 'ExtPoseReport']
+
+logger = logging.getLogger(__name__)
+
+# Achieved streaming for one Crazyflie since the last report. rate is the
+# number of poses sent per second, latency the mean time in seconds from the
+# pose timestamp until it was sent (None if nothing was sent) and superseded
+# the number of poses replaced by a newer one before they were sent.
+ExtPoseReport = namedtuple('ExtPoseReport', 'rate latency superseded')
+
+
+class _ExtPoseStatistics:
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.start_time = time.time()
+        self.sent = 0
+        self.superseded = 0
+        self.latency_sum = 0.0
+
+    def report(self):
+        duration = time.time() - self.start_time
+        rate = self.sent / duration if duration > 0 else 0.0
+        latency = self.latency_sum / self.sent if self.sent else None
+        return ExtPoseReport(rate, latency, self.superseded)
+
+
+class PackedExtPoseSender:
+    """
+    Sends the latest pose of each Crazyflie at a fixed rate using
+    EXT_POSE_PACKED packets.
+
+    Poses are handed over with update() from the motion capture thread. Only
+    the latest pose of a Crazyflie is kept, a pose that has not been sent
+    when a newer one arrives is dropped. The sender thread packs the pending
+    poses of the Crazyflies that share a link into as few packets as
+    possible, on a broadcast link all Crazyflies on the channel get all
+    packets and pick their own pose.
+    """
+
+    DEFAULT_RATE = 100
+
+    def __init__(self, links, rate=DEFAULT_RATE):
+        """
+        :param links: A dict keyed by Crazyflie id, the last byte of its
+         radio address, with the Broadcaster (or Crazyflie) to send its pose
+         on
+        :param rate: The rate in Hz at which pending poses are sent
+        """
+        self._links = dict(links)
+        self._period = 1.0 / rate
+        self._lock = Lock()
+        self._pending = {}
+        self._statistics = {copter_id: _ExtPoseStatistics() for copter_id in self._links}
+        self._stop_event = Event()
+        self._sender = None
+
+    def update(self, copter_id, pos, quat, timestamp=None):
+        """
+        Set the latest pose of a Crazyflie
+
+        :param copter_id: The Crazyflie id
+        :param pos: The position [x, y, z] in m
+        :param quat: The attitude quaternion [qx, qy, qz, qw]
+        :param timestamp: The time the pose was captured, as time.time(),
+         used to compute the latency. The time of the call if not set.
+        """
+        if copter_id not in self._links:
+            raise ValueError('Unknown Crazyflie id {}'.format(copter_id))
+
+        if timestamp is None:
+            timestamp = time.time()
+
+        with self._lock:
+            if copter_id in self._pending:
+                self._statistics[copter_id].superseded += 1
+            self._pending[copter_id] = (pos, quat, timestamp)
+
+    def send_pending(self):
+        """
+        Send the pending poses now, called by the sender thread
+
+        :return: The number of packets sent
+        """
+        with self._lock:
+            pending = self._pending
+            self._pending = {}
+
+        if not pending:
+            return 0
+
+        # Group the poses by link, keeping the order of the Crazyflies
+        groups = {}
+        for copter_id, (pos, quat, timestamp) in pending.items():
+            link = self._links[copter_id]
+            groups.setdefault(id(link), (link, []))[1].append((copter_id, pos, quat))
+
+        count = 0
+        for link, poses in groups.values():
+            count += link.loc.send_extpose_packed(poses)
+
+        now = time.time()
+        with self._lock:
+            for copter_id, (_, _, timestamp) in pending.items():
+                statistics = self._statistics[copter_id]
+                statistics.sent += 1
+                statistics.latency_sum += now - timestamp
+
+        return count
+
+    def report(self):
+        """
+        The achieved rate and latency of each Crazyflie since the last report,
+        or since the sender was created
+
+        :return: A dict keyed by Crazyflie id with ExtPoseReport values
+        """
+        with self._lock:
+            reports = {copter_id: statistics.report() for copter_id, statistics in self._statistics.items()}
+            for statistics in self._statistics.values():
+                statistics.reset()
+        return reports
+
+    def start(self):
+        """Start sending pending poses at the rate"""
+        if self._sender is not None:
+            return
+        self._stop_event.clear()
+        self._sender = Thread(target=self._run, daemon=True)
+        self._sender.start()
+
+    def stop(self):
+        """Stop sending, poses that are pending are dropped"""
+        sender = self._sender
+        self._sender = None
+        self._stop_event.set()
+        if sender is not None:
+            sender.join()
+        with self._lock:
+            self._pending = {}
+
+    def _run(self):
+        next_time = time.time()
+        while not self._stop_event.is_set():
+            try:
+                self.send_pending()
+            except Exception as e:
+                logger.warning('Sending external poses failed: {}'.format(e))
+
+            next_time += self._period
+            now = time.time()
+            if next_time < now:
+                # Do not try to catch up after a stall
+                next_time = now
+            self._stop_event.wait(next_time - now)
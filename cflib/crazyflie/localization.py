@@ -33,6 +33,7 @@ import warnings
 from cflib.crtp.crtpstack import CRTPPacket
 from cflib.crtp.crtpstack import CRTPPort
 from cflib.utils.callbacks import Caller
+from cflib.utils.encoding import compress_quaternion
 from cflib.utils.encoding import fp16_to_float
 
 __author__ = 'Bitcraze AB'
@@ -68,6 +69,12 @@ class Localization():
     LH_ANGLE_STREAM = 10
     LH_PERSIST_DATA = 11
 
+    # Pose of one Crazyflie in an EXT_POSE_PACKED packet: id, position in mm
+    # and compressed quaternion
+    EXT_POSE_PACKED_ITEM = '<BhhhI'
+    EXT_POSE_PACKED_ITEMS_PER_PACKET = \
+        (CRTPPacket.MAX_DATA_SIZE - 1) // struct.calcsize(EXT_POSE_PACKED_ITEM)
+
     def __init__(self, crazyflie=None):
         """
         Initialize the Extpos object.
@@ -157,6 +164,35 @@ class Localization():
                               quat[0], quat[1], quat[2], quat[3])
         self._cf.send_packet(pk)
 
+    def send_extpose_packed(self, poses):
+        """
+        Send the pose of several Crazyflies, packed in as few packets as
+        possible. Intended for broadcast links, each Crazyflie picks the pose
+        with its id, the last byte of its radio address.
+
+        poses is a list of (id, position [x, y, z], attitude quaternion
+        [qx, qy, qz, qw]). Positions are sent in mm and must be within
+        +-32.767 m.
+
+        Returns the number of packets sent.
+        """
+        count = 0
+        for i in range(0, len(poses), self.EXT_POSE_PACKED_ITEMS_PER_PACKET):
+            data = struct.pack('<B', self.EXT_POSE_PACKED)
+            for copter_id, pos, quat in poses[i:i + self.EXT_POSE_PACKED_ITEMS_PER_PACKET]:
+                data += struct.pack(self.EXT_POSE_PACKED_ITEM, copter_id,
+                                    int(round(pos[0] * 1000)), int(round(pos[1] * 1000)),
+                                    int(round(pos[2] * 1000)), compress_quaternion(quat))
+
+            pk = CRTPPacket()
+            pk.port = CRTPPort.LOCALIZATION
+            pk.channel = self.GENERIC_CH
+            pk.data = data
+            self._cf.send_packet(pk)
+            count += 1
+
+        return count
+
     def send_short_lpp_packet(self, dest_id, data):
         """
         Send ultra-wide-band LPP packet to dest_id
@@ -29,10 +29,14 @@ Enables access to the Crazyflie memory subsystem.
 import errno
 import logging
 import struct
-from threading import Lock
+from collections import namedtuple
+from threading import RLock
 
 from .deck_memory import DeckMemoryManager
 from .deckctrl_element import DeckCtrlElement
+from .diff_writer import DiffWriter
+from .diff_writer import DiffWriteResult
+from .frame_streamer import FrameStreamer
 from .i2c_element import I2CElement
 from .led_driver_memory import LEDDriverMemory
 from .led_timings_driver_memory import LEDTimingsDriverMemory
@@ -42,6 +46,7 @@ from .lighthouse_memory import LighthouseMemHelper
 from .lighthouse_memory import LighthouseMemory
 from .loco_memory import LocoMemory
 from .loco_memory_2 import LocoMemory2
+from .memory_cache import MemoryCache
 from .memory_element import MemoryElement
 from .memory_tester import MemoryTester
 from .multiranger_memory import MultirangerMemory
@@ -56,181 +61,374 @@ from cflib.crtp.crtpstack import CRTPPort
 from cflib.utils.callbacks import Caller
 
 __author__ = 'Bitcraze AB'
-__all__ = ['Memory', 'Poly4D', 'CompressedStart', 'CompressedSegment', 'MemoryElement',
+__all__ = ['Memory', 'MemoryTransfer', 'Poly4D', 'CompressedStart', 'CompressedSegment', 'MemoryElement',
            'LighthouseBsGeometry', 'LighthouseBsCalibration', 'LighthouseMemHelper',
-           'DeckMemoryManager']
+           'DeckMemoryManager', 'MemoryCache', 'DiffWriter', 'DiffWriteResult',
+           'FrameStreamer']
 
 # Channels used for the logging port
 CHAN_INFO = 0
 CHAN_READ = 1
 CHAN_WRITE = 2
 
+# Priorities for memory transfers, lower values are handled first
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+PRIORITY_LOW = 2
+
 # Commands used when accessing the Settings port
 CMD_INFO_VER = 0
 CMD_INFO_NBR = 1
 CMD_INFO_DETAILS = 2
 
+# Validity token of cached memory layouts, change if the format changes
+LAYOUT_CACHE_TOKEN = b'\x01'
+
 logger = logging.getLogger(__name__)
 
+# Snapshot of a queued memory transfer, see Memory.transfer_queue
+MemoryTransfer = namedtuple('MemoryTransfer', 'mem addr length is_write priority running bytes_done')
+
 
 class _ReadRequest:
     """
     Class used to handle memory reads that will split up the read in multiple
-    packets if necessary
+    packets if necessary. Up to window_size chunks are requested at the same
+    time, the replies are put in place in a preallocated buffer using the
+    address and only chunks that are not answered are requested again.
     """
     MAX_DATA_LENGTH = 24
+    DEFAULT_WINDOW_SIZE = 4
+
+    is_write = False
 
-    def __init__(self, mem, addr, length, cf):
+    def __init__(self, mem, addr, length, cf, window_size=DEFAULT_WINDOW_SIZE,
+                 priority=PRIORITY_NORMAL, buffer=None):
         """Initialize the object with good defaults"""
         self.mem = mem
         self.addr = addr
+        self.length = length
+        self.priority = priority
+        # Called instead of the Memory callbacks if set
+        self.done_cb = None
+        self.failed_cb = None
         self._bytes_left = length
-        self.data = bytearray()
+        if buffer is None:
+            buffer = bytearray(length)
+        elif len(buffer) < length:
+            raise ValueError('Read buffer of {} bytes is too small for {} bytes'.format(len(buffer), length))
+        self.data = buffer
         self.cf = cf
+        self._window_size = max(1, window_size)
+
+        # Address of the next chunk that has not been requested yet
+        self._next_addr = addr
+        self._end_addr = addr + length
+        # Requested chunks that have not been answered, address -> length
+        self._outstanding = {}
+        self._started = False
+
+    @property
+    def in_flight(self):
+        """Number of chunks requested but not answered"""
+        return len(self._outstanding)
+
+    @property
+    def started(self):
+        return self._started
+
+    @property
+    def bytes_done(self):
+        """Number of bytes received"""
+        return self.length - self._bytes_left
+
+    def send_next_chunk(self):
+        """
+        Request the next chunk if the window allows it, returns True if a
+        chunk was requested
+        """
+        if not self._started and self._end_addr == self.addr:
+            # Nothing to read, but the Crazyflie still has to answer
+            self._started = True
+            self._outstanding[self.addr] = 0
+            self._request_chunk(self.addr, 0)
+            return True
 
-        self._current_addr = addr
-
-    def start(self):
-        """Start the fetching of the data"""
-        self._request_new_chunk()
+        if len(self._outstanding) >= self._window_size or self._next_addr >= self._end_addr:
+            return False
 
-    def resend(self):
-        logger.debug('Sending write again...')
-        self._request_new_chunk()
+        self._started = True
+        new_len = min(self._end_addr - self._next_addr, _ReadRequest.MAX_DATA_LENGTH)
+        self._outstanding[self._next_addr] = new_len
+        self._request_chunk(self._next_addr, new_len)
+        self._next_addr += new_len
+        return True
 
-    def _request_new_chunk(self):
+    def _request_chunk(self, addr, length):
         """
-        Called to request a new chunk of data to be read from the Crazyflie
+        Called to request a chunk of data to be read from the Crazyflie
         """
-        # Figure out the length of the next request
-        new_len = self._bytes_left
-        if new_len > _ReadRequest.MAX_DATA_LENGTH:
-            new_len = _ReadRequest.MAX_DATA_LENGTH
-
         logger.debug('Requesting new chunk of {}bytes at 0x{:X}'.format(
-            new_len, self._current_addr))
+            length, addr))
 
-        # Request the data for the next address
         pk = CRTPPacket()
         pk.set_header(CRTPPort.MEM, CHAN_READ)
-        pk.data = struct.pack('<BIB', self.mem.id, self._current_addr, new_len)
+        pk.data = struct.pack('<BIB', self.mem.id, addr, length)
         reply = struct.unpack('<BBBBB', pk.data[:-1])
         self.cf.send_packet(pk, expected_reply=reply, timeout=1)
 
     def add_data(self, addr, data):
-        """Callback when data is received from the Crazyflie"""
-        data_len = len(data)
-        if not addr == self._current_addr:
+        """
+        Callback when data is received from the Crazyflie. Returns None if
+        the data does not belong to this request, otherwise True when all the
+        data has been received.
+        """
+        if addr not in self._outstanding:
             logger.warning(
                 'Address did not match when adding data to read request!')
             return
 
-        # Add the data and calculate the next address to fetch
-        self.data += data
+        requested_len = self._outstanding.pop(addr)
+        data_len = min(len(data), requested_len)
+        offset = addr - self.addr
+        self.data[offset:offset + data_len] = data[:data_len]
         self._bytes_left -= data_len
-        self._current_addr += data_len
 
-        if self._bytes_left > 0:
-            self._request_new_chunk()
-            return False
-        else:
-            return True
+        if data_len < requested_len:
+            # Short reply, ask for the rest of the chunk
+            self._outstanding[addr + data_len] = requested_len - data_len
+            self._request_chunk(addr + data_len, requested_len - data_len)
+
+        return self._bytes_left <= 0 and len(self._outstanding) == 0
 
 
 class _WriteRequest:
     """
-    Class used to handle memory reads that will split up the read in multiple
-    packets in necessary
+    Class used to handle memory writes that will split up the write in
+    multiple packets if necessary. Up to window_size chunks are written at the
+    same time, completion is tracked in address order.
     """
     MAX_DATA_LENGTH = 24
+    DEFAULT_WINDOW_SIZE = 4
 
-    def __init__(self, mem, addr, data, cf, progress_cb=None):
+    is_write = True
+
+    def __init__(self, mem, addr, data, cf, progress_cb=None, window_size=DEFAULT_WINDOW_SIZE,
+                 priority=PRIORITY_NORMAL):
         """Initialize the object with good defaults"""
         self.mem = mem
         self.addr = addr
-        self._bytes_left = len(data)
-        self._write_len = self._bytes_left
-        self._data = data
+        self.priority = priority
+        # Called instead of the Memory callbacks if set
+        self.done_cb = None
+        self.failed_cb = None
+        if isinstance(data, bytes):
+            self._data = memoryview(data)
+        else:
+            # Take a copy, the caller is free to modify the data after the
+            # write has been started
+            self._data = memoryview(bytes(data))
+        self.length = len(self._data)
         self.data = bytearray()
         self.cf = cf
         self._progress_cb = progress_cb
         self._progress = -1
+        self._window_size = max(1, window_size)
+
+        # Offset of the next chunk that has not been sent yet
+        self._next_offset = 0
+        # Number of bytes acknowledged in order from the start address
+        self._acked_len = 0
+        # Sent chunks that have not been acknowledged,
+        # address -> (length, packet, expected reply)
+        self._outstanding = {}
+        # Chunks acknowledged out of order, address -> length
+        self._acked_out_of_order = {}
+        self._started = False
+
+    @property
+    def acked_len(self):
+        """Number of bytes written and acknowledged in order"""
+        return self._acked_len
+
+    @property
+    def bytes_done(self):
+        return self._acked_len
+
+    @property
+    def in_flight(self):
+        """Number of chunks sent but not acknowledged"""
+        return len(self._outstanding)
+
+    @property
+    def started(self):
+        return self._started
+
+    def send_next_chunk(self):
+        """
+        Write the next chunk if the window allows it, returns True if a chunk
+        was sent
+        """
+        if not self._started and self.length == 0:
+            # Nothing to write, but the Crazyflie still has to answer
+            self._started = True
+            self._write_chunk(0, 0)
+            return True
 
-        self._current_addr = addr
-
-        self._sent_packet = None
-        self._sent_reply = None
-
-        self._addr_add = 0
-
-    def start(self):
-        """Start the fetching of the data"""
-        self._write_new_chunk()
+        if len(self._outstanding) >= self._window_size or self._next_offset >= self.length:
+            return False
 
-    def resend(self):
-        logger.debug('Sending write again...')
-        self.cf.send_packet(
-            self._sent_packet, expected_reply=self._sent_reply, timeout=1)
+        self._started = True
+        new_len = min(self.length - self._next_offset, _WriteRequest.MAX_DATA_LENGTH)
+        self._write_chunk(self._next_offset, new_len)
+        self._next_offset += new_len
+        return True
 
-    def _write_new_chunk(self):
+    def _write_chunk(self, offset, length):
         """
-        Called to request a new chunk of data to be read from the Crazyflie
+        Called to write a chunk of data to the Crazyflie
         """
-        # Figure out the length of the next request
-        new_len = len(self._data)
-        if new_len > _WriteRequest.MAX_DATA_LENGTH:
-            new_len = _WriteRequest.MAX_DATA_LENGTH
-
+        addr = self.addr + offset
         logger.debug('Writing new chunk of {}bytes at 0x{:X}'.format(
-            new_len, self._current_addr))
-
-        data = self._data[:new_len]
-        self._data = self._data[new_len:]
+            length, addr))
 
         pk = CRTPPacket()
         pk.set_header(CRTPPort.MEM, CHAN_WRITE)
-        pk.data = struct.pack('<BI', self.mem.id, self._current_addr)
+        header = struct.pack('<BI', self.mem.id, addr)
         # Create a tuple used for matching the reply using id and address
-        reply = struct.unpack('<BBBBB', pk.data)
-        self._sent_reply = reply
+        reply = struct.unpack('<BBBBB', header)
         # Add the data
-        pk.data += struct.pack('B' * len(data), *data)
-        self._sent_packet = pk
+        pk.data = header + self._data[offset:offset + length]
+        self._outstanding[addr] = (length, pk, reply)
         self.cf.send_packet(pk, expected_reply=reply, timeout=1)
 
-        self._addr_add = len(data)
-        self._bytes_left -= self._addr_add
-
     def _get_progress_message(self):
         if isinstance(self.mem, DeckMemoryManager):
+            current_addr = self.addr + self._acked_len
             for deck_memory in self.mem.deck_memories.values():
-                if deck_memory.contains(self._current_addr):
+                if deck_memory.contains(current_addr):
                     return f'Writing to {deck_memory.name} deck memory'
 
         return 'Writing to memory'
 
     def write_done(self, addr):
-        """Callback when data is received from the Crazyflie"""
-        if not addr == self._current_addr:
+        """
+        Callback when a write is acknowledged by the Crazyflie. Returns None if
+        the address does not belong to this request, otherwise True when all
+        the data has been written.
+        """
+        if addr not in self._outstanding:
             logger.warning(
-                'Address did not match when adding data to read request!')
+                'Address did not match when adding data to write request!')
             return
 
-        if self._progress_cb is not None:
-            new_progress = int(100 * (self._write_len - self._bytes_left) / self._write_len)
+        length = self._outstanding.pop(addr)[0]
+        self._acked_out_of_order[addr] = length
+
+        # Advance the acknowledged part as far as it is contiguous
+        next_addr = self.addr + self._acked_len
+        while next_addr in self._acked_out_of_order:
+            self._acked_len += self._acked_out_of_order.pop(next_addr)
+            next_addr = self.addr + self._acked_len
+
+        if self._progress_cb is not None and self.length > 0:
+            new_progress = int(100 * self._acked_len / self.length)
             if new_progress > self._progress:
                 self._progress = new_progress
                 self._progress_cb(self._get_progress_message(), self._progress)
 
-        if len(self._data) > 0:
-            self._current_addr += self._addr_add
-            self._write_new_chunk()
+        if self._acked_len < self.length:
             return False
         else:
             logger.debug('This write request is done')
             return True
 
 
+class _TransferScheduler:
+    """
+    Keeps track of the memory reads and writes. Transfers to different
+    memories run at the same time while transfers to the same memory are
+    queued and run one at a time, in priority order. The chunks in flight are
+    handed out round robin to the running transfers, higher priority first,
+    and are limited in total to leave room on the link for other traffic such
+    as logging and setpoints.
+    """
+    DEFAULT_MAX_PACKETS_IN_FLIGHT = 8
+
+    def __init__(self):
+        self.max_packets_in_flight = self.DEFAULT_MAX_PACKETS_IN_FLIGHT
+        self.lock = RLock()
+        # Memory id -> list of transfers, the first one is running
+        self._queues = {}
+        self._round_robin_offset = 0
+
+    def clear(self):
+        """Forget all transfers, returns the transfers that were queued"""
+        with self.lock:
+            transfers = self.transfers()
+            self._queues = {}
+        return transfers
+
+    def transfers(self):
+        """All queued transfers, the running one first for each memory"""
+        with self.lock:
+            return [transfer for queue in self._queues.values() for transfer in queue]
+
+    def add(self, request, flush_writes=False):
+        """Queue a transfer and start it if possible"""
+        with self.lock:
+            queue = self._queues.setdefault(request.mem.id, [])
+            if flush_writes:
+                queue[1:] = [transfer for transfer in queue[1:] if not transfer.is_write]
+
+            # Insert after all transfers with the same or higher priority, but
+            # never in front of a transfer that has started
+            first = 1 if len(queue) > 0 and queue[0].started else 0
+            index = len(queue)
+            while index > first and queue[index - 1].priority > request.priority:
+                index -= 1
+            queue.insert(index, request)
+
+            self.pump()
+
+    def running(self, mem_id, is_write):
+        """Get the running transfer for a memory if it is of the given kind"""
+        queue = self._queues.get(mem_id)
+        if queue and queue[0].is_write == is_write:
+            return queue[0]
+        return None
+
+    def finish(self, request):
+        """Remove a running transfer and start the next one for the memory"""
+        queue = self._queues[request.mem.id]
+        queue.remove(request)
+        if len(queue) == 0:
+            del self._queues[request.mem.id]
+        self.pump()
+
+    def pump(self):
+        """Hand out free chunk slots to the running transfers"""
+        running = [queue[0] for queue in self._queues.values()]
+        if len(running) == 0:
+            return
+
+        offset = self._round_robin_offset % len(running)
+        running = running[offset:] + running[:offset]
+        running.sort(key=lambda request: request.priority)
+        self._round_robin_offset += 1
+
+        in_flight = sum(request.in_flight for request in running)
+        sent = True
+        while sent and in_flight < self.max_packets_in_flight:
+            sent = False
+            for request in running:
+                if in_flight >= self.max_packets_in_flight:
+                    break
+                if request.send_next_chunk():
+                    in_flight += 1
+                    sent = True
+
+
 class Memory():
     """Access memories on the Crazyflie"""
 
@@ -245,12 +443,22 @@ class Memory():
         errno.EEXIST: 'Block already exists'
     }
 
-    def __init__(self, crazyflie=None):
-        """Instantiate class and connect callbacks"""
+    def __init__(self, crazyflie=None, cache=None):
+        """
+        Instantiate class and connect callbacks
+
+        @param cache MemoryCache used for memory contents that rarely change
+        """
         self.cf = crazyflie
+        self.cache = cache if cache is not None else MemoryCache()
         self.cf.add_port_callback(CRTPPort.MEM, self._new_packet_cb)
         self.cf.disconnected.add_callback(self._disconnected)
-        self._write_requests_lock = Lock()
+        self._transfers = _TransferScheduler()
+
+        # Number of chunks that are in flight at the same time when reading
+        # and writing
+        self.read_window_size = _ReadRequest.DEFAULT_WINDOW_SIZE
+        self.write_window_size = _WriteRequest.DEFAULT_WINDOW_SIZE
 
         self._clear_state()
 
@@ -269,12 +477,14 @@ class Memory():
 
         self._refresh_callback = None
         self._refresh_failed_callback = None
-        self._fetch_id = 0
+        self._details = {}
+        self._details_requested = set()
+        self._cached_details = []
+        self._enumerated = False
         self.nbr_of_mems = 0
         self._ow_mem_fetch_index = 0
         self._elem_data = ()
-        self._read_requests = {}
-        self._write_requests = {}
+        self._transfers.clear()
         self._ow_mems_left_to_update = []
         self._getting_count = False
 
@@ -322,37 +532,80 @@ class Memory():
 
         return None
 
-    def write(self, memory, addr, data, flush_queue=False, progress_cb=None):
-        """Write the specified data to the given memory at the given address"""
-        wreq = _WriteRequest(memory, addr, data, self.cf, progress_cb)
-        if memory.id not in self._write_requests:
-            self._write_requests[memory.id] = []
-
-        # Workaround until we secure the uplink and change messages for
-        # mems to non-blocking
-        self._write_requests_lock.acquire()
-        if flush_queue:
-            self._write_requests[memory.id] = self._write_requests[
-                memory.id][:1]
-        self._write_requests[memory.id].append(wreq)
-        if len(self._write_requests[memory.id]) == 1:
-            wreq.start()
-        self._write_requests_lock.release()
+    @property
+    def max_packets_in_flight(self):
+        """
+        Max number of memory packets in flight at the same time, for all
+        transfers together
+        """
+        return self._transfers.max_packets_in_flight
 
-        return True
+    @max_packets_in_flight.setter
+    def max_packets_in_flight(self, value):
+        self._transfers.max_packets_in_flight = max(1, value)
 
-    def read(self, memory, addr, length):
+    @property
+    def transfer_queue(self):
         """
-        Read the specified amount of bytes from the given memory at the given address
+        Get the queued memory transfers as a list of MemoryTransfer, the
+        running transfer of each memory comes first
         """
-        if memory.id in self._read_requests:
-            logger.warning('There is already a read operation ongoing for memory id {}'.format(memory.id))
-            return False
+        with self._transfers.lock:
+            return [MemoryTransfer(request.mem, request.addr, request.length, request.is_write,
+                                   request.priority, request.started, request.bytes_done)
+                    for request in self._transfers.transfers()]
 
-        rreq = _ReadRequest(memory, addr, length, self.cf)
-        self._read_requests[memory.id] = rreq
+    def write(self, memory, addr, data, flush_queue=False, progress_cb=None, window_size=None,
+              priority=PRIORITY_NORMAL, write_cb=None, write_failed_cb=None):
+        """
+        Write the specified data to the given memory at the given address.
+        The write is queued if there are other transfers to the same memory.
+
+        @param flush_queue Remove writes to the memory that have not started
+        @param progress_cb Called with a message and the percentage of the
+                           data that has been acknowledged by the Crazyflie
+        @param window_size Max number of chunks written at the same time,
+                           defaults to write_window_size
+        @param priority Transfer priority, one of the PRIORITY_ constants
+        @param write_cb Called with (mem, addr) when done, instead of
+                        mem_write_cb
+        @param write_failed_cb Called with (mem, addr) on failure, instead of
+                               mem_write_failed_cb
+        """
+        if window_size is None:
+            window_size = self.write_window_size
 
-        rreq.start()
+        wreq = _WriteRequest(memory, addr, data, self.cf, progress_cb, window_size, priority)
+        wreq.done_cb = write_cb
+        wreq.failed_cb = write_failed_cb
+        self._transfers.add(wreq, flush_writes=flush_queue)
+
+        return True
+
+    def read(self, memory, addr, length, window_size=None, priority=PRIORITY_NORMAL,
+             read_cb=None, read_failed_cb=None, buffer=None):
+        """
+        Read the specified amount of bytes from the given memory at the given address.
+        The read is queued if there are other transfers to the same memory.
+
+        @param window_size Max number of chunks requested at the same time,
+                           defaults to read_window_size
+        @param priority Transfer priority, one of the PRIORITY_ constants
+        @param read_cb Called with (mem, addr, data) when done, instead of
+                       mem_read_cb
+        @param read_failed_cb Called with (mem, addr, data) on failure,
+                              instead of mem_read_failed_cb
+        @param buffer Writable buffer of at least length bytes to read into,
+                      passed as data to the callbacks. A new bytearray is
+                      used if not set.
+        """
+        if window_size is None:
+            window_size = self.read_window_size
+
+        rreq = _ReadRequest(memory, addr, length, self.cf, window_size, priority, buffer=buffer)
+        rreq.done_cb = read_cb
+        rreq.failed_cb = read_failed_cb
+        self._transfers.add(rreq)
 
         return True
 
@@ -360,7 +613,6 @@ class Memory():
         """Start fetching all the detected memories"""
         self._refresh_callback = refresh_done_callback
         self._refresh_failed_callback = refresh_failed_cb
-        self._fetch_id = 0
         for m in self.mems:
             try:
                 self.mem_read_cb.remove_callback(m.new_data)
@@ -371,6 +623,9 @@ class Memory():
 
         self.nbr_of_mems = 0
         self._getting_count = False
+        self._details = {}
+        self._details_requested = set()
+        self._enumerated = False
 
         logger.debug('Requesting number of memories')
         pk = CRTPPacket()
@@ -378,34 +633,50 @@ class Memory():
         pk.data = (CMD_INFO_NBR,)
         self.cf.send_packet(pk, expected_reply=(CMD_INFO_NBR,))
 
+        # The layout from the last connection is only used to request the
+        # details at the same time as the number of memories, the memories
+        # are always created from the replies.
+        self._cached_details = self._fetch_cached_layout()
+        for mem_id in range(len(self._cached_details)):
+            self._request_details(mem_id)
+
     def _disconnected(self, uri):
         """The link to the Crazyflie has been broken. Reset state"""
         self._call_all_failed_callbacks()
         self._clear_state()
 
     def _call_all_failed_callbacks(self):
-        # Read requests
-        read_requests = list(self._read_requests.values())
-        self._read_requests.clear()
-        for rreq in read_requests:
-            self.mem_read_failed_cb.call(rreq.mem, rreq.addr, rreq.data)
-
-        # Write requests
-        write_requests = []
-        self._write_requests_lock.acquire()
-        for requests in self._write_requests.values():
-            write_requests += requests
-        self._write_requests.clear()
-        self._write_requests_lock.release()
-
-        for wreq in write_requests:
-            self.mem_write_failed_cb.call(wreq.mem, wreq.addr)
+        # Read and write requests
+        for request in self._transfers.clear():
+            self._call_transfer_callbacks(request, success=False)
 
         # Info
         if self._refresh_failed_callback:
             self._refresh_failed_callback()
             self._clear_refresh_callbacks()
 
+    def _call_transfer_callbacks(self, request, success):
+        """
+        Call the callbacks of a finished transfer, or the Memory callbacks if
+        the transfer has none
+        """
+        if request.is_write:
+            args = (request.mem, request.addr)
+            success_caller, failed_caller = self.mem_write_cb, self.mem_write_failed_cb
+        else:
+            args = (request.mem, request.addr, request.data)
+            success_caller, failed_caller = self.mem_read_cb, self.mem_read_failed_cb
+
+        if request.done_cb is None and request.failed_cb is None:
+            if success:
+                success_caller.call(*args)
+            else:
+                failed_caller.call(*args)
+        else:
+            cb = request.done_cb if success else request.failed_cb
+            if cb is not None:
+                cb(*args)
+
     def _new_packet_cb(self, packet):
         """Callback for newly arrived packets for the memory port"""
         chan = packet.channel
@@ -429,34 +700,125 @@ class Memory():
         self.nbr_of_mems = payload[0]
         logger.info('{} memories found'.format(self.nbr_of_mems))
 
-        # Start requesting information about the memories,
+        # Request information about all the memories at the same time
         if self.nbr_of_mems > 0:
             if not self._getting_count:
                 self._getting_count = True
-                logger.debug('Requesting first id')
-                pk = CRTPPacket()
-                pk.set_header(CRTPPort.MEM, CHAN_INFO)
-                pk.data = (CMD_INFO_DETAILS, 0)
-                self.cf.send_packet(pk, expected_reply=(CMD_INFO_DETAILS, 0))
+                for mem_id in range(self.nbr_of_mems):
+                    self._request_details(mem_id)
+                self._check_enumeration_done()
         else:
             if self._refresh_callback:
                 self._refresh_callback()
                 self._clear_refresh_callbacks()
 
+    def _request_details(self, mem_id):
+        if mem_id in self._details_requested:
+            return
+
+        logger.debug('Requesting information about memory {}'.format(mem_id))
+        self._details_requested.add(mem_id)
+        pk = CRTPPacket()
+        pk.set_header(CRTPPort.MEM, CHAN_INFO)
+        pk.data = (CMD_INFO_DETAILS, mem_id)
+        self.cf.send_packet(pk, expected_reply=(CMD_INFO_DETAILS, mem_id))
+
+    def _layout_cache_key(self):
+        """The layout depends on the firmware, identified by the log TOC CRC"""
+        toc_crc = getattr(getattr(self.cf, 'log', None), 'toc', None)
+        toc_crc = getattr(toc_crc, 'crc', None)
+        if not self.cache.enabled or toc_crc is None:
+            return None
+        return self.cache.make_key('mem-layout', self.cf.link_uri, '{:08X}'.format(toc_crc))
+
+    def _fetch_cached_layout(self):
+        key = self._layout_cache_key()
+        if key is None:
+            return []
+        data = self.cache.fetch(key, LAYOUT_CACHE_TOKEN)
+        if data is None:
+            return []
+
+        # Length prefixed details payloads
+        details = []
+        while len(data) > 0:
+            details.append(bytes(data[1:1 + data[0]]))
+            data = data[1 + data[0]:]
+        return details
+
+    def _store_cached_layout(self, details):
+        key = self._layout_cache_key()
+        if key is None or details == self._cached_details:
+            return
+        data = bytearray()
+        for payload in details:
+            data += bytes([len(payload)]) + payload
+        self.cache.insert(key, LAYOUT_CACHE_TOKEN, data)
+
     def _handle_cmd_info_details(self, payload):
-        # Did we get a good reply, otherwise try again:
-        if len(payload) < 5:
+        if self._enumerated:
+            return
+
+        if len(payload) == 0:
+            # An empty reply does not tell which memory it is about. When all
+            # the unanswered requests are for memories that exist one of them
+            # failed, and enumeration ends the same way whichever it is.
+            # Otherwise the reply is dropped and the retry of the request
+            # will bring it back.
+            unanswered = [mem_id for mem_id in self._details_requested if mem_id not in self._details]
+            if self._getting_count and len(unanswered) > 0 and max(unanswered) < self.nbr_of_mems:
+                self._details[min(unanswered)] = None
+        elif len(payload) < 5:
+            # Did not get a good reply. Keep it until the number of memories
+            # is known, it is expected for speculative requests of memories
+            # that do not exist (anymore).
+            self._details[payload[0]] = None
+        else:
+            self._details[payload[0]] = bytes(payload)
+
+        self._check_enumeration_done()
+
+    def _check_enumeration_done(self):
+        """Create the memories when the details of all of them have arrived"""
+        if self._enumerated or not self._getting_count:
+            return
+
+        details = [self._details.get(mem_id, b'') for mem_id in range(self.nbr_of_mems)]
+        if None in details:
             # Workaround for 1-wire bug when memory is detected
             # but updating the info crashes the communication with
             # the 1-wire. Fail by saying we only found 1 memory
             # (the I2C).
             logger.error('-------->Got good count, but no info on mem!')
             self.nbr_of_mems = 1
+            self._enumerated = True
+            if details[0]:
+                self._create_mem(details[0])
             if self._refresh_callback:
                 self._refresh_callback()
                 self._clear_refresh_callbacks()
             return
 
+        if b'' in details:
+            return
+
+        self._enumerated = True
+        self._store_cached_layout(details)
+        for payload in details:
+            self._create_mem(payload)
+
+        logger.debug('Done getting all the memories, start reading the OWs')
+        ows = self.get_mems(MemoryElement.TYPE_1W)
+        # If there are any OW mems start reading them, otherwise
+        # we are done
+        for ow_mem in ows:
+            ow_mem.update(self._mem_update_done)
+        if len(ows) == 0:
+            if self._refresh_callback:
+                self._refresh_callback()
+                self._clear_refresh_callbacks()
+
+    def _create_mem(self, payload):
         # Create information about a new memory
         # Id - 1 byte
         mem_id = payload[0]
@@ -545,79 +907,60 @@ class Memory():
             self.mems.append(mem)
             self.mem_added_cb.call(mem)
 
-            self._fetch_id = mem_id + 1
-
-        if self.nbr_of_mems - 1 >= self._fetch_id:
-            logger.debug('Requesting information about memory {}'.format(self._fetch_id))
-            pk = CRTPPacket()
-            pk.set_header(CRTPPort.MEM, CHAN_INFO)
-            pk.data = (CMD_INFO_DETAILS, self._fetch_id)
-            self.cf.send_packet(pk, expected_reply=(CMD_INFO_DETAILS, self._fetch_id))
-        else:
-            logger.debug('Done getting all the memories, start reading the OWs')
-            ows = self.get_mems(MemoryElement.TYPE_1W)
-            # If there are any OW mems start reading them, otherwise
-            # we are done
-            for ow_mem in ows:
-                ow_mem.update(self._mem_update_done)
-            if len(ows) == 0:
-                if self._refresh_callback:
-                    self._refresh_callback()
-                    self._clear_refresh_callbacks()
-
     def _handle_chan_write(self, cmd, payload):
         id = cmd
         (addr, status) = struct.unpack('<IB', payload[0:5])
         logger.debug('WRITE: Mem={}, addr=0x{:X}, status=0x{}'.format(id, addr, status))
+        do_call_success_cb = False
+        do_call_fail_cb = False
         # Find the write request
-        if id in self._write_requests:
-            self._write_requests_lock.acquire()
-            do_call_success_cb = False
-            do_call_fail_cb = False
-            wreq = self._write_requests[id][0]
+        with self._transfers.lock:
+            wreq = self._transfers.running(id, is_write=True)
+            if wreq is None:
+                return
+
             if status == 0:
-                if wreq.write_done(addr):
-                    # self._write_requests.pop(id, None)
-                    # Remove the first item
-                    self._write_requests[id].pop(0)
+                done = wreq.write_done(addr)
+                if done:
                     do_call_success_cb = True
-
-                    # Get a new one to start (if there are any)
-                    if len(self._write_requests[id]) > 0:
-                        self._write_requests[id][0].start()
+                    self._transfers.finish(wreq)
+                elif done is not None:
+                    self._transfers.pump()
             else:
                 logger.debug('Status {}: write failed.'.format(status))
-                # Remove from queue
-                self._write_requests[id].pop(0)
                 do_call_fail_cb = True
+                self._transfers.finish(wreq)
 
-                # Get a new one to start (if there are any)
-                if len(self._write_requests[id]) > 0:
-                    self._write_requests[id][0].start()
-
-            self._write_requests_lock.release()
-
-            # Call callbacks after the lock has been released to allow for new writes
-            # to be initiated from the callback.
-            if do_call_success_cb:
-                self.mem_write_cb.call(wreq.mem, wreq.addr)
-            if do_call_fail_cb:
-                self.mem_write_failed_cb.call(wreq.mem, wreq.addr)
+        # Call callbacks after the lock has been released to allow for new writes
+        # to be initiated from the callback.
+        if do_call_success_cb or do_call_fail_cb:
+            self._call_transfer_callbacks(wreq, success=do_call_success_cb)
 
     def _handle_chan_read(self, cmd, payload):
         id = cmd
         (addr, status) = struct.unpack('<IB', payload[0:5])
-        data = struct.unpack('B' * len(payload[5:]), payload[5:])
-        logger.debug('READ: Mem={}, addr=0x{:X}, status=0x{}, data={}'.format(id, addr, status, data))
+        logger.debug('READ: Mem={}, addr=0x{:X}, status=0x{}, data={}'.format(
+            id, addr, status, tuple(payload[5:])))
+        do_call_success_cb = False
+        do_call_fail_cb = False
         # Find the read request
-        if id in self._read_requests:
+        with self._transfers.lock:
+            rreq = self._transfers.running(id, is_write=False)
+            if rreq is None:
+                return
+
             logger.debug('READING: We are still interested in request for mem {}'.format(id))
-            rreq = self._read_requests[id]
             if status == 0:
-                if rreq.add_data(addr, payload[5:]):
-                    self._read_requests.pop(id, None)
-                    self.mem_read_cb.call(rreq.mem, rreq.addr, rreq.data)
+                done = rreq.add_data(addr, payload[5:])
+                if done:
+                    do_call_success_cb = True
+                    self._transfers.finish(rreq)
+                elif done is not None:
+                    self._transfers.pump()
             else:
                 logger.debug('Status {}: read failed.'.format(status))
-                self._read_requests.pop(id, None)
-                self.mem_read_failed_cb.call(rreq.mem, rreq.addr, rreq.data)
+                do_call_fail_cb = True
+                self._transfers.finish(rreq)
+
+        if do_call_success_cb or do_call_fail_cb:
+            self._call_transfer_callbacks(rreq, success=do_call_success_cb)
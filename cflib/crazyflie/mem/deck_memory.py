@@ -21,6 +21,7 @@
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 import logging
 import struct
+import time
 
 from .memory_element import MemoryElement
 from cflib.utils.callbacks import Syncer
@@ -174,6 +175,135 @@ class DeckMemory:
         return syncer.is_success
 
 
+class DeckUpload:
+    """
+    A resumable write of a block of data, typically a firmware, to a deck.
+
+    The data is written in blocks of block_size bytes and the offset of the
+    last acknowledged block is kept as a checkpoint. A failed upload is
+    resumed from the checkpoint by calling write() again, also with a new
+    DeckMemory instance after a reconnect.
+
+    If skip_matching is set, and the deck supports reads, each block is
+    read back before it is written and blocks that already contain the data
+    are skipped.
+    """
+
+    BLOCK_SIZE = 4096
+
+    def __init__(self, address, data, skip_matching=False, block_size=BLOCK_SIZE):
+        self.address = address
+        self.data = memoryview(bytes(data))
+        self.skip_matching = skip_matching
+        self.block_size = block_size
+
+        # Number of bytes from the start of the data that are known to be written
+        self.offset = 0
+        self.bytes_written = 0
+        self.bytes_skipped = 0
+
+        self._deck = None
+        self._complete_cb = None
+        self._failed_cb = None
+        self._progress_cb = None
+        self._skip = False
+        self._start_time = 0
+        self._start_offset = 0
+
+    @property
+    def is_done(self):
+        return self.offset >= len(self.data)
+
+    def write(self, deck, write_complete_cb, write_failed_cb=None, progress_cb=None):
+        """
+        Write the data from the checkpoint and on
+
+        @param deck The DeckMemory to write to
+        @param write_complete_cb Called with the address when all data is written
+        @param write_failed_cb Called with the address of the checkpoint on failure
+        @param progress_cb Called with a message, including the throughput and
+                           the estimated time left, and the percentage done
+        """
+        if not deck.supports_write:
+            raise Exception('Deck does not support write operations')
+        if not deck.is_started:
+            raise Exception('Deck not ready')
+
+        self._deck = deck
+        self._complete_cb = write_complete_cb
+        self._failed_cb = write_failed_cb
+        self._progress_cb = progress_cb
+        self._skip = self.skip_matching and deck.supports_read
+        self._start_time = time.time()
+        self._start_offset = self.offset
+
+        self._next_block()
+
+    def write_sync(self, deck, progress_cb=None):
+        """Write the data from the checkpoint and on, block until done"""
+        syncer = Syncer()
+        self.write(deck, syncer.success_cb, write_failed_cb=syncer.failure_cb, progress_cb=progress_cb)
+        syncer.wait()
+        return syncer.is_success
+
+    def _block(self):
+        return self.data[self.offset:self.offset + self.block_size]
+
+    def _next_block(self):
+        if self.is_done:
+            self._report_progress(len(self.data))
+            self._complete_cb(self.address)
+            return
+
+        manager = self._deck._deck_memory_manager
+        mapped_address = self._deck._base_address + self.address + self.offset
+        if self._skip:
+            manager.mem_handler.read(manager, mapped_address, len(self._block()), read_cb=self._block_read,
+                                     read_failed_cb=self._block_failed)
+        else:
+            manager.mem_handler.write(manager, mapped_address, self._block(), write_cb=self._block_written,
+                                      write_failed_cb=self._block_failed, progress_cb=self._block_progress)
+
+    def _block_read(self, mem, addr, data):
+        block = self._block()
+        if data == block:
+            self.bytes_skipped += len(block)
+            self.offset += len(block)
+            self._report_progress(self.offset)
+            self._next_block()
+        else:
+            manager = self._deck._deck_memory_manager
+            manager.mem_handler.write(manager, addr, block, write_cb=self._block_written,
+                                      write_failed_cb=self._block_failed, progress_cb=self._block_progress)
+
+    def _block_written(self, mem, addr):
+        length = len(self._block())
+        self.bytes_written += length
+        self.offset += length
+        self._report_progress(self.offset)
+        self._next_block()
+
+    def _block_failed(self, mem, addr, data=None):
+        logger.debug('Deck upload failed at offset 0x{:X}'.format(self.offset))
+        if self._failed_cb is not None:
+            self._failed_cb(self.address + self.offset)
+
+    def _block_progress(self, message, percent):
+        self._report_progress(self.offset + len(self._block()) * percent // 100)
+
+    def _report_progress(self, done):
+        if self._progress_cb is None:
+            return
+
+        elapsed = time.time() - self._start_time
+        rate = (done - self._start_offset) / elapsed if elapsed > 0 else 0.0
+        message = 'Writing to {} deck memory, {:.1f} kB/s'.format(self._deck.name, rate / 1000)
+        if rate > 0:
+            message += ', ETA {:.0f} s'.format((len(self.data) - done) / rate)
+        percent = 100 * done // len(self.data) if len(self.data) > 0 else 100
+        self._progress_cb(message, int(percent))
+
+
 class DeckMemoryManager(MemoryElement):
     """
     Manager interface for deck memories. It is used to query
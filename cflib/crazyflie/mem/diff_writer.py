@@ -0,0 +1,217 @@
+# -*- coding: utf-8 -*-
+#
+# ,---------,       ____  _ __
+# |  ,-^-,  |      / __ )(_) /_______________ _____  ___
+# | (  O  ) |     / __  / / __/ ___/ ___/ __ `/_  / / _ \
+# | / ,--'  |    / /_/ / / /_/ /__/ /  / /_/ / / /_/  __/
+#    +------`   /_____/_/\__/\___/_/   \__,_/ /___/\___/
+#
+# Copyright (C) 2026 Bitcraze AB
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, in version 3.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+Differential writes to memories. The data to write is compared to the
+current content of the memory, block by block, and only the blocks that
+differ are written.
+"""
+import logging
+from collections import namedtuple
+
+from cflib.utils.callbacks import Syncer
+
+__author__ = 'Bitcraze AB'
+__all__ = ['DiffWriter', 'DiffWriteResult']
+
+logger = logging.getLogger(__name__)
+
+
+class DiffWriteResult(namedtuple('DiffWriteResult', 'bytes_total bytes_written')):
+    """Statistics for one or more differential writes"""
+
+    @property
+    def bytes_saved(self):
+        return max(0, self.bytes_total - self.bytes_written)
+
+    def __add__(self, other):
+        return DiffWriteResult(self.bytes_total + other.bytes_total, self.bytes_written + other.bytes_written)
+
+
+class DiffWriter:
+    """
+    Writes data to a memory, only writing the blocks that differ from the
+    current content. The current content is either supplied by the caller,
+    for instance the data that was last uploaded, or read back from the
+    Crazyflie. The written data is verified with a read back and blocks that
+    still differ are written again.
+    """
+
+    DEFAULT_BLOCK_SIZE = 24
+    MAX_RETRIES = 2
+
+    def __init__(self, memory, block_size=DEFAULT_BLOCK_SIZE):
+        self._memory = memory
+        self._block_size = block_size
+
+        # Accumulated statistics for all writes
+        self.total = DiffWriteResult(0, 0)
+
+        self._done_cb = None
+        self._failed_cb = None
+
+    def write(self, addr, data, done_cb, failed_cb=None, reference=None, verify=True):
+        """
+        Write data to the memory at addr.
+
+        @param done_cb Called with a DiffWriteResult when done
+        @param failed_cb Called with a DiffWriteResult if the write failed
+        @param reference The expected current content of the memory, it is
+                         read back from the Crazyflie if not supplied
+        @param verify Read back the memory and compare after writing
+        """
+        if self._done_cb is not None:
+            raise Exception('Diff write ongoing')
+
+        self._addr = addr
+        self._data = bytes(data)
+        self._verify = verify
+        self._done_cb = done_cb
+        self._failed_cb = failed_cb
+        self._bytes_written = 0
+        self._retries = 0
+
+        if reference is None:
+            # The read back content is known to be correct, only written
+            # ranges must be verified
+            self._reference_is_trusted = True
+            self._memory.mem_handler.read(self._memory, addr, len(self._data),
+                                          read_cb=self._reference_read, read_failed_cb=self._read_failed)
+        else:
+            if len(reference) != len(self._data):
+                raise ValueError('Reference and data must be of the same length')
+            self._reference_is_trusted = False
+            self._write_changes(reference)
+
+    def write_sync(self, addr, data, reference=None, verify=True):
+        """
+        Same as write() but blocks until done. Returns a DiffWriteResult or
+        None if the write failed
+        """
+        syncer = Syncer()
+        self.write(addr, data, syncer.success_cb, failed_cb=syncer.failure_cb, reference=reference, verify=verify)
+        syncer.wait()
+        if syncer.is_success:
+            return syncer.success_args[0]
+        return None
+
+    def changed_ranges(self, reference):
+        """
+        Get the (start, end) offsets of the ranges that differ from the
+        reference, in whole blocks and with adjacent blocks merged
+        """
+        ranges = []
+        data = memoryview(self._data)
+        reference = memoryview(bytes(reference))
+        for start in range(0, len(data), self._block_size):
+            end = min(start + self._block_size, len(data))
+            if data[start:end] != reference[start:end]:
+                if len(ranges) > 0 and ranges[-1][1] == start:
+                    ranges[-1] = (ranges[-1][0], end)
+                else:
+                    ranges.append((start, end))
+        return ranges
+
+    def _reference_read(self, mem, addr, data):
+        self._write_changes(data)
+
+    def _write_changes(self, reference):
+        self._written_ranges = self.changed_ranges(reference)
+        self._writes_left = len(self._written_ranges)
+        self._write_error = False
+
+        if self._writes_left == 0:
+            self._written()
+            return
+
+        for start, end in self._written_ranges:
+            self._bytes_written += end - start
+            self._memory.mem_handler.write(self._memory, self._addr + start, self._data[start:end],
+                                           write_cb=self._range_written, write_failed_cb=self._write_failed)
+
+    def _range_written(self, mem, addr):
+        self._writes_left -= 1
+        if self._writes_left == 0:
+            if self._write_error:
+                self._finish(False)
+            else:
+                self._written()
+
+    def _written(self):
+        if not self._verify:
+            self._finish(True)
+            return
+
+        if self._reference_is_trusted:
+            if len(self._written_ranges) == 0:
+                self._finish(True)
+                return
+            start = self._written_ranges[0][0]
+            end = self._written_ranges[-1][1]
+        else:
+            start = 0
+            end = len(self._data)
+
+        self._verify_start = start
+        self._memory.mem_handler.read(self._memory, self._addr + start, end - start,
+                                      read_cb=self._verify_read, read_failed_cb=self._read_failed)
+
+    def _verify_read(self, mem, addr, data):
+        start = self._verify_start
+        end = start + len(data)
+        if data == self._data[start:end]:
+            self._finish(True)
+            return
+
+        self._retries += 1
+        if self._retries > self.MAX_RETRIES:
+            logger.warning('Verification of diff write failed at 0x{:X}'.format(addr))
+            self._finish(False)
+            return
+
+        # The rest of the memory is now known to be correct
+        reference = bytearray(self._data)
+        reference[start:end] = data
+        self._reference_is_trusted = True
+        self._write_changes(reference)
+
+    def _read_failed(self, mem, addr, data):
+        self._finish(False)
+
+    def _write_failed(self, mem, addr):
+        # Wait for all queued writes before reporting
+        self._write_error = True
+        self._range_written(mem, addr)
+
+    def _finish(self, success):
+        result = DiffWriteResult(len(self._data), self._bytes_written)
+        self.total += result
+        logger.debug('Diff write of {} bytes, {} bytes saved'.format(result.bytes_total, result.bytes_saved))
+
+        done_cb = self._done_cb
+        failed_cb = self._failed_cb
+        self._done_cb = None
+        self._failed_cb = None
+
+        if success:
+            done_cb(result)
+        elif failed_cb is not None:
+            failed_cb(result)
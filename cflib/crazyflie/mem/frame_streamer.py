@@ -0,0 +1,230 @@
+# -*- coding: utf-8 -*-
+#
+# ,---------,       ____  _ __
+# |  ,-^-,  |      / __ )(_) /_______________ _____  ___
+# | (  O  ) |     / __  / / __/ ___/ ___/ __ `/_  / / _ \
+# | / ,--'  |    / /_/ / / /_/ /__/ /  / /_/ / / /_/  __/
+#    +------`   /_____/_/\__/\___/_/   \__,_/ /___/\___/
+#
+# Copyright (C) 2026 Bitcraze AB
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, in version 3.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+Continuous reads of a memory into a ring buffer of frames, for instance
+images from the PAA3905 sensor.
+"""
+import logging
+import time
+from threading import Event
+from threading import Lock
+from threading import Thread
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class FrameStreamer:
+    """
+    Reads a memory over and over and stores every read as a frame in a
+    preallocated ring buffer of numpy arrays.
+
+    The reads are double buffered: two reads are kept queued in the memory
+    subsystem, so the next frame is read from the Crazyflie while the
+    previous one is copied to the ring buffer and handed to the frame
+    callback.
+
+    By default frames are read as fast as the link allows. If a rate is set
+    the reads are instead started at that rate, a read is skipped if the
+    previous reads have not completed.
+    """
+
+    DEFAULT_FRAMES = 16
+    READ_BUFFERS = 2
+
+    def __init__(self, mem, shape, dtype=np.uint8, frames=DEFAULT_FRAMES, addr=0x00, frame_cb=None, rate=None):
+        """
+        @param mem The memory element to read from
+        @param shape The shape of one frame
+        @param dtype The type of the frame elements, including the byte
+                     order used by the Crazyflie
+        @param frames Number of frames in the ring buffer
+        @param addr The address of the frame in the memory
+        @param frame_cb Called with (streamer, frame) for every new frame,
+                        frame is a view into the ring buffer
+        @param rate Target frame rate in Hz, None to read as fast as possible
+        """
+        self._mem = mem
+        self._addr = addr
+        self._frame_cb = frame_cb
+        self._period = 1.0 / rate if rate else None
+        self._pacer = None
+        self._stop_event = Event()
+
+        self.frames = np.zeros((frames,) + tuple(shape), dtype=dtype)
+        self.timestamps = np.zeros(frames)
+        self._frame_size = self.frames[0].nbytes
+
+        self._read_buffers = [bytearray(self._frame_size) for _ in range(self.READ_BUFFERS)]
+        # Frame views of the read buffers, keyed by buffer id
+        self._read_views = {id(buffer): np.frombuffer(buffer, dtype=dtype).reshape(shape)
+                            for buffer in self._read_buffers}
+        self._next_buffer = 0
+
+        self._lock = Lock()
+        self._streaming = False
+        self._reads_queued = 0
+
+        # Number of frames received and number of failed reads since start()
+        self.frame_count = 0
+        self.dropped_frames = 0
+        # Number of reads not started at the target rate since start()
+        self.skipped_reads = 0
+
+    @property
+    def streaming(self):
+        return self._streaming
+
+    @property
+    def fps(self):
+        """The frame rate over the frames in the ring buffer"""
+        with self._lock:
+            count = min(self.frame_count, len(self.frames))
+            if count < 2:
+                return 0.0
+            newest = (self.frame_count - 1) % len(self.frames)
+            oldest = (self.frame_count - count) % len(self.frames)
+            duration = self.timestamps[newest] - self.timestamps[oldest]
+            if duration <= 0:
+                return 0.0
+            return (count - 1) / duration
+
+    def start(self):
+        """Start reading frames"""
+        with self._lock:
+            if self._streaming:
+                return
+            self._streaming = True
+            self.frame_count = 0
+            self.dropped_frames = 0
+            self.skipped_reads = 0
+            self._mem.mem_handler.cf.disconnected.add_callback(self._disconnected)
+
+            if self._period is None:
+                while self._reads_queued < self.READ_BUFFERS:
+                    self._read()
+            else:
+                self._stop_event.clear()
+                self._pacer = Thread(target=self._pace, daemon=True)
+                self._pacer.start()
+
+    def stop(self):
+        """Stop reading frames, reads that are already queued are completed"""
+        with self._lock:
+            self._streaming = False
+            self._stop_event.set()
+            pacer = self._pacer
+            self._pacer = None
+
+        if pacer is not None:
+            pacer.join()
+
+    def latest(self, out=None):
+        """
+        The latest frame, None if there is none
+
+        @param out Array to copy the frame to. If not set a view into the ring
+                   buffer is returned, it is overwritten when the ring buffer
+                   wraps.
+        """
+        with self._lock:
+            if self.frame_count == 0:
+                return None
+            frame = self.frames[(self.frame_count - 1) % len(self.frames)]
+            if out is None:
+                return frame
+            np.copyto(out, frame)
+            return out
+
+    def get_frames(self, out=None):
+        """
+        Copy the frames in the ring buffer, oldest first
+
+        @param out Array to copy to, must be large enough for all frames
+        @return The frames, an array of up to the ring buffer size of frames
+        """
+        with self._lock:
+            count = min(self.frame_count, len(self.frames))
+            order = np.arange(self.frame_count - count, self.frame_count) % len(self.frames)
+            if out is not None:
+                out = out[:count]
+            return np.take(self.frames, order, axis=0, out=out)
+
+    def _read(self):
+        """Queue a read of the next frame, called with the lock held"""
+        buffer = self._read_buffers[self._next_buffer]
+        self._next_buffer = (self._next_buffer + 1) % len(self._read_buffers)
+        self._reads_queued += 1
+        self._mem.mem_handler.read(self._mem, self._addr, self._frame_size, read_cb=self._read_done,
+                                   read_failed_cb=self._read_failed, buffer=buffer)
+
+    def _read_done(self, mem, addr, data):
+        with self._lock:
+            self._reads_queued -= 1
+            index = self.frame_count % len(self.frames)
+            self.frames[index] = self._read_views[id(data)]
+            self.timestamps[index] = time.time()
+            self.frame_count += 1
+            frame = self.frames[index]
+
+            # The read buffer has been copied and can be reused
+            if self._streaming and self._period is None:
+                self._read()
+
+        if self._frame_cb:
+            self._frame_cb(self, frame)
+
+    def _read_failed(self, mem, addr, data):
+        with self._lock:
+            self._reads_queued -= 1
+            self.dropped_frames += 1
+            logger.debug('Frame read failed, {} dropped frames'.format(self.dropped_frames))
+            if self._streaming and self._period is None:
+                self._read()
+
+    def _pace(self):
+        """Start reads at the target rate, runs in the pacer thread"""
+        next_time = time.time()
+        while not self._stop_event.is_set():
+            with self._lock:
+                if not self._streaming:
+                    break
+                if self._reads_queued < self.READ_BUFFERS:
+                    self._read()
+                else:
+                    self.skipped_reads += 1
+
+            next_time += self._period
+            now = time.time()
+            if next_time < now:
+                # Do not try to catch up after a stall
+                next_time = now
+            self._stop_event.wait(next_time - now)
+
+    def _disconnected(self, uri):
+        with self._lock:
+            self._streaming = False
+            self._stop_event.set()
+            # The memory subsystem drops all queued reads
+            self._reads_queued = 0
+            self._mem.mem_handler.cf.disconnected.remove_callback(self._disconnected)
@@ -20,6 +20,9 @@
 # You should have received a copy of the GNU General Public License
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 import logging
+import time
+from collections import deque
+from threading import Lock
 
 from .memory_element import MemoryElement
 
@@ -69,8 +72,13 @@ class LEDDriverMemory(MemoryElement):
     def write_data(self, write_finished_cb):
         """Write the saved LED-ring data to the Crazyflie"""
         self._write_finished_cb = write_finished_cb
+        self.mem_handler.write(self, 0x00, self.pack_leds(self.leds), flush_queue=True)
+
+    @staticmethod
+    def pack_leds(leds):
+        """Pack LEDs to the format used in the memory"""
         data = bytearray()
-        for led in self.leds:
+        for led in leds:
             # In order to fit all the LEDs in one radio packet RGB565 is used
             # to compress the colors. The calculations below converts 3 bytes
             # RGB into 2 bytes RGB565. Then shifts the value of each color to
@@ -84,7 +92,11 @@ class LEDDriverMemory(MemoryElement):
                   led.intensity / 100)
             tmp = (int(R5) << 11) | (int(G6) << 5) | (int(B5) << 0)
             data += bytearray((tmp >> 8, tmp & 0xFF))
-        self.mem_handler.write(self, 0x00, data, flush_queue=True)
+        return data
+
+    def frame_streamer(self):
+        """Create a LEDFrameStreamer for animations on this LED ring"""
+        return LEDFrameStreamer(self)
 
     def update(self, update_finished_cb):
         """Request an update of the memory content"""
@@ -104,3 +116,111 @@ class LEDDriverMemory(MemoryElement):
     def disconnect(self):
         self._update_finished_cb = None
         self._write_finished_cb = None
+
+
+class LEDFrameStreamer:
+    """
+    Streams animation frames to the LED ring.
+
+    Only one write is in flight at the time. A frame that is submitted
+    while a write is ongoing replaces any frame that is waiting, so a
+    congested link shows the latest frame instead of falling behind. Each
+    frame is compared to the last one that was written and only the span of
+    bytes that changed is written, unchanged frames are not written at all.
+    """
+
+    # Number of frames used to calculate the frame rate
+    FPS_FRAMES = 32
+
+    def __init__(self, led_mem):
+        self._led_mem = led_mem
+        self._lock = Lock()
+
+        self._written = None
+        self._pending = None
+        self._in_flight = None
+        self._timestamps = deque(maxlen=self.FPS_FRAMES)
+
+        # Number of frames shown, replaced before being written and failed
+        self.frames_shown = 0
+        self.frames_dropped = 0
+        self.frames_failed = 0
+        self.bytes_written = 0
+
+    @property
+    def fps(self):
+        """The rate of shown frames over the last FPS_FRAMES frames"""
+        with self._lock:
+            if len(self._timestamps) < 2:
+                return 0.0
+            duration = self._timestamps[-1] - self._timestamps[0]
+            if duration <= 0:
+                return 0.0
+            return (len(self._timestamps) - 1) / duration
+
+    def submit(self, frame):
+        """
+        Show a frame on the LED ring
+
+        @param frame A list of LED instances, or the data packed by
+                     LEDDriverMemory.pack_leds()
+        """
+        if len(frame) > 0 and isinstance(frame[0], LED):
+            frame = LEDDriverMemory.pack_leds(frame)
+        else:
+            frame = bytes(frame)
+
+        with self._lock:
+            if self._pending is not None:
+                self.frames_dropped += 1
+            self._pending = frame
+            if self._in_flight is None:
+                self._write_next()
+
+    def _write_next(self):
+        """Write the pending frame, called with the lock held"""
+        while self._pending is not None:
+            frame = self._pending
+            self._pending = None
+
+            start, end = self._changed_span(frame)
+            if start == end:
+                # Nothing has changed, the frame is already shown
+                self._frame_shown()
+                continue
+
+            self._in_flight = frame
+            self.bytes_written += end - start
+            self._led_mem.mem_handler.write(self._led_mem, start, frame[start:end], write_cb=self._write_done,
+                                            write_failed_cb=self._write_failed)
+            return
+
+    def _changed_span(self, frame):
+        """The span of bytes that differ from the last written frame"""
+        if self._written is None or len(self._written) != len(frame):
+            return 0, len(frame)
+
+        changed = [i for i in range(len(frame)) if frame[i] != self._written[i]]
+        if len(changed) == 0:
+            return 0, 0
+        return changed[0], changed[-1] + 1
+
+    def _frame_shown(self):
+        self.frames_shown += 1
+        self._timestamps.append(time.time())
+
+    def _write_done(self, mem, addr):
+        with self._lock:
+            self._written = self._in_flight
+            self._in_flight = None
+            self._frame_shown()
+            self._write_next()
+
+    def _write_failed(self, mem, addr):
+        with self._lock:
+            logger.debug('LED frame write failed')
+            # The content of the memory is not known, write the full next frame
+            self._written = None
+            self._in_flight = None
+            self.frames_failed += 1
+            self._write_next()
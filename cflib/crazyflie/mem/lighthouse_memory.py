@@ -22,6 +22,7 @@
 import logging
 import struct
 
+from .diff_writer import DiffWriter
 from .memory_element import MemoryElement
 
 logger = logging.getLogger(__name__)
@@ -236,6 +237,10 @@ class LighthouseMemory(MemoryElement):
     NUMBER_OF_BASESTATIONS = 2
     SIZE_GEOMETRY_ALL = NUMBER_OF_BASESTATIONS * \
         LighthouseBsGeometry.SIZE_GEOMETRY
+    # The uid and valid flag of a calibration, used as validity token when
+    # calibration data is cached
+    CALIB_TOKEN_OFFSET = 2 * LighthouseBsCalibration.SIZE_SWEEP
+    CALIB_TOKEN_SIZE = LighthouseBsCalibration.SIZE_UINT_32 + LighthouseBsCalibration.SIZE_BOOL
 
     def __init__(self, id, type, size, mem_handler):
         """Initialize Lighthouse memory"""
@@ -245,10 +250,23 @@ class LighthouseMemory(MemoryElement):
         self._clear_update_cb()
         self._clear_write_cb()
 
+        self.diff_writer = DiffWriter(self)
+
     def new_data(self, mem, addr, data):
         """Callback for when new memory data has been fetched"""
         if mem.id == self.id:
+            if self._is_calib_token_addr(addr):
+                calib_addr = addr - self.CALIB_TOKEN_OFFSET
+                cached = self.mem_handler.cache.fetch(self._calib_cache_key(data), data)
+                if cached is None:
+                    self._calib_token = bytes(data)
+                    self.mem_handler.read(self, calib_addr, LighthouseBsCalibration.SIZE_CALIBRATION)
+                    return
+                addr = calib_addr
+                data = cached
+
             tmp_update_finished_cb = self._update_finished_cb
+            tmp_calib_token = self._calib_token
             self._clear_update_cb()
 
             if addr < self.CALIB_START_ADDR:
@@ -260,6 +278,8 @@ class LighthouseMemory(MemoryElement):
             else:
                 calibration_data = LighthouseBsCalibration()
                 calibration_data.set_from_mem_data(data)
+                if tmp_calib_token is not None and calibration_data.valid:
+                    self.mem_handler.cache.insert(self._calib_cache_key(tmp_calib_token), tmp_calib_token, data)
 
                 if tmp_update_finished_cb:
                     tmp_update_finished_cb(self, calibration_data)
@@ -291,13 +311,20 @@ class LighthouseMemory(MemoryElement):
             raise Exception('Read operation already ongoing')
         self._update_finished_cb = update_finished_cb
         self._update_failed_cb = update_failed_cb
-        self.mem_handler.read(self, self.CALIB_START_ADDR + bs_id *
-                              self.PAGE_SIZE,
-                              LighthouseBsCalibration.SIZE_CALIBRATION)
+        calib_addr = self.CALIB_START_ADDR + bs_id * self.PAGE_SIZE
+        if self.mem_handler.cache.enabled:
+            # Read the uid first, the calibration might be in the cache
+            self.mem_handler.read(self, calib_addr + self.CALIB_TOKEN_OFFSET, self.CALIB_TOKEN_SIZE)
+        else:
+            self.mem_handler.read(self, calib_addr, LighthouseBsCalibration.SIZE_CALIBRATION)
 
     def write_geo_data(self, bs_id, geo_data, write_finished_cb,
-                       write_failed_cb=None):
-        """Write geometry data for one base station to the Crazyflie"""
+                       write_failed_cb=None, diff=False):
+        """
+        Write geometry data for one base station to the Crazyflie. If diff is
+        True only the parts that differ from the data in the Crazyflie are
+        written, see DiffWriter.
+        """
         if self._write_finished_cb:
             raise Exception('Write operation already ongoing.')
         data = bytearray()
@@ -305,19 +332,33 @@ class LighthouseMemory(MemoryElement):
         self._write_finished_cb = write_finished_cb
         self._write_failed_cb = write_failed_cb
         geo_addr = self.GEO_START_ADDR + bs_id * self.PAGE_SIZE
-        self.mem_handler.write(self, geo_addr, data, flush_queue=True)
+        self._write(geo_addr, data, diff)
 
     def write_calib_data(self, bs_id, calibration_data, write_finished_cb,
-                         write_failed_cb=None):
-        """Write calibration data for one basestation to the Crazyflie"""
+                         write_failed_cb=None, diff=False):
+        """
+        Write calibration data for one basestation to the Crazyflie. If diff
+        is True only the parts that differ from the data in the Crazyflie are
+        written, see DiffWriter.
+        """
         if self._write_finished_cb:
             raise Exception('Write operation already ongoing.')
         data = bytearray()
         calibration_data.add_mem_data(data)
+        self.mem_handler.cache.invalidate(
+            self._calib_cache_key(data[self.CALIB_TOKEN_OFFSET:self.CALIB_TOKEN_OFFSET + self.CALIB_TOKEN_SIZE]))
         self._write_finished_cb = write_finished_cb
         self._write_failed_cb = write_failed_cb
         calib_addr = self.CALIB_START_ADDR + bs_id * self.PAGE_SIZE
-        self.mem_handler.write(self, calib_addr, data, flush_queue=True)
+        self._write(calib_addr, data, diff)
+
+    def _write(self, addr, data, diff):
+        if diff:
+            self.diff_writer.write(addr, data,
+                                   lambda result: self.write_done(self, addr),
+                                   failed_cb=lambda result: self.write_failed(self, addr))
+        else:
+            self.mem_handler.write(self, addr, data, flush_queue=True)
 
     def _write_data_list(self, addr, data_list):
         data = bytearray()
@@ -344,9 +385,19 @@ class LighthouseMemory(MemoryElement):
         self._clear_update_cb()
         self._clear_write_cb()
 
+    def _is_calib_token_addr(self, addr):
+        return addr >= self.CALIB_START_ADDR and \
+            (addr - self.CALIB_START_ADDR) % self.PAGE_SIZE == self.CALIB_TOKEN_OFFSET
+
+    def _calib_cache_key(self, token):
+        """Calibration data is unique for each base station, use the uid as key"""
+        uid, valid = struct.unpack('<L?', token)
+        return self.mem_handler.cache.make_key('lh-calib', '{:08X}'.format(uid))
+
     def _clear_update_cb(self):
         self._update_finished_cb = None
         self._update_failed_cb = None
+        self._calib_token = None
 
     def _clear_write_cb(self):
         self._write_finished_cb = None
@@ -410,12 +461,14 @@ class LighthouseMemHelper:
             self._write_done_cb = None
             self._write_failed_for_one_or_more_objects = False
             self._write_fcn = write_fcn
+            self._diff = False
 
-        def write(self, object_dict, write_done_cb):
+        def write(self, object_dict, write_done_cb, diff=False):
             if self._objects_to_write is not None:
                 raise Exception('Write operation not finished')
 
             self._write_done_cb = write_done_cb
+            self._diff = diff
             # Make a copy of the dictionary
             self._objects_to_write = dict(object_dict)
             self._write_failed_for_one_or_more_objects = False
@@ -425,7 +478,7 @@ class LighthouseMemHelper:
             if len(self._objects_to_write) > 0:
                 id = list(self._objects_to_write.keys())[0]
                 data = self._objects_to_write.pop(id)
-                self._write_fcn(id, data, self._data_written, write_failed_cb=self._write_failed)
+                self._write_fcn(id, data, self._data_written, write_failed_cb=self._write_failed, diff=self._diff)
             else:
                 tmp_cb = self._write_done_cb
                 is_success = not self._write_failed_for_one_or_more_objects
@@ -453,6 +506,7 @@ class LighthouseMemHelper:
             raise Exception('Unexpected nr of memories found:', count)
 
         lh_mem = mems[0]
+        self._lh_mem = lh_mem
 
         self.geo_reader = self._ObjectReader(lh_mem.read_geo_data)
         self.geo_writer = self._ObjectWriter(lh_mem.write_geo_data)
@@ -468,14 +522,16 @@ class LighthouseMemHelper:
         """
         self.geo_reader.read_all(read_done_cb)
 
-    def write_geos(self, geometry_dict, write_done_cb):
+    def write_geos(self, geometry_dict, write_done_cb, diff=False):
         """
         Write geometry data for one or more base stations. Input is
         a dictionary keyed on base station channel (0-indexed) with
         geometry data as values. The callback is called with a boolean
         indicating if all items were successfully written.
+        If diff is True, only data that differs from the data in the
+        Crazyflie is written.
         """
-        self.geo_writer.write(geometry_dict, write_done_cb)
+        self.geo_writer.write(geometry_dict, write_done_cb, diff=diff)
 
     def read_all_calibs(self, read_done_cb):
         """
@@ -485,11 +541,18 @@ class LighthouseMemHelper:
         """
         self.calib_reader.read_all(read_done_cb)
 
-    def write_calibs(self, calibration_dict, write_done_cb):
+    def write_calibs(self, calibration_dict, write_done_cb, diff=False):
         """
         Write calibration data for one or more base stations. Input is
         a dictionary keyed on base station channel (0-indexed) with
         calibration data as values. The callback is called with a boolean
         indicating if all items were successfully written.
+        If diff is True, only data that differs from the data in the
+        Crazyflie is written.
         """
-        self.calib_writer.write(calibration_dict, write_done_cb)
+        self.calib_writer.write(calibration_dict, write_done_cb, diff=diff)
+
+    @property
+    def diff_write_stats(self):
+        """Accumulated DiffWriteResult for all diff writes"""
+        return self._lh_mem.diff_writer.total
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+#
+# ,---------,       ____  _ __
+# |  ,-^-,  |      / __ )(_) /_______________ _____  ___
+# | (  O  ) |     / __  / / __/ ___/ ___/ __ `/_  / / _ \
+# | / ,--'  |    / /_/ / / /_/ /__/ /  / /_/ / / /_/  __/
+#    +------`   /_____/_/\__/\___/_/   \__,_/ /___/\___/
+#
+# Copyright (C) 2026 Bitcraze AB
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, in version 3.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+Persistent cache for memory contents that rarely change, for instance deck
+1-wire memories and lighthouse base station calibrations. Entries are stored
+with a validity token that is cheap to read from the Crazyflie, a cached
+entry is only used if the token read from the Crazyflie matches.
+"""
+import hashlib
+import json
+import logging
+import os
+from glob import glob
+
+__author__ = 'Bitcraze AB'
+__all__ = ['MemoryCache']
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryCache:
+    """
+    Access to the memory content cache. To turn off the cache functionality
+    don't supply any directories. The entries are stored in a 'mem'
+    sub directory of the cache directories.
+    """
+
+    SUB_DIR = 'mem'
+
+    def __init__(self, ro_cache=None, rw_cache=None):
+        self._entries = {}
+        self._rw_cache = None
+
+        for cache_dir in (ro_cache, rw_cache):
+            if cache_dir:
+                for name in glob(os.path.join(cache_dir, self.SUB_DIR, '*.json')):
+                    self._load(name)
+
+        if rw_cache:
+            self._rw_cache = os.path.join(rw_cache, self.SUB_DIR)
+            if not os.path.exists(self._rw_cache):
+                os.makedirs(self._rw_cache)
+
+        self.enabled = ro_cache is not None or rw_cache is not None
+
+    @staticmethod
+    def make_key(*parts):
+        """Build a key from for instance a serial, memory type and size"""
+        return '/'.join(str(part) for part in parts)
+
+    def fetch(self, key, token):
+        """
+        Get the cached data for a key if the token matches, return None
+        otherwise
+        """
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == bytes(token):
+            logger.debug('Memory cache hit for {}'.format(key))
+            return entry[1]
+
+        return None
+
+    def insert(self, key, token, data):
+        """Save data in the cache"""
+        if not self.enabled:
+            return
+
+        self._entries[key] = (bytes(token), bytes(data))
+
+        if self._rw_cache:
+            filename = self._filename(key)
+            try:
+                with open(filename, 'w') as cache:
+                    json.dump({'key': key, 'token': bytes(token).hex(), 'data': bytes(data).hex()}, cache)
+                logger.info('Saved memory cache to [%s]', filename)
+            except Exception as exp:
+                logger.warning('Could not save memory cache to file [%s]: %s', filename, str(exp))
+
+    def invalidate(self, key):
+        """Remove an entry, for instance when the memory is written"""
+        if self._entries.pop(key, None) is not None and self._rw_cache:
+            filename = self._filename(key)
+            if os.path.exists(filename):
+                os.remove(filename)
+
+    def _filename(self, key):
+        return os.path.join(self._rw_cache, '{}.json'.format(hashlib.sha1(key.encode()).hexdigest()))
+
+    def _load(self, name):
+        try:
+            with open(name) as cache:
+                entry = json.load(cache)
+            self._entries[entry['key']] = (bytes.fromhex(entry['token']), bytes.fromhex(entry['data']))
+        except Exception as exp:
+            logger.warning('Error while parsing memory cache file [%s]:%s', name, str(exp))
@@ -22,6 +22,7 @@
 import logging
 import struct
 
+from .frame_streamer import FrameStreamer
 from .memory_element import MemoryElement
 from cflib.utils.callbacks import Syncer
 
@@ -31,6 +32,8 @@ logger = logging.getLogger(__name__)
 class MultirangerMemory(MemoryElement):
     """Memory interface for reading the multiranger values"""
 
+    ZONES = 8
+
     def __init__(self, id, type, size, mem_handler):
         super(MultirangerMemory, self).__init__(id=id, type=type, size=size,
                                                 mem_handler=mem_handler)
@@ -61,6 +64,17 @@ class MultirangerMemory(MemoryElement):
         else:
             return None
 
+    def frame_streamer(self, frames=FrameStreamer.DEFAULT_FRAMES, rate=None, frame_cb=None):
+        """
+        Create a FrameStreamer that continuously reads the zone distances
+        (mm) into a (frames, 8, 8) uint16 ring buffer. Call start() on it to
+        start streaming.
+
+        @param rate Target frame rate in Hz, None to read as fast as possible
+        """
+        return FrameStreamer(self, (self.ZONES, self.ZONES), dtype='<u2', frames=frames, frame_cb=frame_cb,
+                             rate=rate)
+
     def read_failed(self, mem, addr, data):
         if mem.id == self.id:
             logger.debug('Read failed')
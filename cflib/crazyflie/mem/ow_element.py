@@ -53,6 +53,8 @@ class OWElement(MemoryElement):
 
         self._update_finished_cb = None
         self._write_finished_cb = None
+        self._cache_token = None
+        self._elements_crc_addr = None
 
         self._rev_element_mapping = {}
         for key in list(OWElement.element_mapping.keys()):
@@ -68,18 +70,42 @@ class OWElement(MemoryElement):
                         self._update_finished_cb(self)
                         self._update_finished_cb = None
                     else:
-                        # We need to fetch the elements, find out the length
                         (elem_ver, elem_len) = struct.unpack('BB', data[8:10])
-                        self.mem_handler.read(self, 8, elem_len + 3)
+                        if not self.mem_handler.cache.enabled:
+                            self._cache_token = None
+                            self.mem_handler.read(self, 8, elem_len + 3)
+                            return
+
+                        # The header and the CRC of the elements are used
+                        # as validity token for the cached elements, read
+                        # the CRC that ends the elements
+                        self._cache_token = bytes(data[0:11])
+                        self._elements_crc_addr = 10 + elem_len
+                        self.mem_handler.read(self, self._elements_crc_addr, 1)
                 else:
                     # Call the update if the CRC check of the header fails,
                     # we're done here
                     if self._update_finished_cb:
                         self._update_finished_cb(self)
                         self._update_finished_cb = None
+            elif addr == self._elements_crc_addr:
+                self._elements_crc_addr = None
+                self._cache_token += bytes(data[0:1])
+                cached = self.mem_handler.cache.fetch(self._cache_key(), self._cache_token)
+                if cached is not None and self._parse_and_check_elements(cached):
+                    self.valid = True
+                    self._update_finished_cb(self)
+                    self._update_finished_cb = None
+                    return
+
+                # We need to fetch the elements
+                elem_len = self._cache_token[9]
+                self.mem_handler.read(self, 8, elem_len + 3)
             elif addr == 0x08:
                 if self._parse_and_check_elements(data):
                     self.valid = True
+                    if self._cache_token is not None:
+                        self.mem_handler.cache.insert(self._cache_key(), self._cache_token, data)
                 if self._update_finished_cb:
                     self._update_finished_cb(self)
                     self._update_finished_cb = None
@@ -127,6 +153,7 @@ class OWElement(MemoryElement):
 
         data = header_data + elem_data
 
+        self.mem_handler.cache.invalidate(self._cache_key())
         self.mem_handler.write(self, 0x00,
                                struct.unpack('B' * len(data), data))
 
@@ -134,6 +161,7 @@ class OWElement(MemoryElement):
 
     def erase(self, write_finished_cb):
         erase_data = bytes([0xFF] * 112)
+        self.mem_handler.cache.invalidate(self._cache_key())
         self.mem_handler.write(self, 0x00,
                                struct.unpack('B' * len(erase_data),
                                              erase_data))
@@ -149,6 +177,10 @@ class OWElement(MemoryElement):
             # Start reading the header
             self.mem_handler.read(self, 0, 11)
 
+    def _cache_key(self):
+        """The 1-wire address is unique for each memory chip"""
+        return self.mem_handler.cache.make_key('ow', self.addr, self.size)
+
     def _parse_and_check_header(self, data):
         """Parse and check the CRC of the header part of the memory"""
         (start, self.pins, self.vid, self.pid, crc) = struct.unpack('<BIBBB',
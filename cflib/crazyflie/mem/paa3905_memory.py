@@ -21,6 +21,9 @@
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 import logging
 
+import numpy as np
+
+from .frame_streamer import FrameStreamer
 from .memory_element import MemoryElement
 from cflib.utils.callbacks import Syncer
 
@@ -28,7 +31,9 @@ logger = logging.getLogger(__name__)
 
 
 class PAA3905Memory(MemoryElement):
-    """Memory interface for reading the multiranger values"""
+    """Memory interface for reading images from the PAA3905 sensor"""
+
+    FRAME_SIZE = 35
 
     def __init__(self, id, type, size, mem_handler):
         super(PAA3905Memory, self).__init__(id=id, type=type, size=size,
@@ -38,7 +43,6 @@ class PAA3905Memory(MemoryElement):
     def new_data(self, mem, addr, data):
         """Callback for when new memory data has been fetched"""
         if mem.id == self.id and self._read_finished_cb:
-            print(len(data))
             image_matrix = []
             for i in range(35):
                 image_matrix.append(data[i*35:i*35+35])
@@ -60,6 +64,15 @@ class PAA3905Memory(MemoryElement):
         else:
             return None
 
+    def frame_streamer(self, frames=FrameStreamer.DEFAULT_FRAMES, frame_cb=None):
+        """
+        Create a FrameStreamer that continuously reads images into a
+        (frames, 35, 35) uint8 ring buffer. Call start() on it to start
+        streaming.
+        """
+        return FrameStreamer(self, (self.FRAME_SIZE, self.FRAME_SIZE), dtype=np.uint8, frames=frames,
+                             frame_cb=frame_cb)
+
     def read_failed(self, mem, addr, data):
         if mem.id == self.id:
             logger.debug('Read failed')
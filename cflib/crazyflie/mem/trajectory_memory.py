@@ -23,6 +23,9 @@ import logging
 import math
 import struct
 
+import numpy as np
+
+from .diff_writer import DiffWriter
 from .memory_element import MemoryElement
 from cflib.utils.callbacks import Syncer
 
@@ -41,16 +44,14 @@ class Poly4D:
         self.z = z if z else self.Poly()
         self.yaw = yaw if yaw else self.Poly()
 
-    def pack(self):
-        data = bytearray()
+    SIZE = 33 * 4
 
-        data += struct.pack('<ffffffff', *self.x.values)
-        data += struct.pack('<ffffffff', *self.y.values)
-        data += struct.pack('<ffffffff', *self.z.values)
-        data += struct.pack('<ffffffff', *self.yaw.values)
-        data += struct.pack('<f', self.duration)
-
-        return data
+    def pack(self):
+        for name, poly in (('x', self.x), ('y', self.y), ('z', self.z), ('yaw', self.yaw)):
+            if len(poly.values) != 8:
+                raise ValueError('{} must have 8 coefficients, not {}'.format(name, len(poly.values)))
+        return bytearray(struct.pack('<33f', *self.x.values, *self.y.values, *self.z.values, *self.yaw.values,
+                                     self.duration))
 
 
 class _CompressedBase:
@@ -144,12 +145,8 @@ class CompressedSegment(_CompressedBase):
             return 3
 
     def _pack_element(self, encoded_element):
-        data = bytearray()
-
-        for part in encoded_element:
-            data += struct.pack('<h', part)
-
-        return data
+        parts = list(encoded_element)
+        return struct.pack('<{}h'.format(len(parts)), *parts)
 
 
 class TrajectoryMemory(MemoryElement):
@@ -163,12 +160,84 @@ class TrajectoryMemory(MemoryElement):
         self._write_finished_cb = None
         self._write_failed_cb = None
 
+        self.diff_writer = DiffWriter(self)
+        # Statistics for the last diff write, see write_data()
+        self.diff_write_result = None
+
         # A list of trajectory elements to write to the Crazyflie. The elements can either be
         # Poly4D instances for uncompressed trajectories or one CompressedStart instance followed
         # by CompressedSegment instances. It is not possible to mix uncompressed and compressed
         # elements in the same trajectory.
         self.trajectory = []
 
+    @staticmethod
+    def pack_poly4d_array(durations, coefficients):
+        """
+        Pack an uncompressed trajectory from numpy arrays, the result is the
+        same as packing the corresponding Poly4D instances.
+
+        @param durations The duration of each segment, shape (segments,)
+        @param coefficients Polynomial coefficients for x, y, z and yaw,
+                            shape (segments, 4, 8)
+        @return The memory image as a bytearray
+        """
+        durations = np.asarray(durations, dtype=np.float64)
+        coefficients = np.asarray(coefficients, dtype=np.float64)
+        count = len(durations)
+        if coefficients.shape != (count, 4, 8):
+            raise ValueError('coefficients must have the shape (segments, 4, 8), not {}'.format(coefficients.shape))
+
+        data = bytearray(count * Poly4D.SIZE)
+        image = np.frombuffer(data, dtype='<f4').reshape(count, 33)
+        image[:, 0:32] = coefficients.reshape(count, 32)
+        image[:, 32] = durations
+        return data
+
+    @staticmethod
+    def pack_compressed_array(start, durations, elements):
+        """
+        Pack a compressed trajectory from numpy arrays, the result is the same
+        as packing a CompressedStart followed by the corresponding
+        CompressedSegment instances.
+
+        @param start The start position and yaw (x, y, z, yaw)
+        @param durations The duration of each segment, shape (segments,)
+        @param elements The elements for x, y, z and yaw of each segment,
+                        shape (segments, 4, n) where n is 0, 1, 3 or 7 and is
+                        the same for all segments and axes
+        @return The memory image as a bytearray
+        """
+        durations = np.asarray(durations, dtype=np.float64)
+        elements = np.asarray(elements, dtype=np.float64)
+        count = len(durations)
+        if elements.ndim != 3 or elements.shape[0:2] != (count, 4):
+            raise ValueError('elements must have the shape (segments, 4, n), not {}'.format(elements.shape))
+        element_length = elements.shape[2]
+        element_types = {0: 0, 1: 1, 3: 2, 7: 3}
+        if element_length not in element_types:
+            raise ValueError('length of element must be 0, 1, 3, or 7')
+
+        durations_ms = np.trunc(durations * 1000.0)
+        if np.any(durations_ms < 0) or np.any(durations_ms > 0xffff):
+            raise ValueError('segment duration out of range')
+
+        encoded = np.empty(elements.shape, dtype=np.float64)
+        encoded[:, 0:3, :] = np.trunc(elements[:, 0:3, :] * 1000)
+        encoded[:, 3, :] = np.trunc(np.degrees(elements[:, 3, :]) * 10)
+        if np.any(encoded < -0x8000) or np.any(encoded > 0x7fff):
+            raise ValueError('trajectory element out of range')
+
+        segment_type = np.dtype([('types', 'u1'), ('duration', '<u2'), ('elements', '<i2', (4 * element_length,))])
+        start_data = CompressedStart(*start).pack()
+
+        data = bytearray(len(start_data) + count * segment_type.itemsize)
+        data[0:len(start_data)] = start_data
+        segments = np.frombuffer(data, dtype=segment_type, offset=len(start_data))
+        segments['types'] = element_types[element_length] * 0x55
+        segments['duration'] = durations_ms
+        segments['elements'] = encoded.reshape(count, 4 * element_length)
+        return data
+
     # Deprecated (removed after August 2023). replaced by self.trajectory
     @property
     def poly4Ds(self):
@@ -179,7 +248,7 @@ class TrajectoryMemory(MemoryElement):
     def poly4Ds(self, trajectory):
         self.trajectory = trajectory
 
-    def write_data(self, write_finished_cb, write_failed_cb=None, start_addr=0x00):
+    def write_data(self, write_finished_cb, write_failed_cb=None, start_addr=0x00, diff=False, reference=None):
         """
         Write trajectory data to the Crazyflie.
         The trajectory in self.trajectory is written to the Crazyflie.
@@ -190,31 +259,80 @@ class TrajectoryMemory(MemoryElement):
         @param write_finished_cb A callback that is called when the write trajectory is uploaded.
         @param write_failed_cb Callback that is called if the upload failed
         @param start_addr The address in the trajectory memory to upload the trajectory to (0 by default)
+        @param diff Only write the blocks that differ from the current content of the memory, and verify. The
+                    statistics are available in diff_write_result when done.
+        @param reference The expected current content of the memory for diff writes, for instance the previously
+                         uploaded data. It is read back from the Crazyflie if not supplied.
         @return The number of bytes used for the trajectory
         """
-        self._write_finished_cb = write_finished_cb
-        self._write_failed_cb = write_failed_cb
         data = bytearray()
 
         for element in self.trajectory:
             data += element.pack()
 
-        self.mem_handler.write(self, start_addr, data, flush_queue=True)
+        return self.write_image(data, write_finished_cb, write_failed_cb=write_failed_cb, start_addr=start_addr,
+                                diff=diff, reference=reference)
+
+    def write_image(self, data, write_finished_cb, write_failed_cb=None, start_addr=0x00, diff=False,
+                    reference=None):
+        """
+        Write an already packed trajectory to the Crazyflie, for instance from pack_poly4d_array() or
+        pack_compressed_array(). The arguments are the same as for write_data().
+
+        @return The number of bytes used for the trajectory
+        """
+        if start_addr + len(data) > self.size:
+            raise ValueError('Trajectory of {} bytes at 0x{:X} does not fit in the trajectory memory ({} bytes)'.format(
+                len(data), start_addr, self.size))
+
+        self._write_finished_cb = write_finished_cb
+        self._write_failed_cb = write_failed_cb
+
+        if diff:
+            self.diff_write_result = None
+            self.diff_writer.write(start_addr, data,
+                                   lambda result: self._diff_write_done(start_addr, result),
+                                   failed_cb=lambda result: self._diff_write_failed(start_addr, result),
+                                   reference=reference)
+        else:
+            self.mem_handler.write(self, start_addr, data, flush_queue=True)
         return len(data)
 
-    def write_data_sync(self, start_addr=0x00):
+    def write_data_sync(self, start_addr=0x00, diff=False, reference=None):
         """
         Same functionality as write_data() but synchronous (blocking)
 
         Args:
             start_addr (hexadecimal, optional): The address in the trajectory memory to upload the trajectory to.
             Defaults to 0x00.
+            diff (bool, optional): Only write the parts that differ from the current content. Defaults to False.
+            reference (bytes, optional): The expected current content for diff writes. Defaults to None.
         """
         syncer = Syncer()
-        self.write_data(syncer.success_cb, write_failed_cb=syncer.failure_cb, start_addr=start_addr)
+        self.write_data(syncer.success_cb, write_failed_cb=syncer.failure_cb, start_addr=start_addr, diff=diff,
+                        reference=reference)
         syncer.wait()
         return syncer.is_success
 
+    def write_image_sync(self, data, start_addr=0x00, diff=False, reference=None):
+        """
+        Same functionality as write_image() but synchronous (blocking)
+        """
+        syncer = Syncer()
+        self.write_image(data, syncer.success_cb, write_failed_cb=syncer.failure_cb, start_addr=start_addr, diff=diff,
+                         reference=reference)
+        syncer.wait()
+        return syncer.is_success
+
+    def _diff_write_done(self, addr, result):
+        logger.info('Trajectory diff write done, {} of {} bytes saved'.format(result.bytes_saved, result.bytes_total))
+        self.diff_write_result = result
+        self.write_done(self, addr)
+
+    def _diff_write_failed(self, addr, result):
+        self.diff_write_result = result
+        self.write_failed(self, addr)
+
     def write_done(self, mem, addr):
         if self._write_finished_cb and mem.id == self.id:
             logger.debug('Write trajectory data done')
@@ -19,17 +19,220 @@
 #  GNU General Public License for more details.
 # You should have received a copy of the GNU General Public License
 # along with this program. If not, see <https://www.gnu.org/licenses/>.
+import logging
 import time
+from collections import deque
 from collections import namedtuple
+from threading import Event
+from threading import RLock
 from threading import Thread
 
 from cflib.crazyflie import Crazyflie
 from cflib.crazyflie.log import LogConfig
+from cflib.crazyflie.mem import MemoryElement
 from cflib.crazyflie.syncCrazyflie import SyncCrazyflie
 from cflib.crazyflie.syncLogger import SyncLogger
+from cflib.crtp.radiodriver import RadioManager
+
+logger = logging.getLogger(__name__)
 
 SwarmPosition = namedtuple('SwarmPosition', 'x y z')
 
+# Outcome of a trajectory upload to one Crazyflie. elapsed is the time in
+# seconds from the start of the swarm upload until the Crazyflie was done.
+TrajectoryUploadResult = namedtuple('TrajectoryUploadResult',
+                                    'success size attempts elapsed')
+
+
+class TrajectoryUploadReport(namedtuple('TrajectoryUploadReport',
+                                        'results duration')):
+    """
+    Outcome of a swarm trajectory upload. results is a `dict` keyed by URI
+    with TrajectoryUploadResult values and duration is the total time of the
+    upload in seconds.
+    """
+
+    @property
+    def success(self):
+        return all(result.success for result in self.results.values())
+
+    @property
+    def bytes_written(self):
+        return sum(result.size for result in self.results.values()
+                   if result.success)
+
+    @property
+    def bytes_per_second(self):
+        if self.duration <= 0:
+            return 0.0
+        return self.bytes_written / self.duration
+
+
+class SwarmTrajectoryUploader:
+    """
+    Uploads trajectories to the trajectory memory of many Crazyflies.
+
+    Crazyflies that share a Crazyradio are grouped and only a few of them
+    are written to at the same time, the others are queued and started as
+    soon as one is done. Links on the same dongle are served from one
+    command queue and uploading to all of them at once only makes them
+    compete for it. Dongles are independent and are used in parallel.
+
+    Identical trajectories are only packed once and failed uploads are
+    retried per Crazyflie.
+    """
+
+    DEFAULT_ACTIVE_PER_DONGLE = 2
+    DEFAULT_RETRIES = 2
+
+    def __init__(self, scfs, active_per_dongle=DEFAULT_ACTIVE_PER_DONGLE,
+                 retries=DEFAULT_RETRIES):
+        """
+        :param scfs: A `dict` keyed by URI with connected SyncCrazyflie
+         instances
+        :param active_per_dongle: The number of Crazyflies on the same
+         Crazyradio that are written to at the same time
+        :param retries: The number of times a failed upload is retried
+        """
+        self._scfs = scfs
+        self._active_per_dongle = active_per_dongle
+        self._retries = retries
+        self._lock = RLock()
+
+    @staticmethod
+    def pack(trajectories):
+        """
+        Pack trajectories to memory images. Trajectories that are the same
+        object are only packed once and equal images are shared.
+
+        :param trajectories: A `dict` keyed by URI with either a list of
+         trajectory elements (Poly4D or CompressedStart/CompressedSegment)
+         or an already packed image as value
+        :return: A `dict` keyed by URI with the images as bytes
+        """
+        images = {}
+        packed = {}
+        unique = {}
+
+        for uri, trajectory in trajectories.items():
+            image = packed.get(id(trajectory))
+            if image is None:
+                if isinstance(trajectory, (bytes, bytearray, memoryview)):
+                    image = bytes(trajectory)
+                else:
+                    image = b''.join(element.pack() for element in trajectory)
+                image = unique.setdefault(image, image)
+                packed[id(trajectory)] = image
+            images[uri] = image
+
+        return images
+
+    def upload(self, trajectories, start_addr=0x00, timeout=None,
+               completed_cb=None):
+        """
+        Upload trajectories and block until all Crazyflies are done.
+
+        :param trajectories: A `dict` keyed by URI with the trajectory to
+         upload to each Crazyflie, see `pack()`
+        :param start_addr: The address in the trajectory memory to write to
+        :param timeout: Max time in seconds to wait, Crazyflies that are not
+         done by then are reported as failed
+        :param completed_cb: Called with the URI and the
+         TrajectoryUploadResult when a Crazyflie is done
+        :return: A TrajectoryUploadReport
+        """
+        self._images = self.pack(trajectories)
+        self._start_addr = start_addr
+        self._completed_cb = completed_cb
+        self._results = {}
+        self._attempts = {uri: 0 for uri in self._images}
+        self._finished = Event()
+
+        self._pending = {}
+        self._active = {}
+        for uri in self._images:
+            dongle = RadioManager.dongle_of(uri)
+            self._pending.setdefault(dongle, deque()).append(uri)
+            self._active[dongle] = 0
+
+        self._start_time = time.time()
+        if not self._images:
+            self._finished.set()
+
+        with self._lock:
+            started = []
+            for dongle in self._pending:
+                started += self._next_uploads(dongle)
+        self._start_uploads(started)
+
+        self._finished.wait(timeout)
+
+        with self._lock:
+            for uri in self._images:
+                if uri not in self._results:
+                    logger.warning('Trajectory upload to {} timed out'.format(uri))
+                    self._results[uri] = TrajectoryUploadResult(
+                        False, len(self._images[uri]), self._attempts[uri],
+                        time.time() - self._start_time)
+
+            return TrajectoryUploadReport(dict(self._results),
+                                          time.time() - self._start_time)
+
+    def _next_uploads(self, dongle):
+        """Pick the Crazyflies to start on a dongle, called with the lock held"""
+        started = []
+        queue = self._pending[dongle]
+        while queue and self._active[dongle] < self._active_per_dongle:
+            uri = queue.popleft()
+            self._active[dongle] += 1
+            self._attempts[uri] += 1
+            started.append(uri)
+        return started
+
+    def _start_uploads(self, uris):
+        for uri in uris:
+            try:
+                trajectory_mem = self._scfs[uri].cf.mem.get_mems(MemoryElement.TYPE_TRAJ)[0]
+                trajectory_mem.write_image(
+                    self._images[uri],
+                    lambda mem, addr, uri=uri: self._upload_done(uri, True),
+                    write_failed_cb=lambda mem, addr, uri=uri: self._upload_done(uri, False),
+                    start_addr=self._start_addr)
+            except Exception as e:
+                # Retrying will not help if the trajectory does not fit or
+                # there is no trajectory memory
+                logger.warning('Failed to upload trajectory to {}: {}'.format(uri, e))
+                self._upload_done(uri, False, retry=False)
+
+    def _upload_done(self, uri, success, retry=True):
+        result = None
+
+        with self._lock:
+            if uri in self._results:
+                # Late callback after a timeout
+                return
+
+            dongle = RadioManager.dongle_of(uri)
+            self._active[dongle] -= 1
+
+            if success or not retry or self._attempts[uri] > self._retries:
+                result = TrajectoryUploadResult(
+                    success, len(self._images[uri]), self._attempts[uri],
+                    time.time() - self._start_time)
+                self._results[uri] = result
+            else:
+                logger.info('Trajectory upload to {} failed, retrying'.format(uri))
+                self._pending[dongle].append(uri)
+
+            started = self._next_uploads(dongle)
+            if len(self._results) == len(self._images):
+                self._finished.set()
+
+        if result is not None and self._completed_cb:
+            self._completed_cb(uri, result)
+
+        self._start_uploads(started)
+
 
 class _Factory:
     """
@@ -189,6 +392,37 @@ class Swarm:
         self.parallel_safe(self.__reset_estimator)
         print('Waiting for estimators to find positions...success!')
 
+    def upload_trajectories(self, trajectories, start_addr=0x00,
+                            timeout=None, completed_cb=None,
+                            active_per_dongle=SwarmTrajectoryUploader.DEFAULT_ACTIVE_PER_DONGLE,
+                            retries=SwarmTrajectoryUploader.DEFAULT_RETRIES):
+        """
+        Upload trajectories to the trajectory memory of the Crazyflies in
+        the swarm. Blocks until all uploads are done.
+
+        Example:
+        ```python
+        trajectories = {
+            URI0: [Poly4D(...), Poly4D(...), ...],
+            URI1: TrajectoryMemory.pack_poly4d_array(durations, coefficients),
+            ...
+        }
+
+        report = swarm.upload_trajectories(trajectories)
+        print(report.success, report.bytes_per_second)
+        ```
+
+        For a more detailed description of the arguments, see
+        `SwarmTrajectoryUploader`
+
+        :param trajectories: The trajectory of each Crazyflie, keyed by URI
+        :return: A TrajectoryUploadReport
+        """
+        uploader = SwarmTrajectoryUploader(
+            self._cfs, active_per_dongle=active_per_dongle, retries=retries)
+        return uploader.upload(trajectories, start_addr=start_addr,
+                               timeout=timeout, completed_cb=completed_cb)
+
     def sequential(self, func, args_dict=None):
         """
         Execute a function for all Crazyflies in the swarm, in sequence.
@@ -55,6 +55,8 @@ class Toc:
 
     def __init__(self):
         self.toc = {}
+        # CRC of the TOC as reported by the Crazyflie, None until fetched
+        self.crc = None
 
     def clear(self):
         """Clear the TOC"""
@@ -166,6 +168,7 @@ class TocFetcher:
                     '<BI', payload[:5])
             logger.debug('[%d]: Got TOC CRC, %d items and crc=0x%08X',
                          self.port, self.nbr_of_items, self._crc)
+            self.toc.crc = self._crc
 
             cache_data = self._toc_cache.fetch(self._crc)
             if (cache_data):
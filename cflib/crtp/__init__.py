@@ -28,6 +28,7 @@ import os
 
 from .exceptions import WrongUriType
 from .prrtdriver import PrrtDriver
+from .radiobroadcastdriver import RadioBroadcastDriver
 from .radiodriver import RadioDriver
 from .serialdriver import SerialDriver
 from .tcpdriver import TcpDriver
@@ -51,7 +52,7 @@ def init_drivers(enable_debug_driver=False, enable_serial_driver=False):
         from .cflinkcppdriver import CfLinkCppDriver
         CLASSES.append(CfLinkCppDriver)
     else:
-        CLASSES.extend([RadioDriver, UsbDriver])
+        CLASSES.extend([RadioDriver, RadioBroadcastDriver, UsbDriver])
 
     if enable_debug_driver:
         logger.warn('The debug driver is no longer supported!')
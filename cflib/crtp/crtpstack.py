@@ -56,11 +56,22 @@ class CRTPPort:
 class CRTPPacket(object):
     """
     A packet that can be sent via the CRTP.
+
+    The header is kept up to date when the port or channel is set and the
+    data is stored in a bytearray. view is a memoryview of the data, datat
+    and datal are copies of it.
     """
 
+    __slots__ = ('header', 'size', '_port', '_channel', '_data')
+
     # The max size of a CRTP packet payload
     MAX_DATA_SIZE = 30
 
+    # Packets handed back with release() are reused by from_buffer(), at
+    # most FREE_LIST_SIZE of them are kept
+    FREE_LIST_SIZE = 64
+    _free_list = []
+
     def __init__(self, header=0, data=None):
         """
         Create an empty packet with default values.
@@ -75,6 +86,40 @@ class CRTPPacket(object):
         if data:
             self._set_data(data)
 
+    @classmethod
+    def from_buffer(cls, buffer):
+        """
+        Create a packet from a buffer with the header followed by the data,
+        for instance a received frame. The data is copied once.
+        """
+        view = memoryview(buffer)
+        if cls._free_list:
+            try:
+                pk = cls._free_list.pop()
+            except IndexError:
+                return cls(view[0], bytearray(view[1:]))
+            header = view[0]
+            pk.header = header | 0x3 << 2
+            pk._port = (header & 0xF0) >> 4
+            pk._channel = header & 0x03
+            pk._data[:] = view[1:]
+            return pk
+        return cls(view[0], bytearray(view[1:]))
+
+    @classmethod
+    def release(cls, pk):
+        """
+        Hand back a packet that is not used anymore, to be reused by
+        from_buffer(). Only release packets that no one holds a reference
+        to, or to their data, as the data is overwritten when reused.
+        """
+        if len(cls._free_list) < cls.FREE_LIST_SIZE:
+            cls._free_list.append(pk)
+
+    def to_bytes(self):
+        """The header followed by the data"""
+        return bytes((self.header,)) + self._data
+
     def _get_channel(self):
         """Get the packet channel"""
         return self._channel
@@ -95,7 +140,6 @@ class CRTPPacket(object):
 
     def get_header(self):
         """Get the header"""
-        self._update_header()
         return self.header
 
     def set_header(self, port, channel):
@@ -103,7 +147,7 @@ class CRTPPacket(object):
         Set the port and channel for this packet.
         """
         self._port = port
-        self.channel = channel
+        self._channel = channel
         self._update_header()
 
     def _update_header(self):
@@ -111,7 +155,7 @@ class CRTPPacket(object):
         # The two bits in position 3 and 4 needs to be set for legacy
         # support of the bootloader
         self.header = ((self._port & 0x0f) << 4 | 3 << 2 |
-                       (self.channel & 0x03))
+                       (self._channel & 0x03))
 
     # Some python madness to access different format of the data
     def _get_data(self):
@@ -120,13 +164,16 @@ class CRTPPacket(object):
 
     def _set_data(self, data):
         """Set the packet data"""
-        if isinstance(data, bytearray):
+        data_type = type(data)
+        if data_type is bytearray:
+            self._data = data
+        elif data_type is bytes or data_type is list or data_type is tuple or data_type is memoryview:
+            self._data = bytearray(data)
+        elif isinstance(data, bytearray):
             self._data = data
         elif isinstance(data, str):
             self._data = bytearray(data.encode('ISO-8859-1'))
-        elif isinstance(data, list) or isinstance(data, tuple):
-            self._data = bytearray(data)
-        elif isinstance(data, bytes):
+        elif isinstance(data, (list, tuple, bytes)):
             self._data = bytearray(data)
         else:
             raise Exception('Data must be bytearray, string, list or tuple,'
@@ -134,15 +181,19 @@ class CRTPPacket(object):
 
     def _get_data_l(self):
         """Get the data in the packet as a list"""
-        return list(self._get_data_t())
+        return list(self._data)
 
     def _get_data_t(self):
         """Get the data in the packet as a tuple"""
         return tuple(self._data)
 
+    def _get_view(self):
+        """Get a memoryview of the data, without a copy"""
+        return memoryview(self._data)
+
     def __str__(self):
         """Get a string representation of the packet"""
-        return '{}:{} {}'.format(self._port, self.channel, self.datat)
+        return '{}:{} {}'.format(self._port, self._channel, self.datat)
 
     def get_data_size(self):
         return len(self._data)
@@ -157,5 +208,6 @@ class CRTPPacket(object):
     datal = property(_get_data_l, _set_data)
     datat = property(_get_data_t, _set_data)
     datas = property(_get_data, _set_data)
+    view = property(_get_view)
     port = property(_get_port, _set_port)
     channel = property(_get_channel, _set_channel)
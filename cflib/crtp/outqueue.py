@@ -0,0 +1,249 @@
+# -*- coding: utf-8 -*-
+#
+# ,---------,       ____  _ __
+# |  ,-^-,  |      / __ )(_) /_______________ _____  ___
+# | (  O  ) |     / __  / / __/ ___/ ___/ __ `/_  / / _ \
+# | / ,--'  |    / /_/ / / /_/ /__/ /  / /_/ / / /_/  __/
+#    +------`   /_____/_/\__/\___/_/   \__,_/ /___/\___/
+#
+# Copyright (C) 2026 Bitcraze AB
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, in version 3.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+Out queue with priority classes for link drivers.
+"""
+import queue
+import threading
+import time
+from collections import deque
+from collections import namedtuple
+
+from .crtpstack import CRTPPort
+
+__author__ = 'Bitcraze AB'
+__all__ = ['PriorityOutQueue', 'OutQueueStatistics']
+
+# Priority classes, lower is sent first
+EMERGENCY = 0
+SETPOINT = 1
+REQUEST = 2
+BULK = 3
+
+# Statistics of one priority class. depth is the number of queued packets,
+# oldest_age the time in seconds the oldest queued packet has waited and
+# mean_wait the mean time from put() to get() of the packets sent.
+OutQueueStatistics = namedtuple('OutQueueStatistics',
+                                'depth oldest_age mean_wait sent coalesced')
+
+_LOCALIZATION_POSITION_CH = 0
+_LOCALIZATION_GENERIC_CH = 1
+_LOCALIZATION_EMERGENCY_STOP = 3
+_LOCALIZATION_EMERGENCY_STOP_WATCHDOG = 4
+_LOCALIZATION_EXT_POSE = 8
+_LOCALIZATION_EXT_POSE_PACKED = 9
+# Size of the pose of one Crazyflie in an EXT_POSE_PACKED packet, the id is
+# its first byte
+_EXT_POSE_PACKED_ITEM_SIZE = 11
+_SET_SETPOINT_CHANNEL = 0
+_BOOTLOADER_CHANNEL = 3
+
+
+def classify(pk):
+    """
+    The priority class of a packet and its coalescing key. Packets with the
+    same key are streams where only the latest packet matters, a queued
+    packet is replaced by a new one with the same key. The key is None for
+    packets that must all be sent.
+    """
+    port = pk.port
+    channel = pk.channel
+
+    if port == CRTPPort.SUPERVISOR:
+        return EMERGENCY, None
+    if port == CRTPPort.LOCALIZATION and channel == _LOCALIZATION_GENERIC_CH and len(pk.data) > 0:
+        if pk.data[0] in (_LOCALIZATION_EMERGENCY_STOP, _LOCALIZATION_EMERGENCY_STOP_WATCHDOG):
+            return EMERGENCY, None
+        if pk.data[0] == _LOCALIZATION_EXT_POSE:
+            return SETPOINT, (port, channel, _LOCALIZATION_EXT_POSE)
+        if pk.data[0] == _LOCALIZATION_EXT_POSE_PACKED:
+            # A stream per set of Crazyflies in the packet
+            ids = bytes(pk.data[1::_EXT_POSE_PACKED_ITEM_SIZE])
+            return SETPOINT, (port, channel, _LOCALIZATION_EXT_POSE_PACKED, ids)
+
+    if port in (CRTPPort.COMMANDER, CRTPPort.COMMANDER_GENERIC) and channel == _SET_SETPOINT_CHANNEL:
+        return SETPOINT, (port, channel)
+    if port == CRTPPort.LOCALIZATION and channel == _LOCALIZATION_POSITION_CH:
+        return SETPOINT, (port, channel)
+    # One-shot commands, such as high level commands and the meta commands
+    # of the generic commander, are requests and keep their order with the
+    # other requests
+
+    if port == CRTPPort.MEM or (port == CRTPPort.LINKCTRL and channel == _BOOTLOADER_CHANNEL):
+        return BULK, None
+
+    return REQUEST, None
+
+
+class _PriorityClass:
+
+    def __init__(self, depth):
+        self.depth = depth
+        # Queued entries, [key, packet, put time]
+        self.entries = deque()
+        self.coalescable = {}
+        self.sent = 0
+        self.coalesced = 0
+        self.wait_sum = 0.0
+
+
+class PriorityOutQueue:
+    """
+    A drop in replacement for the bounded out queue of a link driver, with
+    the Queue put()/get() interface.
+
+    Packets are sent by priority class: emergency stops first, then
+    streamed setpoints and external positions, then requests and one-shot
+    commands and last bulk memory and bootloader transfers. Packets of a
+    class are sent in the order they were put. A streamed setpoint or
+    position replaces the queued one of the same stream and is moved to the
+    end of its class, so a stream never waits behind itself and never
+    blocks.
+
+    Each class has its own depth. put() only waits for space in the class
+    of the packet, a setpoint does not wait behind a memory write. The
+    shallow bulk class keeps bulk transfers from running ahead of the link.
+    """
+
+    DEFAULT_DEPTHS = {EMERGENCY: 16, SETPOINT: 16, REQUEST: 4, BULK: 1}
+    ACCEPT_RETRY_INTERVAL = 0.001
+
+    def __init__(self, depths=None):
+        """
+        :param depths: A dict with the depth of each class, see
+         DEFAULT_DEPTHS
+        """
+        class_depths = dict(self.DEFAULT_DEPTHS)
+        for priority, depth in (depths or {}).items():
+            if priority not in class_depths:
+                raise ValueError('Unknown priority class {}'.format(priority))
+            class_depths[priority] = depth
+        self._classes = [_PriorityClass(class_depths[c]) for c in (EMERGENCY, SETPOINT, REQUEST, BULK)]
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+
+    def put(self, pk, block=True, timeout=None):
+        """
+        Queue a packet, raises queue.Full if there is no space in its class
+        within the timeout or right away if block is False
+        """
+        priority, key = classify(pk)
+        cls = self._classes[priority]
+        with self._not_full:
+            if key is not None and key in cls.coalescable:
+                cls.entries.remove(cls.coalescable[key])
+                cls.coalesced += 1
+            elif not self._wait_for_space(cls, block, timeout):
+                raise queue.Full
+
+            entry = [key, pk, time.time()]
+            cls.entries.append(entry)
+            if key is not None:
+                cls.coalescable[key] = entry
+            self._not_empty.notify()
+
+    def put_nowait(self, pk):
+        self.put(pk, False)
+
+    def get(self, block=True, timeout=None, accept=None):
+        """
+        Get the next packet to send, raises queue.Empty if there is none
+        within the timeout or right away if block is False
+
+        :param accept: Called with the first packet of each class, highest
+         priority first, the first packet it returns True for is returned.
+         Packets that are not accepted stay queued, used for rate limiting.
+        """
+        with self._not_empty:
+            end = None if timeout is None else time.time() + timeout
+            while True:
+                cls = self._next_class(accept)
+                if cls is not None:
+                    break
+
+                remaining = None if end is None else end - time.time()
+                if not block or (remaining is not None and remaining <= 0):
+                    raise queue.Empty
+                if self._qsize():
+                    # Packets that are not accepted now may be later
+                    remaining = self.ACCEPT_RETRY_INTERVAL if remaining is None else \
+                        min(remaining, self.ACCEPT_RETRY_INTERVAL)
+                self._not_empty.wait(remaining)
+
+            key, pk, put_time = cls.entries.popleft()
+            if key is not None:
+                del cls.coalescable[key]
+            cls.sent += 1
+            cls.wait_sum += time.time() - put_time
+            self._not_full.notify_all()
+            return pk
+
+    def get_nowait(self):
+        return self.get(False)
+
+    def qsize(self):
+        with self._lock:
+            return self._qsize()
+
+    def empty(self):
+        return self.qsize() == 0
+
+    def clear(self):
+        """Drop all queued packets"""
+        with self._lock:
+            for cls in self._classes:
+                cls.entries.clear()
+                cls.coalescable.clear()
+            self._not_full.notify_all()
+
+    def statistics(self):
+        """The statistics of each priority class, keyed by class"""
+        now = time.time()
+        with self._lock:
+            return {priority: OutQueueStatistics(len(cls.entries),
+                                                 now - cls.entries[0][2] if cls.entries else 0.0,
+                                                 cls.wait_sum / cls.sent if cls.sent else 0.0,
+                                                 cls.sent,
+                                                 cls.coalesced)
+                    for priority, cls in enumerate(self._classes)}
+
+    def _next_class(self, accept):
+        for cls in self._classes:
+            if cls.entries and (accept is None or accept(cls.entries[0][1])):
+                return cls
+        return None
+
+    def _qsize(self):
+        return sum(len(cls.entries) for cls in self._classes)
+
+    def _wait_for_space(self, cls, block, timeout):
+        if not block:
+            return len(cls.entries) < cls.depth
+
+        end = None if timeout is None else time.time() + timeout
+        while len(cls.entries) >= cls.depth:
+            remaining = None if end is None else end - time.time()
+            if remaining is not None and remaining <= 0:
+                return False
+            self._not_full.wait(remaining)
+        return True
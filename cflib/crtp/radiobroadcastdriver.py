@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+#
+# ,---------,       ____  _ __
+# |  ,-^-,  |      / __ )(_) /_______________ _____  ___
+# | (  O  ) |     / __  / / __/ ___/ ___/ __ `/_  / / _ \
+# | / ,--'  |    / /_/ / / /_/ /__/ /  / /_/ / / /_/  __/
+#    +------`   /_____/_/\__/\___/_/   \__,_/ /___/\___/
+#
+# Copyright (C) 2026 Bitcraze AB
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, in version 3.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+Crazyradio broadcast link driver.
+
+Sends unacknowledged packets to the broadcast address on a channel, all
+Crazyflies listening on the channel receive them at the same time. There is
+no downlink on a broadcast link.
+
+URI format: radiobroadcast://<dongle nbr>/<radio channel>/[250K,1M,2M]
+optionally followed by /<address>, the default is the broadcast address
+FFE7E7E7E7. As packets are not acked they can be lost, the query parameter
+repeat sets how many times each packet is sent. Only repeat commands that
+give the same result when received more than once, for instance a relative
+go_to is not.
+"""
+import logging
+from threading import Event
+from urllib.parse import parse_qs
+from urllib.parse import urlparse
+
+from .exceptions import WrongUriType
+from .radiodriver import RadioDriver
+from .radiodriver import RadioManager
+from cflib.crtp.crtpdriver import CRTPDriver
+
+__author__ = 'Bitcraze AB'
+__all__ = ['RadioBroadcastDriver']
+
+logger = logging.getLogger(__name__)
+
+BROADCAST_ADDR_A = (0xff, 0xe7, 0xe7, 0xe7, 0xe7)
+
+
+class RadioBroadcastDriver(CRTPDriver):
+    """ Crazyradio broadcast link driver """
+
+    SCHEME = 'radiobroadcast://'
+    DEFAULT_REPEAT = 1
+
+    def __init__(self):
+        """ Create the link driver """
+        CRTPDriver.__init__(self)
+        self._radio = None
+        self.uri = ''
+        self.repeat = self.DEFAULT_REPEAT
+        self.needs_resending = False
+        self._closed = Event()
+
+    def connect(self, uri, radio_link_statistics_callback, link_error_callback):
+        """
+        Connect the link driver to a specified URI of the format:
+        radiobroadcast://<dongle nbr>/<radio channel>/[250K,1M,2M]
+        """
+        devid, channel, datarate, address, repeat = self.parse_uri(uri)
+        self.uri = uri
+        self.repeat = repeat
+
+        if self._radio is not None:
+            raise Exception('Link already open!')
+
+        self._radio = RadioManager.open(devid)
+        self._radio.set_channel(channel)
+        self._radio.set_data_rate(datarate)
+        self._radio.set_address(address)
+        self._closed.clear()
+
+    @staticmethod
+    def parse_uri(uri: str):
+        if not uri.startswith(RadioBroadcastDriver.SCHEME):
+            raise WrongUriType('Not a radio broadcast URI')
+
+        # The path is the same as for unicast radio links
+        radio_uri = 'radio://' + uri[len(RadioBroadcastDriver.SCHEME):]
+        devid, channel, datarate, address, _ = RadioDriver.parse_uri(radio_uri)
+
+        parsed_path = urlparse(radio_uri).path.strip('/').split('/')
+        if len(parsed_path) <= 2:
+            address = BROADCAST_ADDR_A
+
+        repeat = RadioBroadcastDriver.DEFAULT_REPEAT
+        parsed_query = parse_qs(urlparse(uri).query)
+        if 'repeat' in parsed_query:
+            repeat = max(1, int(parsed_query['repeat'][0]))
+
+        return devid, channel, datarate, address, repeat
+
+    def send_packet(self, pk) -> bool:
+        """ Send the packet pk to all Crazyflies on the channel, repeat times """
+        data = bytearray([pk.header]) + pk.data
+        for _ in range(self.repeat):
+            self._radio.send_packet_no_ack(data)
+        return True
+
+    def receive_packet(self, wait=0):
+        """ There is no downlink, waits and returns None """
+        if wait < 0:
+            self._closed.wait()
+        elif wait > 0:
+            self._closed.wait(wait)
+        return None
+
+    def close(self):
+        """ Close the link. """
+        if self._radio:
+            self._radio.close()
+        self._radio = None
+        self._closed.set()
+
+    def get_status(self):
+        return 'No information available'
+
+    def get_name(self):
+        return 'radiobroadcast'
+
+    def scan_interface(self, address=None):
+        """ Broadcast links can not be scanned """
+        return []
@@ -36,6 +36,7 @@ import re
 import struct
 import threading
 import time
+from collections import namedtuple
 from enum import Enum
 from queue import Queue
 from threading import Semaphore
@@ -50,7 +51,10 @@ from urllib.parse import urlparse
 
 import cflib.drivers.crazyradio as crazyradio
 from .crtpstack import CRTPPacket
+from .crtpstack import CRTPPort
 from .exceptions import WrongUriType
+from .outqueue import PriorityOutQueue
+from .ratelimiter import RateLimiter
 from cflib.crtp.crtpdriver import CRTPDriver
 from cflib.crtp.radio_link_statistics import RadioLinkStatistics
 from cflib.drivers.crazyradio import Crazyradio
@@ -67,6 +71,11 @@ _nr_of_arc_retries = 3
 DEFAULT_ADDR_A = [0xe7, 0xe7, 0xe7, 0xe7, 0xe7]
 DEFAULT_ADDR = 0xE7E7E7E7E7
 
+# Load of one Crazyradio in a pool, see RadioManager.pool_statistics()
+DongleStatistics = namedtuple('DongleStatistics',
+                              'links pooled_links packet_rate ack_rate reconfigurations')
+RadioPoolStatistics = namedtuple('RadioPoolStatistics', 'dongles migrations')
+
 
 class _RadioCommands(Enum):
     STOP = 0
@@ -74,30 +83,78 @@ class _RadioCommands(Enum):
     SET_ARC = 2
     SCAN_SELECTED = 3
     SCAN_CHANNELS = 4
+    SEND_PACKET_NO_ACK = 5
+
+
+class _SharedRadioStatistics():
+    """
+    Packets sent for one instance of a shared radio. Updated by the radio
+    thread, the rates are calculated over periods of RATE_PERIOD seconds.
+    """
+
+    RATE_PERIOD = 1.0
+
+    def __init__(self):
+        self.packets = 0
+        self.acks = 0
+        # Packets sent and packets acked per second
+        self.packet_rate = 0.0
+        self.ack_rate = 0.0
+        # True when the rates have been measured over at least one period
+        self.measured = False
+
+        self._period_start = time.time()
+        self._period_packets = 0
+        self._period_acks = 0
+
+    def update(self, ack):
+        self.packets += 1
+        self._period_packets += 1
+        if ack and ack.ack:
+            self.acks += 1
+            self._period_acks += 1
+
+        now = time.time()
+        duration = now - self._period_start
+        if duration >= self.RATE_PERIOD:
+            self.packet_rate = self._period_packets / duration
+            self.ack_rate = self._period_acks / duration
+            self.measured = True
+            self._period_start = now
+            self._period_packets = 0
+            self._period_acks = 0
 
 
 class _SharedRadioInstance():
     def __init__(self, instance_id: int,
                  cmd_queue: 'Queue[Tuple[int, _RadioCommands, Any]]',
                  rsp_queue: Queue,
-                 version: float):
+                 version: float,
+                 statistics: Optional[_SharedRadioStatistics] = None):
         self._instance_id = instance_id
         self._cmd_queue = cmd_queue
         self._rsp_queue = rsp_queue
 
         self._channel = 2
-        self._address = [0xe7]*5
+        self._address = (0xe7,)*5
         self._datarate = crazyradio.Crazyradio.DR_2MPS
 
         self._opened = True
 
         self.version = version
+        self.statistics = statistics if statistics is not None else _SharedRadioStatistics()
+
+    @property
+    def packet_rate(self) -> float:
+        """The number of acked packets per second sent for this instance"""
+        return self.statistics.ack_rate
 
     def set_channel(self, channel: int):
         self._channel = channel
 
     def set_address(self, address):
-        self._address = address
+        # A tuple so that the configuration can be compared and hashed
+        self._address = tuple(address)
 
     def set_data_rate(self, dr):
         self._datarate = dr
@@ -113,6 +170,17 @@ class _SharedRadioInstance():
         ack = self._rsp_queue.get()  # type: crazyradio._radio_ack
         return ack
 
+    def send_packet_no_ack(self, data: List[int]) -> crazyradio._radio_ack:
+        """Send a packet without requesting an ack, for broadcasts"""
+        assert (self._opened)
+        self._cmd_queue.put((self._instance_id,
+                             _RadioCommands.SEND_PACKET_NO_ACK,
+                             (self._channel,
+                              self._address,
+                              self._datarate,
+                              data)))
+        return self._rsp_queue.get()
+
     def set_arc(self, arc):
         assert (self._opened)
         self._cmd_queue.put((self._instance_id,
@@ -142,6 +210,23 @@ class _SharedRadioInstance():
 
 
 class _SharedRadio(Thread):
+    """
+    Shares a Crazyradio between several links. Commands from all instances
+    are handled by one thread.
+
+    Packet sends are scheduled in rounds: all sends that are queued when a
+    round starts are done in the round, grouped by channel, data rate and
+    ack mode with the group of the current radio configuration first. An instance
+    waits for the answer of a send before it sends the next one, so every
+    instance gets one send per round and none can starve the others.
+
+    The sends of a group are done in one burst, see Crazyradio.send_packets().
+    A link only has one packet in flight, as safelink needs the ack of a
+    packet to send the next one, the bursts are made of the packets of
+    several links. They are sorted by address within the group, the USB
+    writes of a burst only overlap for packets to the same address.
+    """
+
     def __init__(self, devid: int):
         Thread.__init__(self)
         self._radio = Crazyradio(devid=devid)
@@ -152,19 +237,33 @@ class _SharedRadio(Thread):
 
         self._cmd_queue = Queue()  # type: Queue[Tuple[int, _RadioCommands, Any]]  # noqa
         self._rsp_queues = {}  # type: Dict[int, Queue[Any]]
+        self._statistics = {}  # type: Dict[int, _SharedRadioStatistics]
         self._next_instance_id = 0
 
+        # Number of bursts of sends and the number of them that needed the
+        # radio to be reconfigured
+        self.bursts = 0
+        self.reconfigurations = 0
+        self._ack_enabled = True
+
         self._lock = Semaphore(1)
 
         self.daemon = True
 
         self.start()
 
-    def open_instance(self) -> _SharedRadioInstance:
+    def open_instance(self, statistics: Optional[_SharedRadioStatistics] = None) -> _SharedRadioInstance:
+        """
+        Open an instance, the statistics of an instance on another radio can
+        be passed on when a link is moved between radios
+        """
         rsp_queue = Queue()
+        if statistics is None:
+            statistics = _SharedRadioStatistics()
         with self._lock:
             instance_id = self._next_instance_id
             self._rsp_queues[instance_id] = rsp_queue
+            self._statistics[instance_id] = statistics
             self._next_instance_id += 1
 
             if self._radio is None:
@@ -173,64 +272,424 @@ class _SharedRadio(Thread):
         return _SharedRadioInstance(instance_id,
                                     self._cmd_queue,
                                     rsp_queue,
-                                    self.version)
+                                    self.version,
+                                    statistics)
+
+    def statistics(self):
+        """The statistics of the open instances, keyed by instance id"""
+        with self._lock:
+            return dict(self._statistics)
 
     def run(self):
         while True:
-            command = self._cmd_queue.get()
-
-            if command[1] == _RadioCommands.STOP:
-                with self._lock:
-                    del self._rsp_queues[command[0]]
-                    if len(self._rsp_queues) == 0:
-                        self._radio.close()
-                        self._radio = None
-            elif command[1] == _RadioCommands.SEND_PACKET:
-                channel, address, datarate, data = command[2]
-                self._radio.set_channel(channel)
-                self._radio.set_address(address)
-                self._radio.set_data_rate(datarate)
-                ack = self._radio.send_packet(data)
-                self._rsp_queues[command[0]].put(ack)
-            elif command[1] == _RadioCommands.SET_ARC:
-                self._radio.set_arc(command[2])
-            elif command[1] == _RadioCommands.SCAN_SELECTED:
-                datarate, address, selected, data = command[2]
-                self._radio.set_data_rate(datarate)
-                self._radio.set_address(address)
-                resp = self._radio.scan_selected(selected, data)
-                self._rsp_queues[command[0]].put(resp)
-            elif command[1] == _RadioCommands.SCAN_CHANNELS:
-                datarate, address, start, stop, packet = command[2]
-                self._radio.set_data_rate(datarate)
-                self._radio.set_address(address)
-                resp = self._radio.scan_channels(start, stop, packet)
-                self._rsp_queues[command[0]].put(resp)
+            # A round is the commands that are queued now
+            commands = [self._cmd_queue.get()]
+            while True:
+                try:
+                    commands.append(self._cmd_queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            sends = []
+            for command in commands:
+                if command[1] in (_RadioCommands.SEND_PACKET, _RadioCommands.SEND_PACKET_NO_ACK):
+                    sends.append(command)
+                else:
+                    self._handle(command)
+
+            if sends:
+                self._send_bursts(self._schedule(sends))
+
+    def _schedule(self, sends):
+        """Order sends so that the ones on the same channel, data rate and ack mode are done together"""
+        current = (self._radio.current_channel, self._radio.current_datarate, self._ack_enabled)
+        groups = {}
+        for command in sends:
+            channel, address, datarate, data = command[2]
+            ack_enabled = command[1] == _RadioCommands.SEND_PACKET
+            groups.setdefault((channel, datarate, ack_enabled), []).append(command)
+
+        # Stable sorts, the groups and the sends to an address are otherwise
+        # kept in the order they were queued
+        current_address = tuple(self._radio.current_address or ())
+
+        def address_order(command):
+            return command[2][1] != current_address, command[2][1]
+
+        order = sorted(groups, key=lambda config: config != current)
+        return [command for config in order for command in sorted(groups[config], key=address_order)]
+
+    def _send_bursts(self, commands):
+        """Send the commands, the ones in a row with the same configuration in one burst"""
+        burst = []
+        for command in commands:
+            if burst and self._configuration(command) != self._configuration(burst[0]):
+                self._send(burst)
+                burst = []
+            burst.append(command)
+        if burst:
+            self._send(burst)
+
+    @staticmethod
+    def _configuration(command):
+        channel, address, datarate, _ = command[2]
+        return channel, datarate, command[1] == _RadioCommands.SEND_PACKET
+
+    def _send(self, burst):
+        channel, datarate, ack_enabled = self._configuration(burst[0])
+        address = burst[0][2][1]
+        if (channel, address, datarate, ack_enabled) != (self._radio.current_channel,
+                                                         self._radio.current_address,
+                                                         self._radio.current_datarate,
+                                                         self._ack_enabled):
+            self.reconfigurations += 1
+        self._radio.set_channel(channel)
+        self._radio.set_data_rate(datarate)
+        if ack_enabled != self._ack_enabled:
+            self._radio.set_ack_enable(ack_enabled)
+            self._ack_enabled = ack_enabled
+
+        if ack_enabled:
+            acks = self._radio.send_packets([command[2][3] for command in burst],
+                                            [command[2][1] for command in burst])
+        else:
+            # Nothing comes back, the senders get an empty ack
+            acks = []
+            for command in burst:
+                self._radio.set_address(command[2][1])
+                self._radio.send_packet_no_ack(command[2][3])
+                acks.append(crazyradio._radio_ack())
+        self.bursts += 1
+        for command, ack in zip(burst, acks):
+            self._statistics[command[0]].update(ack)
+            self._rsp_queues[command[0]].put(ack)
+
+    def _handle(self, command):
+        if command[1] == _RadioCommands.STOP:
+            with self._lock:
+                del self._rsp_queues[command[0]]
+                del self._statistics[command[0]]
+                if len(self._rsp_queues) == 0:
+                    self._radio.close()
+                    self._radio = None
+                    self._ack_enabled = True
+        elif command[1] == _RadioCommands.SET_ARC:
+            self._radio.set_arc(command[2])
+        elif command[1] == _RadioCommands.SCAN_SELECTED:
+            datarate, address, selected, data = command[2]
+            self._radio.set_data_rate(datarate)
+            self._radio.set_address(address)
+            resp = self._radio.scan_selected(selected, data)
+            self._rsp_queues[command[0]].put(resp)
+        elif command[1] == _RadioCommands.SCAN_CHANNELS:
+            datarate, address, start, stop, packet = command[2]
+            self._radio.set_data_rate(datarate)
+            self._radio.set_address(address)
+            resp = self._radio.scan_channels(start, stop, packet)
+            self._rsp_queues[command[0]].put(resp)
+
+
+class _PooledRadioInstance():
+    """
+    A radio instance on a Crazyradio of the pool. The link can be moved to
+    another Crazyradio between two sends, the configuration is kept.
+    """
+
+    def __init__(self, devid: int, instance: _SharedRadioInstance):
+        self.devid = devid
+        self._instance = instance
+        self._lock = threading.Lock()
+        self._arc = None
+        self._opened = True
+
+    @property
+    def version(self) -> float:
+        return self._instance.version
+
+    @property
+    def statistics(self) -> _SharedRadioStatistics:
+        return self._instance.statistics
+
+    @property
+    def packet_rate(self) -> float:
+        return self._instance.packet_rate
+
+    def set_channel(self, channel: int):
+        with self._lock:
+            self._instance.set_channel(channel)
+
+    def set_address(self, address):
+        with self._lock:
+            self._instance.set_address(address)
+
+    def set_data_rate(self, dr):
+        with self._lock:
+            self._instance.set_data_rate(dr)
+
+    def send_packet(self, data: List[int]) -> crazyradio._radio_ack:
+        with self._lock:
+            return self._instance.send_packet(data)
+
+    def send_packet_no_ack(self, data: List[int]) -> crazyradio._radio_ack:
+        with self._lock:
+            return self._instance.send_packet_no_ack(data)
+
+    def set_arc(self, arc):
+        with self._lock:
+            self._arc = arc
+            self._instance.set_arc(arc)
+
+    def scan_selected(self, selected, packet):
+        with self._lock:
+            return self._instance.scan_selected(selected, packet)
+
+    def scan_channels(self, start: int, stop: int, packet: Iterable[int]):
+        with self._lock:
+            return self._instance.scan_channels(start, stop, packet)
+
+    def migrate(self, devid: int, instance: _SharedRadioInstance) -> bool:
+        """Move the link to instance, on the Crazyradio devid"""
+        with self._lock:
+            if not self._opened:
+                instance.close()
+                return False
+
+            old = self._instance
+            instance.set_channel(old._channel)
+            instance.set_address(old._address)
+            instance.set_data_rate(old._datarate)
+            if self._arc is not None:
+                instance.set_arc(self._arc)
+
+            self._instance = instance
+            self.devid = devid
+            old.close()
+            return True
+
+    def close(self):
+        with self._lock:
+            assert (self._opened)
+            self._opened = False
+            self._instance.close()
+        RadioManager._pool_closed(self)
+
+
+class _PoolBalancer(Thread):
+    """Rebalances the pool periodically while there are pooled links"""
+
+    def __init__(self, period: float):
+        Thread.__init__(self)
+        self.name = 'Radio Pool Balancer'
+        self.daemon = True
+        self._period = period
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def run(self):
+        while not self._stop_event.wait(self._period):
+            try:
+                RadioManager.rebalance()
+            except Exception as e:
+                logger.warning('Radio pool rebalancing failed: {}'.format(e))
 
 
 class RadioManager:
+    """
+    Shares the Crazyradios between links.
+
+    A link opened with a devid uses that Crazyradio. A link opened without
+    one (radio://*/...) is pooled: it is put on the least loaded Crazyradio
+    of the pool and is moved to another one when the load shifts. The load
+    of a Crazyradio is the measured packet rate of all its links, links that
+    have not been measured yet count as the average link of the pool.
+    """
+
     _radios = []  # type: List[Union[_SharedRadio, None]]
     _lock = Semaphore(1)
 
-    @staticmethod
-    def open(devid: int) -> _SharedRadioInstance:
-        with RadioManager._lock:
-            if len(RadioManager._radios) <= devid:
-                padding = [None] * (devid - len(RadioManager._radios) + 1)
-                RadioManager._radios.extend(padding)
+    # The devids of the pool, all Crazyradios if None
+    _pool = None  # type: Optional[List[int]]
+    _pooled = []  # type: List[_PooledRadioInstance]
+    _balancer = None  # type: Optional[_PoolBalancer]
+    # Number of times a pooled link has been moved to another Crazyradio
+    migrations = 0
 
-            shared_radio = RadioManager._radios[devid]
-            if not shared_radio:
-                shared_radio = _SharedRadio(devid)
-                RadioManager._radios[devid] = shared_radio
+    REBALANCE_PERIOD = 2.0
+    # Smallest reduction of the load of the busiest Crazyradio, in packets
+    # per second, for a link to be moved
+    REBALANCE_MIN_GAIN = 50.0
 
-            return shared_radio.open_instance()
+    @staticmethod
+    def open(devid: Optional[int]) -> _SharedRadioInstance:
+        if devid is None:
+            return RadioManager._open_pooled()
+
+        with RadioManager._lock:
+            return RadioManager._shared_radio(devid).open_instance()
 
     @staticmethod
     def remove(devid: int):
         with RadioManager._lock:
             RadioManager._radios[devid] = None
 
+    @staticmethod
+    def set_pool(devids: Optional[Iterable[int]]):
+        """Set the Crazyradios used for pooled links, None for all"""
+        with RadioManager._lock:
+            RadioManager._pool = list(devids) if devids is not None else None
+
+    @staticmethod
+    def rebalance() -> bool:
+        """
+        Move the pooled link that lowers the load of the busiest Crazyradio
+        most to the least loaded one, if the gain is large enough
+
+        :return: True if a link was moved
+        """
+        with RadioManager._lock:
+            loads = RadioManager._loads()
+            if len(loads) < 2:
+                return False
+
+            busiest = max(loads, key=lambda devid: loads[devid])
+            idlest = min(loads, key=lambda devid: loads[devid])
+
+            best = None
+            best_gain = 0.0
+            estimate = RadioManager._average_rate()
+            for pooled in RadioManager._pooled:
+                if pooled.devid != busiest:
+                    continue
+                rate = RadioManager._rate(pooled.statistics, estimate)
+                gain = loads[busiest] - max(loads[busiest] - rate, loads[idlest] + rate)
+                if gain >= RadioManager.REBALANCE_MIN_GAIN and gain > best_gain:
+                    best = pooled
+                    best_gain = gain
+
+            if best is None:
+                return False
+
+            instance = RadioManager._shared_radio(idlest).open_instance(best.statistics)
+
+        if not best.migrate(idlest, instance):
+            return False
+
+        logger.info('Moved a pooled link from Crazyradio {} to {}'.format(busiest, idlest))
+        RadioManager.migrations += 1
+        return True
+
+    @staticmethod
+    def pool_statistics() -> RadioPoolStatistics:
+        """The load of the Crazyradios of the pool"""
+        with RadioManager._lock:
+            dongles = {}
+            for devid in RadioManager._pool_devids():
+                shared_radio = RadioManager._opened_radio(devid)
+                statistics = shared_radio.statistics().values() if shared_radio else []
+                dongles[devid] = DongleStatistics(
+                    len(statistics),
+                    len([p for p in RadioManager._pooled if p.devid == devid]),
+                    sum(s.packet_rate for s in statistics),
+                    sum(s.ack_rate for s in statistics),
+                    shared_radio.reconfigurations if shared_radio else 0)
+            return RadioPoolStatistics(dongles, RadioManager.migrations)
+
+    @staticmethod
+    def dongle_of(uri: str):
+        """
+        The devid of the Crazyradio used by a link, to group the links that
+        share a Crazyradio. Serial numbers are resolved to the devid. Pooled
+        links (radio://*/...) can be put on any Crazyradio and links that are
+        not radio links do not share anything, each of them is a group of its
+        own keyed by the URI.
+        """
+        try:
+            devid = RadioDriver.parse_uri(uri)[0]
+        except Exception:
+            # Not a radio URI or an unknown serial, connecting will tell
+            return uri
+        return devid if devid is not None else uri
+
+    @staticmethod
+    def _open_pooled() -> _PooledRadioInstance:
+        with RadioManager._lock:
+            loads = RadioManager._loads()
+            if not loads:
+                raise Exception('No Crazyradio in the pool')
+
+            links = {devid: len([p for p in RadioManager._pooled if p.devid == devid]) for devid in loads}
+            devid = min(loads, key=lambda devid: (loads[devid], links[devid]))
+            pooled = _PooledRadioInstance(devid, RadioManager._shared_radio(devid).open_instance())
+            RadioManager._pooled.append(pooled)
+
+            if RadioManager._balancer is None:
+                RadioManager._balancer = _PoolBalancer(RadioManager.REBALANCE_PERIOD)
+                RadioManager._balancer.start()
+
+            return pooled
+
+    @staticmethod
+    def _pool_closed(pooled: _PooledRadioInstance):
+        with RadioManager._lock:
+            if pooled in RadioManager._pooled:
+                RadioManager._pooled.remove(pooled)
+            if not RadioManager._pooled and RadioManager._balancer is not None:
+                RadioManager._balancer.stop()
+                RadioManager._balancer = None
+
+    @staticmethod
+    def _shared_radio(devid: int) -> _SharedRadio:
+        """The shared radio of devid, opened if needed. Called with the lock held"""
+        if len(RadioManager._radios) <= devid:
+            padding = [None] * (devid - len(RadioManager._radios) + 1)
+            RadioManager._radios.extend(padding)
+
+        shared_radio = RadioManager._radios[devid]
+        if not shared_radio:
+            shared_radio = _SharedRadio(devid)
+            RadioManager._radios[devid] = shared_radio
+
+        return shared_radio
+
+    @staticmethod
+    def _opened_radio(devid: int) -> Optional[_SharedRadio]:
+        if devid < len(RadioManager._radios):
+            return RadioManager._radios[devid]
+        return None
+
+    @staticmethod
+    def _pool_devids() -> List[int]:
+        if RadioManager._pool is not None:
+            return RadioManager._pool
+        return list(range(len(crazyradio.get_serials())))
+
+    @staticmethod
+    def _rate(statistics: _SharedRadioStatistics, estimate: float) -> float:
+        return statistics.packet_rate if statistics.measured else estimate
+
+    @staticmethod
+    def _average_rate() -> float:
+        """The average packet rate of the measured links on the pool"""
+        rates = []
+        for devid in RadioManager._pool_devids():
+            shared_radio = RadioManager._opened_radio(devid)
+            if shared_radio:
+                rates += [s.packet_rate for s in shared_radio.statistics().values() if s.measured]
+        return sum(rates) / len(rates) if rates else 0.0
+
+    @staticmethod
+    def _loads() -> dict:
+        """The estimated packet rate of each Crazyradio of the pool"""
+        estimate = RadioManager._average_rate()
+        loads = {}
+        for devid in RadioManager._pool_devids():
+            shared_radio = RadioManager._opened_radio(devid)
+            statistics = shared_radio.statistics().values() if shared_radio else []
+            loads[devid] = sum(RadioManager._rate(s, estimate) for s in statistics)
+        return loads
+
 
 class RadioDriver(CRTPDriver):
     """ Crazyradio link driver """
@@ -247,12 +706,24 @@ class RadioDriver(CRTPDriver):
         self._thread = None
         self.needs_resending = True
         self.rate_limit = None
+        self.rate_limiter = RateLimiter()
+        self.poll_latency = None
 
     def connect(self, uri, radio_link_statistics_callback, link_error_callback):
         """
         Connect the link driver to a specified URI of the format:
         radio://<dongle nbr>/<radio channel>/[250K,1M,2M]
 
+        With * as dongle nbr the link uses the least loaded dongle of the
+        pool, see RadioManager.
+
+        The query parameter rate_limit limits the packet rate (packets/s)
+        of the link and port_rate_limit the rate of CRTP ports, for instance
+        port_rate_limit=6:50,3:100. Only packets to the Crazyflie are
+        limited, polls for the downlink are not. poll_latency (ms) is the
+        longest time an idle link waits before polling the Crazyflie for
+        downlink packets. The limits can be changed with rate_limiter.
+
         The callback for radio link statistics can be called at any moment from the
         driver to report back the radio link statistics. The callback from linkError
         will be called when a error occurs with
@@ -262,6 +733,10 @@ class RadioDriver(CRTPDriver):
         devid, channel, datarate, address, rate_limit = self.parse_uri(uri)
         self.uri = uri
         self.rate_limit = rate_limit
+        self.poll_latency = self.parse_poll_latency(uri)
+        self.rate_limiter.set_rate(rate_limit)
+        for port, rate in self.parse_port_rate_limits(uri).items():
+            self.rate_limiter.set_rate(rate, port)
 
         if self._radio is None:
             self._radio = RadioManager.open(devid)
@@ -278,8 +753,9 @@ class RadioDriver(CRTPDriver):
 
         # Prepare the inter-thread communication queue
         self.in_queue = queue.Queue()
-        # Limited size out queue to avoid "ReadBack" effect
-        self.out_queue = queue.Queue(1)
+        # Limited size out queue per priority class to avoid "ReadBack"
+        # effect, see out_queue.statistics() for the queue metrics
+        self.out_queue = PriorityOutQueue()
 
         # Launch the comm thread
         self._thread = _RadioDriverThread(self._radio,
@@ -288,7 +764,8 @@ class RadioDriver(CRTPDriver):
                                           radio_link_statistics_callback,
                                           link_error_callback,
                                           self,
-                                          rate_limit)
+                                          self.rate_limiter,
+                                          self.poll_latency)
         self._thread.start()
 
         self.link_error_callback = link_error_callback
@@ -303,8 +780,10 @@ class RadioDriver(CRTPDriver):
         parsed_query = parse_qs(parsed_uri.query)
         parsed_path = parsed_uri.path.strip('/').split('/')
 
-        # Open the USB dongle
-        if len(parsed_uri.netloc) < 10 and parsed_uri.netloc.isdigit():
+        # Open the USB dongle, any dongle of the pool for *
+        if parsed_uri.netloc == '*':
+            devid = None
+        elif len(parsed_uri.netloc) < 10 and parsed_uri.netloc.isdigit():
             devid = int(parsed_uri.netloc)
         else:
             try:
@@ -341,6 +820,24 @@ class RadioDriver(CRTPDriver):
 
         return devid, channel, datarate, address, rate_limit
 
+    @staticmethod
+    def parse_port_rate_limits(uri: str):
+        """The port_rate_limit query of uri as a dict of port: packets/s"""
+        limits = {}
+        for value in parse_qs(urlparse(uri).query).get('port_rate_limit', []):
+            for limit in value.split(','):
+                port, rate = limit.split(':')
+                limits[int(port, 0)] = float(rate)
+        return limits
+
+    @staticmethod
+    def parse_poll_latency(uri: str):
+        """The poll_latency query of uri in seconds, None if not set"""
+        values = parse_qs(urlparse(uri).query).get('poll_latency')
+        if not values:
+            return None
+        return float(values[0]) / 1000.0
+
     def receive_packet(self, wait=0):
         """
         Receive a packet though the link. This call is blocking but will
@@ -363,7 +860,10 @@ class RadioDriver(CRTPDriver):
                 return None
 
     def send_packet(self, pk) -> bool:
-        """ Send the packet pk though the link """
+        """
+        Send the packet pk though the link. Only waits if the priority class
+        of the packet is full, streamed setpoints replace the queued one.
+        """
         try:
             self.out_queue.put(pk, True, 2)
             return True
@@ -386,7 +886,8 @@ class RadioDriver(CRTPDriver):
                                           self.radio_link_statistics_callback,
                                           self.link_error_callback,
                                           self,
-                                          self.rate_limit)
+                                          self.rate_limiter,
+                                          self.poll_latency)
         self._thread.start()
 
     def close(self):
@@ -399,8 +900,7 @@ class RadioDriver(CRTPDriver):
             self._radio.close()
         self._radio = None
 
-        while not self.out_queue.empty():
-            self.out_queue.get()
+        self.out_queue.clear()
 
         # Clear callbacks
         self.link_error_callback = None
@@ -518,6 +1018,142 @@ class RadioDriver(CRTPDriver):
         return 'radio'
 
 
+class _AdaptivePolling:
+    """
+    Decides how long the radio thread waits for a packet to send before it
+    polls the Crazyflie with a null packet.
+
+    The Crazyflie can only send packets in acks, so the poll rate sets the
+    downlink latency. Polls are sent back to back while packets are coming
+    down and while replies to requests are outstanding. When the link is
+    idle the poll interval is set by the latency budget and by the rate of
+    the started log blocks, which is known from the log settings packets
+    sent to the Crazyflie.
+
+    Links sharing a Crazyradio get poll slots in proportion to their
+    demand, as the shared radio serves the polls that are queued.
+    """
+
+    DEFAULT_LATENCY = 0.01
+    # Empty acks in a row before the link is considered idle
+    EMPTY_ACKS_BEFORE_IDLE = 10
+    # Time to wait for the reply to a request
+    REPLY_TIMEOUT = 0.1
+    # Polls per expected log packet when idle
+    POLLS_PER_LOG_PACKET = 2
+
+    # Ports where requests from the host are answered
+    REQUEST_PORTS = (CRTPPort.PARAM, CRTPPort.MEM, CRTPPort.LOGGING,
+                     CRTPPort.PLATFORM, CRTPPort.LINKCTRL)
+
+    _LOG_CHAN_SETTINGS = 1
+    _LOG_CMD_DELETE_BLOCK = 2
+    _LOG_CMD_START_LOGGING = 3
+    _LOG_CMD_STOP_LOGGING = 4
+    _LOG_CMD_RESET_LOGGING = 5
+
+    def __init__(self, latency: Optional[float] = None):
+        self.latency = latency if latency is not None else self.DEFAULT_LATENCY
+        self._empty_acks = 0
+        # (port, channel) -> [outstanding requests, deadline], the replies
+        # come on the channel of the request
+        self._requests = {}
+        # log block id -> period in seconds
+        self._log_periods = {}
+
+    @property
+    def log_rate(self) -> float:
+        """The expected rate of log packets from the started log blocks"""
+        return sum(1.0 / period for period in self._log_periods.values())
+
+    def sent(self, packet: Optional[CRTPPacket]):
+        """Called for every packet sent to the Crazyflie, None for null packets"""
+        if packet is None:
+            return
+
+        if packet.port in self.REQUEST_PORTS:
+            request = self._requests.setdefault((packet.port, packet.channel), [0, 0.0])
+            request[0] += 1
+            request[1] = time.time() + self.REPLY_TIMEOUT
+
+        if packet.port == CRTPPort.LOGGING and packet.channel == self._LOG_CHAN_SETTINGS and len(packet.data) > 0:
+            cmd = packet.data[0]
+            if cmd == self._LOG_CMD_START_LOGGING and len(packet.data) > 2 and packet.data[2] > 0:
+                self._log_periods[packet.data[1]] = packet.data[2] / 100.0
+            elif cmd in (self._LOG_CMD_STOP_LOGGING, self._LOG_CMD_DELETE_BLOCK) and len(packet.data) > 1:
+                self._log_periods.pop(packet.data[1], None)
+            elif cmd == self._LOG_CMD_RESET_LOGGING:
+                self._log_periods.clear()
+
+    def received(self, packet: Optional[CRTPPacket]):
+        """Called for every ack, packet is None if the ack was empty"""
+        # Null packets from the Crazyflie, possibly with RSSI, carry no data
+        if packet is None or (packet.header & 0xF3) == 0xF3:
+            self._empty_acks = min(self._empty_acks + 1, self.EMPTY_ACKS_BEFORE_IDLE)
+            return
+
+        self._empty_acks = 0
+        # Unsolicited packets, such as log data, do not answer a request
+        key = (packet.port, packet.channel)
+        request = self._requests.get(key)
+        if request is not None:
+            request[0] -= 1
+            if request[0] <= 0:
+                del self._requests[key]
+
+    def wait_time(self) -> float:
+        """How long to wait for a packet to send before polling"""
+        if self._empty_acks < self.EMPTY_ACKS_BEFORE_IDLE:
+            return 0
+
+        now = time.time()
+        for key in [key for key, request in self._requests.items() if request[1] < now]:
+            del self._requests[key]
+        if len(self._requests) > 0:
+            return 0
+
+        wait = self.latency
+        log_rate = self.log_rate
+        if log_rate > 0:
+            wait = min(wait, 1.0 / (log_rate * self.POLLS_PER_LOG_PACKET))
+        return wait
+
+
+class _FrameBuffers:
+    """
+    Preallocated radio frames, one for each frame length, used to send
+    packets without allocating. A frame is only reused once the previous
+    send of the same length has been acked, as the radio thread has one
+    frame in flight.
+
+    The frames are arrays, which the USB layer uses without a copy, and are
+    filled through memoryviews.
+    """
+
+    MAX_FRAME_SIZE = CRTPPacket.MAX_DATA_SIZE + 1
+
+    def __init__(self):
+        self._frames = [array.array('B', bytes(size)) for size in range(self.MAX_FRAME_SIZE + 1)]
+        self._views = [memoryview(frame) for frame in self._frames]
+
+    def null_packet(self):
+        frame = self._frames[1]
+        frame[0] = 0xFF
+        return frame
+
+    def frame(self, packet: CRTPPacket):
+        """The frame with the header and data of packet"""
+        data = packet.data
+        size = len(data) + 1
+        if size > self.MAX_FRAME_SIZE:
+            # Too large for the radio, sent as is
+            return array.array('B', bytes([packet.header]) + bytes(data))
+        view = self._views[size]
+        view[0] = packet.header
+        view[1:] = data
+        return self._frames[size]
+
+
 # Transmit/receive radio thread
 class _RadioDriverThread(threading.Thread):
     """
@@ -525,7 +1161,9 @@ class _RadioDriverThread(threading.Thread):
     Crazyradio USB driver. """
 
     def __init__(self, radio, inQueue, outQueue,
-                 radio_link_statistics_callback, link_error_callback, link, rate_limit: Optional[int]):
+                 radio_link_statistics_callback, link_error_callback, link,
+                 rate_limiter: Optional[RateLimiter] = None,
+                 poll_latency: Optional[float] = None):
         """ Create the object """
         threading.Thread.__init__(self, name='RadioDriverThread')
         self._radio = radio
@@ -535,7 +1173,8 @@ class _RadioDriverThread(threading.Thread):
         self._link_error_callback = link_error_callback
         self._radio_link_statistics = RadioLinkStatistics(radio_link_statistics_callback)
         self._retry_before_disconnect = _nr_of_retries
-        self.rate_limit = rate_limit
+        self._rate_limiter = rate_limiter
+        self._polling = _AdaptivePolling(poll_latency)
 
         self._curr_up = 0
         self._curr_down = 1
@@ -573,9 +1212,9 @@ class _RadioDriverThread(threading.Thread):
 
     def run(self):
         """ Run the receiver thread """
-        dataOut = array.array('B', [0xFF])
+        frames = _FrameBuffers()
+        dataOut = frames.null_packet()
         waitTime = 0
-        emptyCtr = 0
         ackStatus = None
 
         # Try up to 10 times to enable the safelink mode
@@ -627,43 +1266,31 @@ class _RadioDriverThread(threading.Thread):
             # next packet to send is prepared
             # TODO: This does not seem to work since there is always a byte filled in the data even with null packets
             if (len(data) > 0):
-                inPacket = CRTPPacket(data[0], list(data[1:]))
+                # The payload is copied once, straight from the ack buffer
+                inPacket = CRTPPacket.from_buffer(data)
                 self._in_queue.put(inPacket)
-                waitTime = 0
-                emptyCtr = 0
+                self._polling.received(inPacket)
             else:
-                emptyCtr += 1
-                if (emptyCtr > 10):
-                    emptyCtr = 10
-                    # Relaxation time if the last 10 packet where empty
-                    waitTime = 0.01
-                else:
-                    waitTime = 0
-
-            # If there is a rate limit setup, sleep here to force the rate limit
-            if self.rate_limit:
-                time.sleep(1.0/self.rate_limit)
-                waitTime = 0
+                self._polling.received(None)
+            waitTime = self._polling.wait_time()
 
-            # get the next packet to send of relaxation (wait 10ms)
+            # get the next packet to send or poll when the wait time is out,
+            # packets over the rate limits stay queued
             outPacket = None
             try:
-                outPacket = self._out_queue.get(True, waitTime)
+                if self._rate_limiter is not None and self._rate_limiter.limited:
+                    outPacket = self._out_queue.get(True, waitTime, accept=self._rate_limiter.take)
+                else:
+                    outPacket = self._out_queue.get(True, waitTime)
             except queue.Empty:
                 outPacket = None
-
-            dataOut = array.array('B')
+            self._polling.sent(outPacket)
 
             if outPacket:
-                dataOut.append(outPacket.header)
-                for X in outPacket.data:
-                    if isinstance(X, int):
-                        dataOut.append(X)
-                    else:
-                        dataOut.append(ord(X))
+                dataOut = frames.frame(outPacket)
             else:
                 # If no packet to send, send a null packet
-                dataOut.append(0xFF)
+                dataOut = frames.null_packet()
 
             self._radio_link_statistics.update(ackStatus, outPacket)
 
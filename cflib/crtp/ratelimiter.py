@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+#
+# ,---------,       ____  _ __
+# |  ,-^-,  |      / __ )(_) /_______________ _____  ___
+# | (  O  ) |     / __  / / __/ ___/ ___/ __ `/_  / / _ \
+# | / ,--'  |    / /_/ / / /_/ /__/ /  / /_/ / / /_/  __/
+#    +------`   /_____/_/\__/\___/_/   \__,_/ /___/\___/
+#
+# Copyright (C) 2026 Bitcraze AB
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, in version 3.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+Token bucket rate limiting of the packets sent on a link.
+"""
+import threading
+import time
+
+from . import outqueue
+
+__author__ = 'Bitcraze AB'
+__all__ = ['RateLimiter']
+
+
+class _TokenBucket:
+
+    def __init__(self, rate, burst):
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self.tokens = self.burst
+        self._last = time.time()
+
+    def refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self._last) * self.rate)
+        self._last = now
+
+
+class RateLimiter:
+    """
+    Limits the rate of the packets sent on a link, for the whole link and
+    for each CRTP port. A packet is sent when there is a token in the bucket
+    of the link and in the bucket of its port. Buckets refill at their rate
+    and hold at most burst tokens, by default the tokens of BURST_TIME
+    seconds. Emergency stops are never limited and do not use tokens.
+
+    take() never waits, a packet that is not allowed stays queued while
+    other packets, and polls for the downlink, are sent.
+    """
+
+    BURST_TIME = 0.1
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._link = None
+        self._ports = {}
+
+    def set_rate(self, rate, port=None, burst=None):
+        """
+        Set the rate limit of the link, or of a port
+
+        :param rate: Packets per second, None to remove the limit
+        :param port: The CRTP port, None for the whole link
+        :param burst: Packets that can be sent back to back after an idle
+         period, at least one
+        """
+        bucket = None
+        if rate is not None:
+            if burst is None:
+                burst = rate * self.BURST_TIME
+            bucket = _TokenBucket(rate, max(1.0, burst))
+
+        with self._lock:
+            if port is None:
+                self._link = bucket
+            elif bucket is None:
+                self._ports.pop(port, None)
+            else:
+                self._ports[port] = bucket
+
+    @property
+    def limited(self):
+        """True if any limit is set"""
+        with self._lock:
+            return self._link is not None or len(self._ports) > 0
+
+    def take(self, pk):
+        """
+        Take the tokens to send pk, if they are all available
+
+        :return: True if the packet can be sent
+        """
+        with self._lock:
+            buckets = [bucket for bucket in (self._link, self._ports.get(pk.port)) if bucket is not None]
+            if not buckets or outqueue.classify(pk)[0] == outqueue.EMERGENCY:
+                return True
+
+            now = time.time()
+            for bucket in buckets:
+                bucket.refill(now)
+            if any(bucket.tokens < 1.0 for bucket in buckets):
+                return False
+
+            for bucket in buckets:
+                bucket.tokens -= 1.0
+            return True
+
+    def levels(self):
+        """
+        The fill level of the buckets, between 0.0 (empty) and 1.0 (full),
+        keyed by port with None for the link
+        """
+        now = time.time()
+        with self._lock:
+            buckets = dict(self._ports)
+            if self._link is not None:
+                buckets[None] = self._link
+            levels = {}
+            for port, bucket in buckets.items():
+                bucket.refill(now)
+                levels[port] = bucket.tokens / bucket.burst
+            return levels
@@ -28,6 +28,8 @@ USB driver for the Crazyradio USB dongle.
 import logging
 import os
 import platform
+import queue
+import threading
 
 import libusb_package
 import usb
@@ -98,6 +100,79 @@ class _radio_ack:
     data = ()
 
 
+class _BurstWriter(threading.Thread):
+    """
+    Does the USB writes of a burst, so that the write of the next packet is
+    in flight while the ack of the previous one is read.
+
+    The Crazyradio applies a new address as soon as it gets it, also to a
+    packet that is still waiting in its buffer. Before the address is
+    changed the writer waits for the acks of all the packets written so far.
+    """
+
+    def __init__(self, radio):
+        threading.Thread.__init__(self, name='Crazyradio Burst Writer')
+        self.daemon = True
+        self._radio = radio
+        self._packets = queue.Queue()
+        # True for each packet that was written, False if the write failed
+        # and None if the burst was cancelled before it was written
+        self.results = queue.Queue()
+
+        self._condition = threading.Condition()
+        self._written = 0
+        self._acked = 0
+        self._cancelled = False
+
+    def write(self, packets, addresses):
+        with self._condition:
+            self._written = 0
+            self._acked = 0
+            self._cancelled = False
+        for packet, address in zip(packets, addresses):
+            self._packets.put((packet, address))
+
+    def acked(self):
+        """Called when the ack of a written packet has been read"""
+        with self._condition:
+            self._acked += 1
+            self._condition.notify_all()
+
+    def cancel(self):
+        """Do not write the packets that are left of the burst"""
+        with self._condition:
+            self._cancelled = True
+            self._condition.notify_all()
+
+    def stop(self):
+        self._packets.put(None)
+
+    def run(self):
+        while True:
+            item = self._packets.get()
+            if item is None:
+                break
+            packet, address = item
+
+            with self._condition:
+                if address is not None and address != self._radio.current_address:
+                    self._condition.wait_for(lambda: self._cancelled or self._acked == self._written)
+                cancelled = self._cancelled
+            if cancelled:
+                self.results.put(None)
+                continue
+
+            try:
+                if address is not None:
+                    self._radio.set_address(address)
+                self._radio.handle.write(endpoint=1, data=packet, timeout=1000)
+                with self._condition:
+                    self._written += 1
+                self.results.put(True)
+            except Exception:
+                self.results.put(False)
+
+
 class Crazyradio:
     """ Used for communication with the Crazyradio USB dongle """
     # configuration constants
@@ -117,6 +192,7 @@ class Crazyradio:
         self.current_address = None
         self.current_datarate = None
         self.devid = devid
+        self._burst_writer = None
 
         if device is None:
             try:
@@ -167,6 +243,10 @@ class Crazyradio:
             pass
 
     def close(self):
+        if self._burst_writer is not None:
+            self._burst_writer.stop()
+            self._burst_writer = None
+
         if self.dev:
             usb.util.dispose_resources(self.dev)
 
@@ -280,7 +360,6 @@ class Crazyradio:
         """ Send a packet and receive the ack from the radio dongle
             The ack contains information about the packet transmission
             and a data payload if the ack packet contained any """
-        ackIn = None
         data = None
         try:
             self.handle.write(endpoint=1, data=dataOut, timeout=1000)
@@ -296,6 +375,103 @@ class Crazyradio:
         except usb.USBError:
             pass
 
+        return self._parse_ack(data)
+
+    def send_packet_no_ack(self, dataOut):
+        """ Send a packet without reading an ack. With auto ack disabled the
+            Crazyradio does not answer, reading would wait for the timeout. """
+        try:
+            self.handle.write(endpoint=1, data=dataOut, timeout=1000)
+
+            self._log_packet(
+                False,
+                self.devid,
+                self.current_address,
+                self.current_channel,
+                dataOut
+            )
+        except usb.USBError:
+            pass
+
+    def send_packets(self, packets, addresses=None):
+        """ Send packets and receive their acks, in the same order. The
+            USB write of a packet is done while the ack of the previous
+            packet is read, which saves a USB round trip per packet.
+            addresses is the address of each packet, None to send all
+            packets with the current configuration. The writes pause at
+            each address change until the sent packets are acked, packets
+            to the same address should follow each other. """
+        if addresses is None:
+            addresses = [None] * len(packets)
+
+        if len(packets) < 2:
+            return self._send_one_at_a_time(packets, addresses)
+
+        if self._burst_writer is None:
+            self._burst_writer = _BurstWriter(self)
+            self._burst_writer.start()
+
+        self._burst_writer.write(packets, addresses)
+
+        acks = []
+        for n, packet in enumerate(packets):
+            data = None
+            if self._burst_writer.results.get():
+                try:
+                    data = self.handle.read(0x81, 64, timeout=1000)
+                    self._log_packet(
+                        False,
+                        self.devid,
+                        self.current_address,
+                        self.current_channel,
+                        packet
+                    )
+                except usb.USBError:
+                    # A late ack would be read as the ack of the next
+                    # packet. Stop the burst and send the rest again.
+                    self._burst_writer.acked()
+                    acks.append(None)
+                    return acks + self._stop_burst(packets[n + 1:], addresses[n + 1:])
+                self._burst_writer.acked()
+            acks.append(self._parse_ack(data))
+
+        return acks
+
+    def _send_one_at_a_time(self, packets, addresses):
+        acks = []
+        for packet, address in zip(packets, addresses):
+            if address is not None:
+                self.set_address(address)
+            acks.append(self.send_packet(packet))
+        return acks
+
+    def _stop_burst(self, packets, addresses):
+        """
+        Cancel the rest of a burst after a failed read. The acks of the
+        packets that were written already are read, the others are sent one
+        at a time.
+        """
+        self._burst_writer.cancel()
+        acks = []
+        resend = []
+        for packet, address in zip(packets, addresses):
+            written = self._burst_writer.results.get()
+            data = None
+            if written:
+                try:
+                    data = self.handle.read(0x81, 64, timeout=1000)
+                except usb.USBError:
+                    pass
+            elif written is None:
+                resend.append(len(acks))
+            acks.append(self._parse_ack(data))
+
+        for n in resend:
+            acks[n] = self._send_one_at_a_time([packets[n]], [addresses[n]])[0]
+        return acks
+
+    def _parse_ack(self, data):
+        ackIn = None
         if data is not None:
             ackIn = _radio_ack()
             if data[0] != 0:
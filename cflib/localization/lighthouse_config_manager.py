@@ -117,18 +117,21 @@ class LighthouseConfigWriter:
         self._calibs_to_persist = []
         self._write_failed_for_one_or_more_objects = False
         self._nr_of_base_stations = nr_of_base_stations
+        self._diff = False
 
-    def write_and_store_config(self, data_stored_cb, geos=None, calibs=None, system_type=None):
+    def write_and_store_config(self, data_stored_cb, geos=None, calibs=None, system_type=None, diff=False):
         """
         Transfer geometry and calibration data to the Crazyflie and persist to permanent storage.
         The callback is called when done.
         If geos or calibs is None, no data will be written for that data type.
         If geos or calibs is a dictionary, the values for the base stations in the dictionary will
         transferred to the Crazyflie, data for all other base stations will be invalidated.
+        If diff is True, only data that differs from the data in the Crazyflie is transferred.
         """
         if self._data_stored_cb is not None:
             raise Exception('Write already in prgress')
         self._data_stored_cb = data_stored_cb
+        self._diff = diff
 
         self._cf.loc.receivedLocationPacket.add_callback(self._received_location_packet)
 
@@ -159,22 +162,22 @@ class LighthouseConfigWriter:
 
         self._next()
 
-    def write_and_store_config_from_file(self, data_stored_cb, file_name):
+    def write_and_store_config_from_file(self, data_stored_cb, file_name, diff=False):
         """
         Read system configuration data from file and write/persist to the Crazyflie.
         Geometry and calibration data for base stations that are not in the config file will be invalidated.
         """
         geos, calibs, system_type = LighthouseConfigFileManager.read(file_name)
-        self.write_and_store_config(data_stored_cb, geos=geos, calibs=calibs, system_type=system_type)
+        self.write_and_store_config(data_stored_cb, geos=geos, calibs=calibs, system_type=system_type, diff=diff)
 
     def _next(self):
         if self._geos_to_write is not None:
-            self._helper.write_geos(self._geos_to_write, self._upload_done)
+            self._helper.write_geos(self._geos_to_write, self._upload_done, diff=self._diff)
             self._geos_to_write = None
             return
 
         if self._calibs_to_write is not None:
-            self._helper.write_calibs(self._calibs_to_write, self._upload_done)
+            self._helper.write_calibs(self._calibs_to_write, self._upload_done, diff=self._diff)
             self._calibs_to_write = None
             return
 
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+#
+#     ||          ____  _ __
+#  +------+      / __ )(_) /_______________ _____  ___
+#  | 0xBC |     / __  / / __/ ___/ ___/ __ `/_  / / _ \
+#  +------+    / /_/ / / /_/ /__/ /  / /_/ / / /_/  __/
+#   ||  ||    /_____/_/\__/\___/_/   \__,_/ /___/\___/
+#
+#  Copyright (C) 2026 Bitcraze AB
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+import time
+import unittest
+from threading import Event
+
+from single_cf_grounded import TestSingleCfGrounded
+
+from cflib.crazyflie import Crazyflie
+from cflib.crazyflie.mem import MemoryElement
+from cflib.crazyflie.syncCrazyflie import SyncCrazyflie
+
+
+class TestMemory(TestSingleCfGrounded):
+    READ_LENGTH = 1225
+    WINDOW_SIZES = [1, 2, 4, 8, 16]
+
+    def test_read_bandwidth_radio(self):
+        results = self.read_bandwidth(self.radioUri)
+        self.assertGreater(results[4], results[1])
+
+    def test_read_bandwidth_usb(self):
+        self.read_bandwidth(self.usbUri)
+
+    def read_bandwidth(self, uri, count=5):
+        results = {}
+        with SyncCrazyflie(uri, cf=Crazyflie(rw_cache='./cache')) as scf:
+            mems = scf.cf.mem.get_mems(MemoryElement.TYPE_MEMORY_TESTER)
+            if len(mems) == 0:
+                self.skipTest('No memory tester found')
+            mem = mems[0]
+            length = min(self.READ_LENGTH, mem.size)
+
+            done = Event()
+            scf.cf.mem.mem_read_cb.add_callback(lambda mem, addr, data: done.set())
+
+            for window_size in self.WINDOW_SIZES:
+                start_time = time.time()
+                for _ in range(count):
+                    done.clear()
+                    scf.cf.mem.read(mem, 0, length, window_size=window_size)
+                    self.assertTrue(done.wait(10))
+                end_time = time.time()
+
+                kbps = (count * length) / 1024 / (end_time - start_time)
+                print('Memory read for {} (window size {}): {:.2f} kB/s'.format(uri, window_size, kbps))
+                results[window_size] = kbps
+
+        return results
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,321 @@
+# -*- coding: utf-8 -*-
+#
+#     ||          ____  _ __
+#  +------+      / __ )(_) /_______________ _____  ___
+#  | 0xBC |     / __  / / __/ ___/ ___/ __ `/_  / / _ \
+#  +------+    / /_/ / / /_/ /__/ /  / /_/ / / /_/  __/
+#   ||  ||    /_____/_/\__/\___/_/   \__,_/ /___/\___/
+#
+#  Copyright (C) 2026 Bitcraze AB
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+import shutil
+import struct
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from cflib.bootloader import Bootloader
+from cflib.bootloader import FlashArtifact
+from cflib.bootloader import Target
+from cflib.bootloader import boottypes
+from cflib.bootloader.boottypes import TargetTypes
+from cflib.crazyflie.mem.memory_cache import MemoryCache
+from test.support.fake_bootloader_link import FakeBootloaderLink
+
+
+class TestBootloaderVerify(unittest.TestCase):
+    PAGE_SIZE = 1024
+    START_PAGE = 4
+
+    def setUp(self):
+        self.link = FakeBootloaderLink(target_id=TargetTypes.STM32, page_size=self.PAGE_SIZE)
+        self.image = bytes([(i * 7) & 0xff for i in range(2 * self.PAGE_SIZE + 100)])
+        self.artifact = FlashArtifact(self.image, Target('cf2', 'stm32', 'fw', [], []), None)
+
+        self.sut = Bootloader(None)
+        self.sut._cload.link = self.link
+        target = boottypes.Target(TargetTypes.STM32)
+        target.addr = TargetTypes.STM32
+        target.page_size = self.PAGE_SIZE
+        target.start_page = self.START_PAGE
+        self.sut._cload.targets[TargetTypes.STM32] = target
+
+    def test_that_flashed_image_is_verified(self):
+        # Fixture
+        start = self.START_PAGE * self.PAGE_SIZE
+        self.link.flash[start:start + len(self.image)] = self.image
+
+        # Test
+        self.sut._verify_flash([self.artifact])
+
+        # Assert
+        # No exception
+
+    def test_that_verification_fails_on_differing_page(self):
+        # Fixture
+        start = self.START_PAGE * self.PAGE_SIZE
+        self.link.flash[start:start + len(self.image)] = self.image
+        self.link.flash[start + 2 * self.PAGE_SIZE] ^= 0xff
+
+        # Test
+        # Assert
+        with self.assertRaisesRegex(Exception, 'page 6'):
+            self.sut._verify_flash([self.artifact])
+
+
+class TestBootloaderIncremental(unittest.TestCase):
+    PAGE_SIZE = 1024
+    START_PAGE = 16
+    PAGES = 20
+
+    def setUp(self):
+        self.link = FakeBootloaderLink(target_id=TargetTypes.STM32, page_size=self.PAGE_SIZE)
+        self.image = bytes([(i * 7) & 0xff for i in range(self.PAGES * self.PAGE_SIZE - 100)])
+        self.cache_dir = tempfile.mkdtemp()
+
+        self.sut = self._create_sut(cache=None)
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+
+    def test_that_only_changed_pages_are_written(self):
+        # Fixture
+        self._set_target(TargetTypes.NRF51, page_size=self.PAGE_SIZE)
+        self._flash_image(self.image)
+        new_image = self._change_pages(self.image, 3, 4, 9)
+
+        # Test
+        self.sut._internal_flash(self._artifact(new_image, 'nrf51'), incremental=True)
+
+        # Assert
+        self.assertEqual([(self.START_PAGE + 3, 2), (self.START_PAGE + 9, 1)], self._writes())
+        self.assertEqual(new_image, self._flashed_image(len(new_image)))
+
+    def test_that_whole_sector_is_written_on_stm32(self):
+        # Fixture
+        self._set_target(TargetTypes.STM32, page_size=self.PAGE_SIZE)
+        self._flash_image(self.image)
+        new_image = self._change_pages(self.image, 17)
+
+        # Test
+        self.sut._internal_flash(self._artifact(new_image, 'stm32'), incremental=True)
+
+        # Assert
+        # The sector at page 32 starts at page 16 of the image
+        self.assertEqual([(32, 4)], self._writes())
+        self.assertEqual(new_image, self._flashed_image(len(new_image)))
+
+    def test_that_nothing_is_written_when_image_is_unchanged(self):
+        # Fixture
+        self._set_target(TargetTypes.STM32, page_size=self.PAGE_SIZE)
+        self._flash_image(self.image)
+
+        # Test
+        self.sut._internal_flash(self._artifact(self.image, 'stm32'), incremental=True)
+
+        # Assert
+        self.assertEqual([], self._writes())
+
+    def test_that_manifest_is_used_instead_of_read_back(self):
+        # Fixture
+        self.sut = self._create_sut(cache=MemoryCache(rw_cache=self.cache_dir))
+        self._set_target(TargetTypes.NRF51, page_size=self.PAGE_SIZE)
+        self.sut._internal_flash(self._artifact(self.image, 'nrf51'))
+        new_image = self._change_pages(self.image, 5)
+
+        # A new cache instance to read the manifest from file
+        self.sut = self._create_sut(cache=MemoryCache(ro_cache=self.cache_dir))
+        self._set_target(TargetTypes.NRF51, page_size=self.PAGE_SIZE)
+        self.link.sent.clear()
+
+        # Test
+        self.sut._internal_flash(self._artifact(new_image, 'nrf51'), incremental=True)
+
+        # Assert
+        self.assertEqual([(self.START_PAGE + 5, 1)], self._writes())
+        # The token pages, the verification of all pages and the new token pages
+        last_page = self.START_PAGE + self.PAGES - 1
+        all_pages = list(range(self.START_PAGE, last_page + 1))
+        self.assertEqual([self.START_PAGE, last_page] + all_pages + [self.START_PAGE, last_page],
+                         self._read_pages())
+
+    def test_that_pages_skipped_by_manifest_are_verified(self):
+        # Fixture
+        self.sut = self._create_sut(cache=MemoryCache(rw_cache=self.cache_dir))
+        self._set_target(TargetTypes.NRF51, page_size=self.PAGE_SIZE)
+        self.sut._internal_flash(self._artifact(self.image, 'nrf51'))
+        # Changed by another tool, the first and last pages are the same
+        self._flash_image(self._change_pages(self.image, 8))
+        new_image = self._change_pages(self.image, 5)
+        self.link.sent.clear()
+
+        # Test
+        with self.assertRaisesRegex(Exception, 'page {}'.format(self.START_PAGE + 8)):
+            self.sut._internal_flash(self._artifact(new_image, 'nrf51'), incremental=True)
+
+        # Assert
+        self.assertEqual([(self.START_PAGE + 5, 1)], self._writes())
+        # The manifest is dropped, the next flash reads back and fixes the page
+        self.link.sent.clear()
+        self.sut._internal_flash(self._artifact(new_image, 'nrf51'), incremental=True)
+        self.assertEqual([(self.START_PAGE + 8, 1)], self._writes())
+        self.assertEqual(new_image, self._flashed_image(len(new_image)))
+
+    def test_that_sector_mapping_is_not_used_for_nrf51(self):
+        # Fixture
+        self._set_target(TargetTypes.NRF51, page_size=self.PAGE_SIZE)
+        self.sut._cload.mapping = [0, 16, 20, 24]
+        self._flash_image(self.image)
+        new_image = self._change_pages(self.image, 1)
+
+        # Test
+        self.sut._internal_flash(self._artifact(new_image, 'nrf51'), incremental=True)
+
+        # Assert
+        self.assertEqual([(self.START_PAGE + 1, 1)], self._writes())
+        self.assertEqual(new_image, self._flashed_image(len(new_image)))
+
+    def test_that_manifest_is_not_used_when_flash_has_changed(self):
+        # Fixture
+        self.sut = self._create_sut(cache=MemoryCache(rw_cache=self.cache_dir))
+        self._set_target(TargetTypes.NRF51, page_size=self.PAGE_SIZE)
+        self.sut._internal_flash(self._artifact(self.image, 'nrf51'))
+        other_image = self._change_pages(self.image, 0, 7)
+        self._flash_image(other_image)
+        self.link.sent.clear()
+
+        # Test
+        self.sut._internal_flash(self._artifact(self.image, 'nrf51'), incremental=True)
+
+        # Assert
+        self.assertEqual([(self.START_PAGE, 1), (self.START_PAGE + 7, 1)], self._writes())
+        self.assertEqual(self.image, self._flashed_image(len(self.image)))
+
+    def test_that_manifest_is_not_used_when_end_of_flash_has_changed(self):
+        # Fixture
+        self.sut = self._create_sut(cache=MemoryCache(rw_cache=self.cache_dir))
+        self._set_target(TargetTypes.NRF51, page_size=self.PAGE_SIZE)
+        self.sut._internal_flash(self._artifact(self.image, 'nrf51'))
+        self._flash_image(self._change_pages(self.image, 12, self.PAGES - 1))
+        self.link.sent.clear()
+
+        # Test
+        self.sut._internal_flash(self._artifact(self.image, 'nrf51'), incremental=True)
+
+        # Assert
+        self.assertEqual([(self.START_PAGE + 12, 1), (self.START_PAGE + self.PAGES - 1, 1)], self._writes())
+        self.assertEqual(self.image, self._flashed_image(len(self.image)))
+
+    def test_that_manifest_is_not_used_for_image_of_other_length(self):
+        # Fixture
+        self.sut = self._create_sut(cache=MemoryCache(rw_cache=self.cache_dir))
+        self._set_target(TargetTypes.NRF51, page_size=self.PAGE_SIZE)
+        self.sut._internal_flash(self._artifact(self.image, 'nrf51'))
+        self._flash_image(self._change_pages(self.image, 3))
+        self.link.sent.clear()
+
+        # Test
+        self.sut._internal_flash(self._artifact(self.image[:-self.PAGE_SIZE], 'nrf51'), incremental=True)
+
+        # Assert
+        self.assertEqual([(self.START_PAGE + 3, 1)], self._writes())
+
+    def _create_sut(self, cache):
+        sut = Bootloader(None, cache=cache)
+        sut._cload.link = self.link
+        sut.progress_cb = lambda message, percent: None
+        return sut
+
+    def _set_target(self, target_id, page_size):
+        self.link.target_id = target_id
+        target = boottypes.Target(target_id)
+        target.addr = target_id
+        target.page_size = page_size
+        target.buffer_pages = 10
+        target.flash_pages = 64
+        target.start_page = self.START_PAGE
+        target.cpuid = '01:02:03'
+        self.sut._cload.targets[target_id] = target
+
+    def _artifact(self, image, target):
+        return FlashArtifact(image, Target('cf2', target, 'fw', [], []), None)
+
+    def _flash_image(self, image):
+        start = self.START_PAGE * self.PAGE_SIZE
+        self.link.flash[start:start + len(image)] = image
+
+    def _flashed_image(self, length):
+        start = self.START_PAGE * self.PAGE_SIZE
+        return bytes(self.link.flash[start:start + length])
+
+    def _change_pages(self, image, *pages):
+        changed = bytearray(image)
+        for page in pages:
+            changed[page * self.PAGE_SIZE] ^= 0xff
+        return bytes(changed)
+
+    def _writes(self):
+        return [struct.unpack('<HH', pk.data[4:8]) for pk in self.link.sent if pk.data[1] == 0x18]
+
+    def _read_pages(self):
+        """The pages read back, in order"""
+        reads = [struct.unpack('<HH', pk.data[2:6]) for pk in self.link.sent if pk.data[1] == 0x1C]
+        return [page for (page, offset) in reads if offset == 0]
+
+
+class TestBootloaderFirmwareFlashed(unittest.TestCase):
+
+    def setUp(self):
+        self.sut = Bootloader(None)
+        self.sut.protocol_version = boottypes.BootVersion.CF2_PROTO_VER
+        self.sut._cload.targets[TargetTypes.NRF51] = boottypes.Target(TargetTypes.NRF51)
+        # The start page of the s110 softdevice
+        self.sut._cload.targets[TargetTypes.NRF51].start_page = 88
+        self.sut.progress_cb = lambda message, percent: None
+        self.artifacts = [
+            FlashArtifact(b'\x01', Target('cf2', 'nrf51', 'bootloader+softdevice', ['sd-s130'], []), None),
+            FlashArtifact(b'\x02', Target('cf2', 'stm32', 'fw', [], []), None)]
+
+    def test_that_firmware_is_not_flashed_when_application_write_fails_after_softdevice(self):
+        # Fixture
+        def flash_softdevice(artifacts):
+            with self.sut._timed(Bootloader.PHASE_WRITE):
+                pass
+
+        # Test
+        with patch.object(self.sut, '_get_current_nrf51_sd_version', return_value='sd-s110'), \
+                patch.object(self.sut, '_get_required_nrf51_sd_version', return_value='sd-s130'), \
+                patch.object(self.sut, '_get_provided_nrf51_sd_version', return_value='sd-s130'), \
+                patch.object(self.sut, '_flash_nrf51_sd', side_effect=flash_softdevice), \
+                patch.object(self.sut, '_flash_flash', side_effect=Exception('Write failed')):
+            with self.assertRaisesRegex(Exception, 'Write failed'):
+                self.sut.flash(None, [], artifacts=self.artifacts)
+
+        # Assert
+        self.assertIn(Bootloader.PHASE_WRITE, self.sut.phase_timings)
+        self.assertFalse(self.sut.firmware_flashed)
+
+    def test_that_firmware_is_flashed_when_application_is_written(self):
+        # Fixture
+
+        # Test
+        with patch.object(self.sut, '_flash_flash'):
+            self.sut.flash(None, [], artifacts=self.artifacts[1:])
+
+        # Assert
+        self.assertTrue(self.sut.firmware_flashed)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+#
+#     ||          ____  _ __
+#  +------+      / __ )(_) /_______________ _____  ___
+#  | 0xBC |     / __  / / __/ ___/ ___/ __ `/_  / / _ \
+#  +------+    / /_/ / / /_/ /__/ /  / /_/ / / /_/  __/
+#   ||  ||    /_____/_/\__/\___/_/   \__,_/ /___/\___/
+#
+#  Copyright (C) 2026 Bitcraze AB
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+import struct
+import time
+import unittest
+from unittest.mock import patch
+
+from cflib.bootloader.boottypes import Target
+from cflib.bootloader.cloader import _NoAnswer
+from cflib.bootloader.cloader import Cloader
+from cflib.crtp.crtpstack import CRTPPacket
+from test.support.fake_bootloader_link import FakeBootloaderLink
+
+
+class TestCloader(unittest.TestCase):
+    TARGET_ID = 0xFF
+    PAGE_SIZE = 1024
+
+    def setUp(self):
+        self.link = FakeBootloaderLink(target_id=self.TARGET_ID, page_size=self.PAGE_SIZE)
+        self.image = bytes([(i * 13) & 0xff for i in range(3 * self.PAGE_SIZE)])
+
+        self.sut = Cloader(None)
+        self.sut.link = self.link
+        self.sut.targets[self.TARGET_ID] = Target(self.TARGET_ID)
+        self.sut.targets[self.TARGET_ID].page_size = self.PAGE_SIZE
+
+    def test_that_buffer_is_uploaded_and_flashed(self):
+        # Fixture
+
+        # Test
+        for page in range(3):
+            self.sut.upload_buffer(self.TARGET_ID, page, 0,
+                                   self.image[page * self.PAGE_SIZE:(page + 1) * self.PAGE_SIZE])
+        actual = self.sut.write_flash(self.TARGET_ID, 0, 5, 3)
+
+        # Assert
+        self.assertTrue(actual)
+        self.assertEqual(0, self.sut.error_code)
+        self.assertEqual(self.image, self.link.flash[5 * self.PAGE_SIZE:8 * self.PAGE_SIZE])
+
+    def test_that_buffer_packets_are_full(self):
+        # Fixture
+
+        # Test
+        self.sut.upload_buffer(self.TARGET_ID, 0, 0, self.image[:self.PAGE_SIZE])
+
+        # Assert
+        self.assertEqual(41, len(self.link.sent))
+        self.assertEqual(6 + 25, len(self.link.sent[0].data))
+        self.assertEqual(6 + 24, len(self.link.sent[-1].data))
+
+    def test_that_flash_page_is_read_with_window(self):
+        # Fixture
+        self.link.flash[2 * self.PAGE_SIZE:3 * self.PAGE_SIZE] = self.image[:self.PAGE_SIZE]
+        self.link.latency = 0.001
+
+        # Test
+        actual = self.sut.read_flash(self.TARGET_ID, 2)
+
+        # Assert
+        self.assertEqual(self.image[:self.PAGE_SIZE], actual)
+        self.assertEqual(Cloader.DEFAULT_WINDOW_SIZE, self.link.max_in_flight)
+
+    def test_that_unanswered_read_is_sent_again(self):
+        # Fixture
+        self.link.flash[0:self.PAGE_SIZE] = self.image[:self.PAGE_SIZE]
+        self.link.drop_next = 1
+
+        # Test
+        actual = self.sut._transact(
+            [(bytes(pk.data), pk) for pk in self._read_requests(0, 3)], timeout=0.01, window_size=2)
+
+        # Assert
+        self.assertEqual(3, len(actual))
+        self.assertEqual(3 + 1, len(self.link.sent))
+
+    def test_that_read_fails_when_retries_are_exhausted(self):
+        # Fixture
+        self.link.drop_next = 100
+
+        # Test
+        with self.assertRaises(_NoAnswer):
+            self.sut._transact(
+                [(bytes(pk.data), pk) for pk in self._read_requests(0, 1)], timeout=0.001, retries=2)
+
+        # Assert
+        self.assertEqual(3, len(self.link.sent))
+
+    def test_that_unrelated_replies_do_not_hold_back_retries(self):
+        # Fixture
+        self.link.drop_next = 100
+        unrelated = CRTPPacket(0xFF, struct.pack('<BBHH', self.TARGET_ID, 0x1C, 7, 0))
+        self.link.receive_packet = lambda wait=0: unrelated
+
+        # Test
+        start = time.time()
+        with self.assertRaises(_NoAnswer):
+            self.sut._transact(
+                [(bytes(pk.data), pk) for pk in self._read_requests(0, 1)], timeout=0.01, retries=2)
+
+        # Assert
+        self.assertLess(time.time() - start, 1.0)
+        self.assertEqual(3, len(self.link.sent))
+
+    def test_that_failed_read_returns_none(self):
+        # Fixture
+
+        # Test
+        with patch.object(Cloader, '_transact', side_effect=_NoAnswer('No answer')):
+            actual = self.sut.read_flash(self.TARGET_ID, 0)
+
+        # Assert
+        self.assertIsNone(actual)
+
+    def _read_requests(self, page, count):
+        return [CRTPPacket(0xFF, struct.pack('<BBHH', self.TARGET_ID, 0x1C, page, i * 25)) for i in range(count)]
+
+
+if __name__ == '__main__':
+    unittest.main()
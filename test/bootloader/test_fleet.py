@@ -0,0 +1,236 @@
+# -*- coding: utf-8 -*-
+#
+#     ||          ____  _ __
+#  +------+      / __ )(_) /_______________ _____  ___
+#  | 0xBC |     / __  / / __/ ___/ ___/ __ `/_  / / _ \
+#  +------+    / /_/ / / /_/ /__/ /  / /_/ / / /_/  __/
+#   ||  ||    /_____/_/\__/\___/_/   \__,_/ /___/\___/
+#
+#  Copyright (C) 2026 Bitcraze AB
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+import json
+import os
+import tempfile
+import time
+import unittest
+import zipfile
+from threading import Lock
+
+from cflib.bootloader import Bootloader
+from cflib.bootloader.fleet import FleetFlasher
+
+
+class FakeBootloader:
+    """Records the flash_full() calls, failing the first ones if asked to"""
+
+    lock = Lock()
+    active = {}
+    max_active = {}
+
+    def __init__(self, uri, failures, calls, write_failures=None):
+        self.uri = uri
+        self.phase_timings = {}
+        self.firmware_flashed = False
+        self.in_bootloader = False
+        self._failures = failures
+        self._write_failures = write_failures if write_failures is not None else {}
+        self._calls = calls
+
+    def flash_full(self, warm, targets, artifacts, verify, incremental, progress_cb):
+        dongle = self.uri.split('/')[2]
+        with self.lock:
+            self._calls.append((self.uri, list(targets), artifacts))
+            self.active[dongle] = self.active.get(dongle, 0) + 1
+            self.max_active[dongle] = max(self.max_active.get(dongle, 0), self.active[dongle])
+
+        time.sleep(0.02)
+        self.phase_timings[Bootloader.PHASE_RESET] = 1.0
+        self.in_bootloader = True
+
+        with self.lock:
+            failures = self._write_failures.get(self.uri, 0)
+            if failures > 0:
+                # The softdevice is written, the application is not
+                self._write_failures[self.uri] = failures - 1
+                self.active[dongle] -= 1
+                self.phase_timings[Bootloader.PHASE_WRITE] = 0.5
+                raise Exception('Write failed')
+
+        self.phase_timings[Bootloader.PHASE_WRITE] = 2.0
+        self.firmware_flashed = True
+        progress_cb('Flashing', 50)
+        self.in_bootloader = False
+
+        with self.lock:
+            self.active[dongle] -= 1
+            failures = self._failures.get(self.uri, 0)
+            if failures > 0:
+                self._failures[self.uri] = failures - 1
+                raise Exception('Deck did not start')
+
+        self.phase_timings[Bootloader.PHASE_DECKS] = 3.0
+
+    def reset_to_firmware(self, boot_delay=0.0):
+        with self.lock:
+            self._calls.append((self.uri, 'reset_to_firmware', boot_delay))
+        self.in_bootloader = False
+        return True
+
+    def close(self):
+        pass
+
+
+class TestFleetFlasher(unittest.TestCase):
+
+    def setUp(self):
+        FakeBootloader.active = {}
+        FakeBootloader.max_active = {}
+        self.failures = {}
+        self.write_failures = {}
+        self.calls = []
+
+        fd, self.filename = tempfile.mkstemp(suffix='.zip')
+        os.close(fd)
+        with zipfile.ZipFile(self.filename, 'w') as zf:
+            zf.writestr('manifest.json', json.dumps({'version': 2, 'files': {
+                'cf2.bin': {'platform': 'cf2', 'target': 'stm32', 'type': 'fw', 'release': '2026.10'},
+                'lighthouse.bin': {'platform': 'deck', 'target': 'bcLighthouse4', 'type': 'fw',
+                                   'release': '2026.10'}}}))
+            zf.writestr('cf2.bin', b'\x01' * 100)
+            zf.writestr('lighthouse.bin', b'\x02' * 50)
+
+    def tearDown(self):
+        os.remove(self.filename)
+
+    def test_that_zip_is_parsed_once_for_all_copters(self):
+        # Fixture
+        sut = self._create_sut()
+        uris = ['radio://0/80/2M/E7E7E7E701', 'radio://0/80/2M/E7E7E7E702', 'radio://1/90/2M/E7E7E7E703']
+
+        # Test
+        report = sut.flash(uris)
+
+        # Assert
+        self.assertTrue(report.success)
+        self.assertEqual(2, len(sut.artifacts))
+        self.assertEqual(3, len(self.calls))
+        for _, _, artifacts in self.calls:
+            self.assertIs(sut.artifacts, artifacts)
+
+    def test_that_copters_on_a_dongle_are_flashed_one_at_a_time(self):
+        # Fixture
+        sut = self._create_sut()
+        uris = ['radio://0/80/2M/E7E7E7E70{}'.format(i) for i in range(3)] + \
+            ['radio://1/90/2M/E7E7E7E71{}'.format(i) for i in range(3)]
+
+        # Test
+        sut.flash(uris)
+
+        # Assert
+        self.assertEqual({'0': 1, '1': 1}, FakeBootloader.max_active)
+
+    def test_that_copters_on_a_dongle_are_interleaved(self):
+        # Fixture
+        sut = self._create_sut(copters_per_dongle=3)
+        uris = ['radio://0/80/2M/E7E7E7E70{}'.format(i) for i in range(3)]
+
+        # Test
+        sut.flash(uris)
+
+        # Assert
+        self.assertEqual({'0': 3}, FakeBootloader.max_active)
+
+    def test_that_pooled_copters_are_not_serialized(self):
+        # Fixture
+        sut = self._create_sut()
+        uris = ['radio://*/80/2M/E7E7E7E70{}'.format(i) for i in range(3)]
+
+        # Test
+        sut.flash(uris)
+
+        # Assert
+        self.assertEqual({'*': 3}, FakeBootloader.max_active)
+
+    def test_that_failed_copter_resumes_with_the_decks(self):
+        # Fixture
+        uri = 'radio://0/80/2M/E7E7E7E701'
+        self.failures[uri] = 1
+        sut = self._create_sut()
+
+        # Test
+        report = sut.flash([uri])
+
+        # Assert
+        result = report.results[uri]
+        self.assertTrue(result.success)
+        self.assertEqual(2, result.attempts)
+        self.assertEqual([], self.calls[0][1])
+        self.assertEqual(['bcLighthouse4'], [t.target for t in self.calls[1][1]])
+        self.assertEqual({'reset': 2.0, 'write': 4.0, 'decks': 3.0}, result.timings)
+        self.assertEqual(2, len(self.calls))
+
+    def test_that_copter_is_reset_to_firmware_when_write_fails(self):
+        # Fixture
+        uri = 'radio://0/80/2M/E7E7E7E701'
+        self.write_failures[uri] = 1
+        sut = self._create_sut()
+
+        # Test
+        report = sut.flash([uri])
+
+        # Assert
+        result = report.results[uri]
+        self.assertTrue(result.success)
+        self.assertEqual(2, result.attempts)
+        self.assertEqual((uri, 'reset_to_firmware', 5.0), self.calls[1])
+        self.assertEqual([], self.calls[2][1])
+
+    def test_that_copter_fails_when_retries_are_exhausted(self):
+        # Fixture
+        uri = 'radio://0/80/2M/E7E7E7E701'
+        self.failures[uri] = 3
+        sut = self._create_sut(retries=1)
+        completed = []
+
+        # Test
+        report = sut.flash([uri, 'radio://0/80/2M/E7E7E7E702'],
+                           completed_cb=lambda uri, result: completed.append(uri))
+
+        # Assert
+        self.assertFalse(report.success)
+        self.assertEqual([uri], report.failed)
+        self.assertEqual(2, report.results[uri].attempts)
+        self.assertEqual('Deck did not start', report.results[uri].error)
+        self.assertEqual(2, len(completed))
+        self.assertIn(uri + ': Deck did not start', report.summary())
+
+    def test_that_phase_totals_are_summed_over_copters(self):
+        # Fixture
+        sut = self._create_sut()
+
+        # Test
+        report = sut.flash(['radio://0/80/2M/E7E7E7E701', 'radio://1/80/2M/E7E7E7E702'])
+
+        # Assert
+        self.assertEqual({'reset': 2.0, 'write': 4.0, 'verify': 0.0, 'decks': 6.0}, report.phase_totals())
+
+    def _create_sut(self, **kwargs):
+        return FleetFlasher(self.filename,
+                            bootloader_factory=lambda uri: FakeBootloader(uri, self.failures, self.calls,
+                                                                          self.write_failures),
+                            **kwargs)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+#
+# ,---------,       ____  _ __
+# |  ,-^-,  |      / __ )(_) /_______________ _____  ___
+# | (  O  ) |     / __  / / __/ ___/ ___/ __ `/_  / / _ \
+# | / ,--'  |    / /_/ / / /_/ /__/ /  / /_/ / / /_/  __/
+#    +------`   /_____/_/\__/\___/_/   \__,_/ /___/\___/
+#
+# Copyright (C) 2026 Bitcraze AB
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, in version 3.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+import unittest
+
+from cflib.crazyflie.mem import Memory
+from cflib.crazyflie.mem import MemoryElement
+from cflib.crazyflie.mem.deck_memory import DeckMemory
+from cflib.crazyflie.mem.deck_memory import DeckMemoryManager
+from cflib.crazyflie.mem.deck_memory import DeckUpload
+from test.support.fake_mem_crazyflie import FakeMemCrazyflie
+
+CHAN_WRITE = 2
+
+
+class TestDeckUpload(unittest.TestCase):
+    MEM_ID = 5
+    BASE_ADDRESS = 0x2000
+    SIZE = 240
+    BLOCK_SIZE = 48
+
+    def setUp(self):
+        self.data = bytes([(i * 7) & 0xff for i in range(self.SIZE)])
+        self.cf = FakeMemCrazyflie({self.MEM_ID: bytes(self.BASE_ADDRESS + self.SIZE)})
+        self.mem_handler = Memory(self.cf)
+        self.manager = DeckMemoryManager(self.MEM_ID, MemoryElement.TYPE_DECK_MEMORY, 0x10000000,
+                                         self.mem_handler)
+
+        self.deck = DeckMemory(self.manager, DeckMemoryManager.COMMAND_SECTION_ADDRESS)
+        self.deck._bit_field1 = DeckMemory.MASK_IS_VALID | DeckMemory.MASK_IS_STARTED | \
+            DeckMemory.MASK_SUPPORTS_READ | DeckMemory.MASK_SUPPORTS_WRITE
+        self.deck._base_address = self.BASE_ADDRESS
+        self.deck.name = 'bcTest'
+
+        self.progress = []
+        self.failed_addr = []
+        self.completed_addr = []
+
+        self.sut = DeckUpload(0, self.data, block_size=self.BLOCK_SIZE)
+
+    def test_that_data_is_written(self):
+        # Fixture
+
+        # Test
+        self._write()
+        self.cf.process()
+
+        # Assert
+        self.assertEqual([0], self.completed_addr)
+        self.assertEqual(self.data, self._deck_content())
+        self.assertEqual(self.SIZE, self.sut.bytes_written)
+        self.assertTrue(self.sut.is_done)
+
+    def test_that_throughput_and_eta_is_reported(self):
+        # Fixture
+
+        # Test
+        self._write()
+        self.cf.process()
+
+        # Assert
+        message, percent = self.progress[-1]
+        self.assertEqual(100, percent)
+        self.assertIn('bcTest', message)
+        self.assertIn('kB/s', message)
+        self.assertTrue(any('ETA' in message for message, percent in self.progress))
+
+    def test_that_failed_upload_is_resumed_from_checkpoint(self):
+        # Fixture
+        self._write()
+        self.cf.process(count=4)
+        self.cf.disconnected.call('uri')
+        self.cf.pending.clear()
+        self.cf.sent.clear()
+
+        # Test
+        self._write()
+        self.cf.process()
+
+        # Assert
+        self.assertEqual([2 * self.BLOCK_SIZE], self.failed_addr)
+        self.assertEqual([0], self.completed_addr)
+        self.assertEqual(self.data, self._deck_content())
+        self.assertEqual(self.SIZE, self.sut.bytes_written)
+        self.assertEqual(self.SIZE - 2 * self.BLOCK_SIZE, self._written_bytes())
+
+    def test_that_matching_blocks_are_skipped(self):
+        # Fixture
+        matching = 3 * self.BLOCK_SIZE
+        self.cf.images[self.MEM_ID][self.BASE_ADDRESS:self.BASE_ADDRESS + matching] = self.data[:matching]
+        sut = DeckUpload(0, self.data, skip_matching=True, block_size=self.BLOCK_SIZE)
+
+        # Test
+        sut.write(self.deck, self.completed_addr.append, self.failed_addr.append)
+        self.cf.process()
+
+        # Assert
+        self.assertEqual([0], self.completed_addr)
+        self.assertEqual(self.data, self._deck_content())
+        self.assertEqual(matching, sut.bytes_skipped)
+        self.assertEqual(self.SIZE - matching, self._written_bytes())
+
+    def _write(self):
+        self.sut.write(self.deck, self.completed_addr.append, self.failed_addr.append,
+                       progress_cb=lambda message, percent: self.progress.append((message, percent)))
+
+    def _deck_content(self):
+        return bytes(self.cf.images[self.MEM_ID][self.BASE_ADDRESS:self.BASE_ADDRESS + self.SIZE])
+
+    def _written_bytes(self):
+        return sum(len(pk.data) - 5 for pk in self.cf.sent if pk.channel == CHAN_WRITE)
+
+
+if __name__ == '__main__':
+    unittest.main()
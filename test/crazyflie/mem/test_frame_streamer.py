@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+#
+# ,---------,       ____  _ __
+# |  ,-^-,  |      / __ )(_) /_______________ _____  ___
+# | (  O  ) |     / __  / / __/ ___/ ___/ __ `/_  / / _ \
+# | / ,--'  |    / /_/ / / /_/ /__/ /  / /_/ / / /_/  __/
+#    +------`   /_____/_/\__/\___/_/   \__,_/ /___/\___/
+#
+# Copyright (C) 2026 Bitcraze AB
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, in version 3.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+import struct
+import time
+import unittest
+
+import numpy as np
+
+from cflib.crazyflie.mem import FrameStreamer
+from cflib.crazyflie.mem import Memory
+from cflib.crazyflie.mem import MemoryElement
+from cflib.crazyflie.mem import MultirangerMemory
+from cflib.crazyflie.mem import PAA3905Memory
+from test.support.fake_mem_crazyflie import FakeMemCrazyflie
+
+
+class TestFrameStreamer(unittest.TestCase):
+    MEM_ID = 3
+    SIZE = 1225
+    # Number of read packets for one frame
+    CHUNKS = 52
+
+    def setUp(self):
+        self.image = bytes([i & 0xff for i in range(self.SIZE)])
+        self.cf = FakeMemCrazyflie({self.MEM_ID: self.image})
+        self.mem_handler = Memory(self.cf)
+        self.mem = PAA3905Memory(self.MEM_ID, MemoryElement.TYPE_DECK_PAA3905, self.SIZE, self.mem_handler)
+
+        self.sut = self.mem.frame_streamer(frames=4)
+
+    def test_that_frames_are_read_into_ring_buffer(self):
+        # Fixture
+        expected = np.frombuffer(self.image, dtype=np.uint8).reshape(35, 35)
+
+        # Test
+        self.sut.start()
+        self.cf.process(count=3 * self.CHUNKS)
+
+        # Assert
+        self.assertEqual((4, 35, 35), self.sut.frames.shape)
+        self.assertEqual(3, self.sut.frame_count)
+        np.testing.assert_array_equal(expected, self.sut.latest())
+        self.assertEqual(3, len(self.sut.get_frames()))
+
+    def test_that_next_frame_is_read_while_frame_is_handled(self):
+        # Fixture
+        pending = []
+        sut = FrameStreamer(self.mem, (35, 35), frame_cb=lambda streamer, frame: pending.append(
+            len(self.cf.pending)))
+
+        # Test
+        sut.start()
+        self.cf.process(count=self.CHUNKS)
+
+        # Assert
+        self.assertEqual(1, len(pending))
+        self.assertGreater(pending[0], 0)
+
+    def test_that_ring_buffer_wraps(self):
+        # Fixture
+
+        # Test
+        self.sut.start()
+        self.cf.process(count=6 * self.CHUNKS)
+
+        # Assert
+        self.assertEqual(6, self.sut.frame_count)
+        self.assertEqual(4, len(self.sut.get_frames()))
+
+    def test_that_frames_are_returned_oldest_first(self):
+        # Fixture
+        self.sut.start()
+        self.cf.process(count=6 * self.CHUNKS)
+        out = np.zeros((4, 35, 35), dtype=np.uint8)
+
+        # Test
+        self.sut.get_frames(out=out)
+
+        # Assert
+        self.assertTrue(np.all(np.diff(self.sut.timestamps[[2, 3, 0, 1]]) >= 0))
+        np.testing.assert_array_equal(self.sut.frames[[2, 3, 0, 1]], out)
+
+    def test_that_stop_completes_queued_reads(self):
+        # Fixture
+        self.sut.start()
+        self.cf.process(count=self.CHUNKS)
+
+        # Test
+        self.sut.stop()
+        self.cf.process()
+
+        # Assert
+        self.assertFalse(self.sut.streaming)
+        self.assertEqual(1 + FrameStreamer.READ_BUFFERS, self.sut.frame_count)
+
+    def test_that_failed_reads_are_dropped_frames(self):
+        # Fixture
+        self.sut.start()
+
+        # Test
+        self.cf.disconnected.call('uri')
+
+        # Assert
+        self.assertFalse(self.sut.streaming)
+        self.assertEqual(2, self.sut.dropped_frames)
+        self.assertEqual(0, self.sut.frame_count)
+        self.assertIsNone(self.sut.latest())
+
+    def test_that_multi_byte_frames_are_decoded(self):
+        # Fixture
+        sut = FrameStreamer(self.mem, (2, 2), dtype='<u2')
+
+        # Test
+        sut.start()
+        self.cf.process(count=1)
+
+        # Assert
+        np.testing.assert_array_equal([[0x0100, 0x0302], [0x0504, 0x0706]], sut.latest())
+
+
+class TestMultirangerFrameStreamer(unittest.TestCase):
+    MEM_ID = 4
+    SIZE = 128
+
+    def setUp(self):
+        self.image = struct.pack('<64H', *range(1000, 1064))
+        self.cf = FakeMemCrazyflie({self.MEM_ID: self.image})
+        self.mem_handler = Memory(self.cf)
+        self.mem = MultirangerMemory(self.MEM_ID, MemoryElement.TYPE_DECK_MULTIRANGER, self.SIZE,
+                                     self.mem_handler)
+
+    def test_that_zones_are_decoded(self):
+        # Fixture
+        sut = self.mem.frame_streamer(frames=2)
+        out = np.zeros((8, 8), dtype=np.uint16)
+
+        # Test
+        sut.start()
+        self.cf.process(count=6)
+        actual = sut.latest(out=out)
+
+        # Assert
+        self.assertIs(out, actual)
+        np.testing.assert_array_equal(np.arange(1000, 1064).reshape(8, 8), actual)
+
+    def test_that_reads_are_started_at_rate(self):
+        # Fixture
+        sut = self.mem.frame_streamer(rate=200)
+
+        # Test
+        sut.start()
+        time.sleep(0.1)
+        sut.stop()
+
+        # Assert
+        # Only two reads can be queued when the Crazyflie does not answer
+        self.assertEqual(FrameStreamer.READ_BUFFERS, len(self.mem_handler.transfer_queue))
+        self.assertGreater(sut.skipped_reads, 0)
+
+    def test_that_reads_at_rate_are_completed(self):
+        # Fixture
+        sut = self.mem.frame_streamer(rate=100)
+
+        # Test
+        sut.start()
+        for _ in range(10):
+            time.sleep(0.02)
+            self.cf.process(count=len(self.cf.pending))
+        sut.stop()
+        self.cf.process()
+
+        # Assert
+        self.assertGreater(sut.frame_count, 2)
+        self.assertEqual(0, sut.dropped_frames)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+#
+# ,---------,       ____  _ __
+# |  ,-^-,  |      / __ )(_) /_______________ _____  ___
+# | (  O  ) |     / __  / / __/ ___/ ___/ __ `/_  / / _ \
+# | / ,--'  |    / /_/ / / /_/ /__/ /  / /_/ / / /_/  __/
+#    +------`   /_____/_/\__/\___/_/   \__,_/ /___/\___/
+#
+# Copyright (C) 2026 Bitcraze AB
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, in version 3.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+import unittest
+
+from cflib.crazyflie.mem import Memory
+from cflib.crazyflie.mem import MemoryElement
+from cflib.crazyflie.mem.led_driver_memory import LED
+from cflib.crazyflie.mem.led_driver_memory import LEDDriverMemory
+from test.support.fake_mem_crazyflie import FakeMemCrazyflie
+
+
+class TestLEDFrameStreamer(unittest.TestCase):
+    MEM_ID = 2
+    SIZE = 24
+
+    def setUp(self):
+        self.cf = FakeMemCrazyflie({self.MEM_ID: bytes(self.SIZE)})
+        self.mem_handler = Memory(self.cf)
+        self.led_mem = LEDDriverMemory(self.MEM_ID, MemoryElement.TYPE_DRIVER_LED, self.SIZE, self.mem_handler)
+
+        self.sut = self.led_mem.frame_streamer()
+
+    def test_that_first_frame_is_written_completely(self):
+        # Fixture
+        leds = [LED() for _ in range(12)]
+        leds[3].set(255, 0, 0)
+
+        # Test
+        self.sut.submit(leds)
+        self.cf.process()
+
+        # Assert
+        self.assertEqual(LEDDriverMemory.pack_leds(leds), self.cf.images[self.MEM_ID])
+        self.assertEqual(self.SIZE, self.sut.bytes_written)
+        self.assertEqual(1, self.sut.frames_shown)
+
+    def test_that_only_changed_span_is_written(self):
+        # Fixture
+        frame = bytearray(range(self.SIZE))
+        self.sut.submit(frame)
+        self.cf.process()
+        self.cf.sent.clear()
+        frame[5] = 0xff
+        frame[8] = 0xff
+
+        # Test
+        self.sut.submit(frame)
+        self.cf.process()
+
+        # Assert
+        self.assertEqual(1, len(self.cf.sent))
+        self.assertEqual(bytes(frame[5:9]), bytes(self.cf.sent[0].data[5:]))
+        self.assertEqual(frame, self.cf.images[self.MEM_ID])
+        self.assertEqual(self.SIZE + 4, self.sut.bytes_written)
+
+    def test_that_unchanged_frame_is_not_written(self):
+        # Fixture
+        frame = bytes(range(self.SIZE))
+        self.sut.submit(frame)
+        self.cf.process()
+        self.cf.sent.clear()
+
+        # Test
+        self.sut.submit(frame)
+
+        # Assert
+        self.assertEqual(0, len(self.cf.sent))
+        self.assertEqual(2, self.sut.frames_shown)
+
+    def test_that_latest_frame_wins_when_write_is_ongoing(self):
+        # Fixture
+        self.sut.submit(bytes([1] * self.SIZE))
+
+        # Test
+        self.sut.submit(bytes([2] * self.SIZE))
+        self.sut.submit(bytes([3] * self.SIZE))
+        self.cf.process()
+
+        # Assert
+        self.assertEqual(2, len(self.cf.sent))
+        self.assertEqual(bytes([3] * self.SIZE), self.cf.images[self.MEM_ID])
+        self.assertEqual(1, self.sut.frames_dropped)
+        self.assertEqual(2, self.sut.frames_shown)
+
+    def test_that_fps_is_reported(self):
+        # Fixture
+
+        # Test
+        for i in range(5):
+            self.sut.submit(bytes([i] * self.SIZE))
+            self.cf.process()
+
+        # Assert
+        self.assertGreater(self.sut.fps, 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,555 @@
+# -*- coding: utf-8 -*-
+#
+# ,---------,       ____  _ __
+# |  ,-^-,  |      / __ )(_) /_______________ _____  ___
+# | (  O  ) |     / __  / / __/ ___/ ___/ __ `/_  / / _ \
+# | / ,--'  |    / /_/ / / /_/ /__/ /  / /_/ / / /_/  __/
+#    +------`   /_____/_/\__/\___/_/   \__,_/ /___/\___/
+#
+# Copyright (C) 2026 Bitcraze AB
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, in version 3.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+import tempfile
+import threading
+import unittest
+from unittest.mock import MagicMock
+
+from cflib.crazyflie import Crazyflie
+from cflib.crazyflie.mem import DiffWriter
+from cflib.crazyflie.mem import DiffWriteResult
+from cflib.crazyflie.mem import Memory
+from cflib.crazyflie.mem import MemoryCache
+from cflib.crazyflie.mem import MemoryElement
+from cflib.crazyflie.mem import PRIORITY_HIGH
+from cflib.crtp.crtpstack import CRTPPort
+from test.support.fake_mem_crazyflie import FakeMemCrazyflie
+from test.support.fake_mem_crazyflie import FakeMemLink
+
+
+class TestMemoryRead(unittest.TestCase):
+    MEM_ID = 3
+    SIZE = 1225
+
+    def setUp(self):
+        self.image = bytes([i & 0xff for i in range(self.SIZE)])
+        self.cf = FakeMemCrazyflie({self.MEM_ID: self.image})
+        self.sut = Memory(self.cf)
+        self.mem = MemoryElement(self.MEM_ID, MemoryElement.TYPE_DECK_PAA3905, self.SIZE, self.sut)
+
+        self.read_cb = MagicMock()
+        self.sut.mem_read_cb.add_callback(self.read_cb)
+
+    def test_that_large_read_is_reassembled(self):
+        # Fixture
+
+        # Test
+        self.sut.read(self.mem, 0, self.SIZE)
+        self.cf.process()
+
+        # Assert
+        self.read_cb.assert_called_once_with(self.mem, 0, bytearray(self.image))
+
+    def test_that_read_is_done_into_given_buffer(self):
+        # Fixture
+        buffer = bytearray(self.SIZE)
+        read_cb = MagicMock()
+
+        # Test
+        self.sut.read(self.mem, 0, self.SIZE, read_cb=read_cb, buffer=buffer)
+        self.cf.process()
+
+        # Assert
+        read_cb.assert_called_once_with(self.mem, 0, bytearray(self.image))
+        self.assertIs(buffer, read_cb.call_args[0][2])
+
+    def test_that_window_limits_outstanding_requests(self):
+        # Fixture
+        window_size = 5
+
+        # Test
+        self.sut.read(self.mem, 0, self.SIZE, window_size=window_size)
+
+        # Assert
+        self.assertEqual(window_size, len(self.cf.pending))
+        for pk in self.cf.pending:
+            self.assertEqual(CRTPPort.MEM, pk.port)
+
+    def test_that_window_is_refilled_when_replies_arrive(self):
+        # Fixture
+        self.sut.read(self.mem, 0, self.SIZE, window_size=3)
+
+        # Test
+        self.cf.process(count=2)
+
+        # Assert
+        self.assertEqual(3, len(self.cf.pending))
+        self.assertEqual(5, len(self.cf.sent))
+
+    def test_that_read_with_window_of_one_is_stop_and_wait(self):
+        # Fixture
+
+        # Test
+        self.sut.read(self.mem, 100, 100, window_size=1)
+
+        # Assert
+        self.assertEqual(1, len(self.cf.pending))
+        self.cf.process()
+        self.read_cb.assert_called_once_with(self.mem, 100, bytearray(self.image[100:200]))
+
+    def test_that_replies_out_of_order_are_put_in_place(self):
+        # Fixture
+        self.sut.read(self.mem, 0, 48, window_size=2)
+        self.cf.pending.reverse()
+
+        # Test
+        self.cf.process()
+
+        # Assert
+        self.read_cb.assert_called_once_with(self.mem, 0, bytearray(self.image[0:48]))
+
+    def test_that_empty_read_completes(self):
+        # Fixture
+
+        # Test
+        self.sut.read(self.mem, 10, 0)
+        self.cf.process()
+
+        # Assert
+        self.read_cb.assert_called_once_with(self.mem, 10, bytearray())
+
+
+class TestMemoryRetransmission(unittest.TestCase):
+    MEM_ID = 3
+    SIZE = 200
+    TIMEOUT = 5
+
+    def setUp(self):
+        self.image = bytes([i & 0xff for i in range(self.SIZE)])
+        self.link = FakeMemLink({self.MEM_ID: self.image})
+        self.cf = Crazyflie(link=self.link)
+        self.mem = MemoryElement(self.MEM_ID, MemoryElement.TYPE_MEMORY_TESTER, self.SIZE, self.cf.mem)
+
+        self.done = threading.Event()
+        self.read_cb = MagicMock(side_effect=lambda *args: self.done.set())
+        self.cf.mem.mem_read_cb.add_callback(self.read_cb)
+
+    def tearDown(self):
+        self.cf.incoming.stop()
+        self.cf.incoming.join(timeout=2)
+
+    def test_that_only_lost_read_chunk_is_requested_again(self):
+        # Fixture
+        self.link.drop_next = 1
+
+        # Test
+        self.cf.mem.read(self.mem, 0, 96, window_size=4)
+
+        # Assert
+        self.assertTrue(self.done.wait(self.TIMEOUT))
+        self.assertEqual(5, len(self.link.sent))
+        self.assertEqual(self.link.sent[0].data, self.link.sent[4].data)
+        self.read_cb.assert_called_once_with(self.mem, 0, bytearray(self.image[0:96]))
+
+    def test_that_lost_write_chunk_is_sent_again(self):
+        # Fixture
+        data = bytes([(i * 7) & 0xff for i in range(96)])
+        write_cb = MagicMock(side_effect=lambda *args: self.done.set())
+        self.cf.mem.mem_write_cb.add_callback(write_cb)
+        self.link.drop_next = 1
+
+        # Test
+        self.cf.mem.write(self.mem, 0, data, window_size=4)
+
+        # Assert
+        self.assertTrue(self.done.wait(self.TIMEOUT))
+        self.assertEqual(5, len(self.link.sent))
+        self.assertEqual(self.link.sent[0].data, self.link.sent[4].data)
+        write_cb.assert_called_once_with(self.mem, 0)
+        self.assertEqual(data, self.link.images[self.MEM_ID][0:96])
+
+
+class TestMemoryWrite(unittest.TestCase):
+    MEM_ID = 2
+    SIZE = 1000
+
+    def setUp(self):
+        self.cf = FakeMemCrazyflie({self.MEM_ID: bytes(self.SIZE)})
+        self.sut = Memory(self.cf)
+        self.mem = MemoryElement(self.MEM_ID, MemoryElement.TYPE_TRAJ, self.SIZE, self.sut)
+
+        self.write_cb = MagicMock()
+        self.sut.mem_write_cb.add_callback(self.write_cb)
+
+        self.data = bytes([(i * 7) & 0xff for i in range(500)])
+
+    def test_that_large_write_ends_up_in_memory(self):
+        # Fixture
+
+        # Test
+        self.sut.write(self.mem, 100, self.data)
+        self.cf.process()
+
+        # Assert
+        self.write_cb.assert_called_once_with(self.mem, 100)
+        self.assertEqual(self.data, self.cf.images[self.MEM_ID][100:600])
+
+    def test_that_tuple_data_is_written(self):
+        # Fixture
+
+        # Test
+        self.sut.write(self.mem, 0, tuple(self.data[0:30]))
+        self.cf.process()
+
+        # Assert
+        self.write_cb.assert_called_once_with(self.mem, 0)
+        self.assertEqual(self.data[0:30], self.cf.images[self.MEM_ID][0:30])
+
+    def test_that_window_limits_outstanding_writes(self):
+        # Fixture
+
+        # Test
+        self.sut.write(self.mem, 0, self.data, window_size=3)
+
+        # Assert
+        self.assertEqual(3, len(self.cf.pending))
+
+    def test_that_write_is_not_done_until_all_chunks_are_acked(self):
+        # Fixture
+        self.cf.drop_next = 1
+        self.sut.write(self.mem, 0, self.data[0:96], window_size=4)
+
+        # Test
+        self.cf.process()
+
+        # Assert
+        self.write_cb.assert_not_called()
+
+    def test_that_progress_follows_acked_bytes_in_order(self):
+        # Fixture
+        progress_cb = MagicMock()
+        self.sut.write(self.mem, 0, self.data[0:96], progress_cb=progress_cb, window_size=4)
+        self.cf.pending.reverse()
+
+        # Test
+        self.cf.process(count=3)
+
+        # Assert
+        progress_cb.assert_called_once_with('Writing to memory', 0)
+        self.cf.process()
+        progress_cb.assert_called_with('Writing to memory', 100)
+
+    def test_that_queued_write_starts_when_first_is_done(self):
+        # Fixture
+        self.sut.write(self.mem, 0, self.data[0:50])
+        self.sut.write(self.mem, 200, self.data[0:50])
+
+        # Test
+        self.cf.process()
+
+        # Assert
+        self.assertEqual(2, self.write_cb.call_count)
+        self.assertEqual(self.data[0:50], self.cf.images[self.MEM_ID][200:250])
+
+
+class TestMemoryTransferQueue(unittest.TestCase):
+    SIZE = 500
+
+    def setUp(self):
+        self.image = bytes([i & 0xff for i in range(self.SIZE)])
+        self.cf = FakeMemCrazyflie({1: self.image, 2: bytes(self.SIZE)})
+        self.sut = Memory(self.cf)
+        self.mem1 = MemoryElement(1, MemoryElement.TYPE_MEMORY_TESTER, self.SIZE, self.sut)
+        self.mem2 = MemoryElement(2, MemoryElement.TYPE_MEMORY_TESTER, self.SIZE, self.sut)
+
+        self.read_cb = MagicMock()
+        self.sut.mem_read_cb.add_callback(self.read_cb)
+        self.write_cb = MagicMock()
+        self.sut.mem_write_cb.add_callback(self.write_cb)
+
+    def test_that_transfers_to_different_memories_run_at_the_same_time(self):
+        # Fixture
+
+        # Test
+        self.sut.read(self.mem1, 0, 200)
+        self.sut.write(self.mem2, 0, self.image[0:200])
+
+        # Assert
+        mem_ids = set(pk.data[0] for pk in self.cf.pending)
+        self.assertEqual({1, 2}, mem_ids)
+        self.cf.process()
+        self.read_cb.assert_called_once_with(self.mem1, 0, bytearray(self.image[0:200]))
+        self.write_cb.assert_called_once_with(self.mem2, 0)
+
+    def test_that_reads_to_the_same_memory_are_queued(self):
+        # Fixture
+
+        # Test
+        self.sut.read(self.mem1, 0, 10)
+        self.sut.read(self.mem1, 100, 10)
+        self.cf.process()
+
+        # Assert
+        self.assertEqual(2, self.read_cb.call_count)
+        self.read_cb.assert_any_call(self.mem1, 0, bytearray(self.image[0:10]))
+        self.read_cb.assert_any_call(self.mem1, 100, bytearray(self.image[100:110]))
+
+    def test_that_packets_in_flight_are_limited_for_all_transfers(self):
+        # Fixture
+        self.sut.max_packets_in_flight = 3
+
+        # Test
+        self.sut.read(self.mem1, 0, 200, window_size=4)
+        self.sut.read(self.mem2, 0, 200, window_size=4)
+
+        # Assert
+        self.assertEqual(3, len(self.cf.pending))
+
+    def test_that_high_priority_transfer_is_handled_before_queued_ones(self):
+        # Fixture
+        self.sut.read(self.mem1, 0, 10)
+        self.sut.read(self.mem1, 100, 10)
+
+        # Test
+        self.sut.read(self.mem1, 200, 10, priority=PRIORITY_HIGH)
+
+        # Assert
+        actual = [(transfer.addr, transfer.running) for transfer in self.sut.transfer_queue]
+        self.assertEqual([(0, True), (200, False), (100, False)], actual)
+
+    def test_that_disconnect_fails_all_queued_transfers(self):
+        # Fixture
+        read_failed_cb = MagicMock()
+        self.sut.mem_read_failed_cb.add_callback(read_failed_cb)
+        self.sut.read(self.mem1, 0, 10)
+        self.sut.read(self.mem1, 100, 10)
+
+        # Test
+        self.cf.disconnected.call('uri')
+
+        # Assert
+        self.assertEqual(2, read_failed_cb.call_count)
+        self.assertEqual([], self.sut.transfer_queue)
+
+
+class TestDiffWriter(unittest.TestCase):
+    MEM_ID = 5
+    SIZE = 480
+
+    def setUp(self):
+        self.image = bytes([i & 0xff for i in range(self.SIZE)])
+        self.cf = FakeMemCrazyflie({self.MEM_ID: self.image})
+        self.memory = Memory(self.cf)
+        self.mem = MemoryElement(self.MEM_ID, MemoryElement.TYPE_TRAJ, self.SIZE, self.memory)
+        self.sut = DiffWriter(self.mem)
+
+        self.done_cb = MagicMock()
+
+    def test_that_only_changed_blocks_are_written(self):
+        # Fixture
+        data = bytearray(self.image)
+        data[30] = 0xff
+        data[200] = 0xff
+
+        # Test
+        self.sut.write(0, data, self.done_cb)
+        self.cf.process()
+
+        # Assert
+        self.done_cb.assert_called_once_with(DiffWriteResult(self.SIZE, 48))
+        self.assertEqual(self.SIZE - 48, self.done_cb.call_args[0][0].bytes_saved)
+        self.assertEqual(data, self.cf.images[self.MEM_ID])
+
+    def test_that_identical_data_is_not_written(self):
+        # Fixture
+
+        # Test
+        self.sut.write(0, self.image, self.done_cb)
+        self.cf.process()
+
+        # Assert
+        self.done_cb.assert_called_once_with(DiffWriteResult(self.SIZE, 0))
+        written = [pk for pk in self.cf.sent if pk.channel == 2]
+        self.assertEqual([], written)
+
+    def test_that_stale_reference_is_corrected_by_verification(self):
+        # Fixture
+        data = bytearray(self.image)
+        data[100] = 0xff
+        # The memory does not contain the change at 100 that the reference says it does
+        stale_reference = bytearray(data)
+        data[300] = 0xff
+
+        # Test
+        self.sut.write(0, data, self.done_cb, reference=stale_reference)
+        self.cf.process()
+
+        # Assert
+        self.done_cb.assert_called_once()
+        self.assertEqual(data, self.cf.images[self.MEM_ID])
+
+    def test_that_memory_callbacks_are_not_called_for_diff_writes(self):
+        # Fixture
+        write_cb = MagicMock()
+        read_cb = MagicMock()
+        self.memory.mem_write_cb.add_callback(write_cb)
+        self.memory.mem_read_cb.add_callback(read_cb)
+        data = bytearray(self.image)
+        data[0] = 0xff
+
+        # Test
+        self.sut.write(0, data, self.done_cb)
+        self.cf.process()
+
+        # Assert
+        write_cb.assert_not_called()
+        read_cb.assert_not_called()
+
+
+class TestMemoryRefresh(unittest.TestCase):
+    DETAILS = [
+        (MemoryElement.TYPE_I2C, 16),
+        (MemoryElement.TYPE_TRAJ, 4096),
+        (MemoryElement.TYPE_LH, 0x1000),
+        (MemoryElement.TYPE_MEMORY_TESTER, 0x1000),
+    ]
+
+    def setUp(self):
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.cf = self._create_cf(self.DETAILS)
+        self.refresh_cb = MagicMock()
+
+    def tearDown(self):
+        self.cache_dir.cleanup()
+
+    def test_that_all_details_are_requested_at_the_same_time(self):
+        # Fixture
+        sut = Memory(self.cf)
+        sut.refresh(self.refresh_cb)
+
+        # Test
+        self.cf.process(count=1)
+
+        # Assert
+        self.assertEqual(len(self.DETAILS), len(self.cf.pending))
+        self.refresh_cb.assert_not_called()
+
+    def test_that_memories_are_created_in_id_order(self):
+        # Fixture
+        sut = Memory(self.cf)
+
+        # Test
+        sut.refresh(self.refresh_cb)
+        self.cf.process(count=1)
+        self.cf.pending.reverse()
+        self.cf.process()
+
+        # Assert
+        self.refresh_cb.assert_called_once_with()
+        self.assertEqual([0, 1, 2, 3], [mem.id for mem in sut.mems])
+        self.assertEqual([mem_type for mem_type, size in self.DETAILS], [mem.type for mem in sut.mems])
+
+    def test_that_empty_details_reply_ends_enumeration(self):
+        # Fixture
+        details = list(self.DETAILS)
+        details[1] = None
+        cf = self._create_cf(details)
+        sut = Memory(cf)
+        sut.refresh(self.refresh_cb)
+        cf.process(count=1)
+        cf.pending[1], cf.pending[2] = cf.pending[2], cf.pending[1]
+
+        # Test
+        cf.process(count=3)
+
+        # Assert
+        self.refresh_cb.assert_called_once_with()
+        self.assertEqual(1, sut.nbr_of_mems)
+        self.assertEqual([0], [mem.id for mem in sut.mems])
+
+    def test_that_empty_details_reply_is_dropped_while_speculative_requests_are_unanswered(self):
+        # Fixture
+        self._refresh(Memory(self.cf, cache=self._create_cache()))
+        details = list(self.DETAILS[0:3])
+        details[1] = None
+        cf = self._create_cf(details)
+        sut = Memory(cf, cache=self._create_cache())
+        sut.refresh(self.refresh_cb)
+        cf.process(count=1)
+
+        # Test
+        cf.process(count=2)
+
+        # Assert
+        self.refresh_cb.assert_not_called()
+        cf.process()
+        cf.pending.append(cf.sent[2])
+        cf.process()
+        self.refresh_cb.assert_called_once_with()
+        self.assertEqual(1, sut.nbr_of_mems)
+
+    def test_that_details_are_requested_with_count_when_layout_is_cached(self):
+        # Fixture
+        self._refresh(Memory(self.cf, cache=self._create_cache()))
+        cf = self._create_cf(self.DETAILS)
+        sut = Memory(cf, cache=self._create_cache())
+
+        # Test
+        sut.refresh(self.refresh_cb)
+
+        # Assert
+        self.assertEqual(1 + len(self.DETAILS), len(cf.pending))
+        cf.process()
+        self.refresh_cb.assert_called_once_with()
+        self.assertEqual(len(self.DETAILS), len(sut.mems))
+
+    def test_that_outdated_cached_layout_is_not_used(self):
+        # Fixture
+        self._refresh(Memory(self.cf, cache=self._create_cache()))
+        details = [(MemoryElement.TYPE_I2C, 16), (MemoryElement.TYPE_DECK_MULTIRANGER, 128)]
+        cf = self._create_cf(details)
+        sut = Memory(cf, cache=self._create_cache())
+
+        # Test
+        sut.refresh(self.refresh_cb)
+        cf.process()
+
+        # Assert
+        self.refresh_cb.assert_called_once_with()
+        self.assertEqual([mem_type for mem_type, size in details], [mem.type for mem in sut.mems])
+
+    def test_that_cached_layout_is_updated(self):
+        # Fixture
+        self._refresh(Memory(self.cf, cache=self._create_cache()))
+        details = self.DETAILS + [(MemoryElement.TYPE_DECK_MULTIRANGER, 128)]
+        self._refresh(Memory(self._create_cf(details), cache=self._create_cache()))
+        cf = self._create_cf(details)
+        sut = Memory(cf, cache=self._create_cache())
+
+        # Test
+        sut.refresh(self.refresh_cb)
+
+        # Assert
+        self.assertEqual(1 + len(details), len(cf.pending))
+
+    def _create_cf(self, details):
+        cf = FakeMemCrazyflie({}, details=details)
+        cf.log = MagicMock()
+        cf.log.toc.crc = 0x12345678
+        return cf
+
+    def _create_cache(self):
+        return MemoryCache(rw_cache=self.cache_dir.name)
+
+    def _refresh(self, sut):
+        sut.refresh(MagicMock())
+        sut.cf.process()
@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*-
+#
+# ,---------,       ____  _ __
+# |  ,-^-,  |      / __ )(_) /_______________ _____  ___
+# | (  O  ) |     / __  / / __/ ___/ ___/ __ `/_  / / _ \
+# | / ,--'  |    / /_/ / / /_/ /__/ /  / /_/ / / /_/  __/
+#    +------`   /_____/_/\__/\___/_/   \__,_/ /___/\___/
+#
+# Copyright (C) 2026 Bitcraze AB
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, in version 3.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+import struct
+import tempfile
+import unittest
+from binascii import crc32
+from unittest.mock import MagicMock
+
+from cflib.crazyflie.mem import LighthouseBsCalibration
+from cflib.crazyflie.mem import Memory
+from cflib.crazyflie.mem import MemoryCache
+from cflib.crazyflie.mem import MemoryElement
+from cflib.crazyflie.mem import OWElement
+from cflib.crazyflie.mem.lighthouse_memory import LighthouseMemory
+from test.support.fake_mem_crazyflie import FakeMemCrazyflie
+
+
+class TestMemoryCache(unittest.TestCase):
+    KEY = MemoryCache.make_key('ow', '0123456789ABCDEF', 112)
+
+    def setUp(self):
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.sut = MemoryCache(rw_cache=self.cache_dir.name)
+
+    def tearDown(self):
+        self.cache_dir.cleanup()
+
+    def test_that_data_is_fetched_when_token_matches(self):
+        # Fixture
+        self.sut.insert(self.KEY, b'token', b'data')
+
+        # Test
+        actual = self.sut.fetch(self.KEY, bytearray(b'token'))
+
+        # Assert
+        self.assertEqual(b'data', actual)
+
+    def test_that_nothing_is_fetched_when_token_differs(self):
+        # Fixture
+        self.sut.insert(self.KEY, b'token', b'data')
+
+        # Test
+        actual = self.sut.fetch(self.KEY, b'other')
+
+        # Assert
+        self.assertIsNone(actual)
+
+    def test_that_entries_are_persisted(self):
+        # Fixture
+        self.sut.insert(self.KEY, b'token', b'data')
+
+        # Test
+        actual = MemoryCache(ro_cache=self.cache_dir.name).fetch(self.KEY, b'token')
+
+        # Assert
+        self.assertEqual(b'data', actual)
+
+    def test_that_invalidated_entries_are_removed(self):
+        # Fixture
+        self.sut.insert(self.KEY, b'token', b'data')
+
+        # Test
+        self.sut.invalidate(self.KEY)
+
+        # Assert
+        self.assertIsNone(self.sut.fetch(self.KEY, b'token'))
+        self.assertIsNone(MemoryCache(ro_cache=self.cache_dir.name).fetch(self.KEY, b'token'))
+
+    def test_that_cache_without_directories_is_disabled(self):
+        # Fixture
+        sut = MemoryCache()
+
+        # Test
+        sut.insert(self.KEY, b'token', b'data')
+
+        # Assert
+        self.assertFalse(sut.enabled)
+        self.assertIsNone(sut.fetch(self.KEY, b'token'))
+
+
+class TestLighthouseCalibrationCache(unittest.TestCase):
+    MEM_ID = 4
+
+    def setUp(self):
+        self.cache_dir = tempfile.TemporaryDirectory()
+
+        calib = LighthouseBsCalibration()
+        calib.uid = 0x12345678
+        calib.sweeps[0].phase = 1.5
+        calib.valid = True
+        image = bytearray(0x2000)
+        data = bytearray()
+        calib.add_mem_data(data)
+        image[LighthouseMemory.CALIB_START_ADDR:LighthouseMemory.CALIB_START_ADDR + len(data)] = data
+
+        self.cf = FakeMemCrazyflie({self.MEM_ID: image})
+
+    def tearDown(self):
+        self.cache_dir.cleanup()
+
+    def test_that_cached_calibration_is_read_with_one_packet(self):
+        # Fixture
+        self._read_calib(MemoryCache(rw_cache=self.cache_dir.name))
+        self.cf.sent.clear()
+
+        # Test
+        actual = self._read_calib(MemoryCache(rw_cache=self.cache_dir.name))
+
+        # Assert
+        self.assertEqual(1, len(self.cf.sent))
+        self.assertEqual(0x12345678, actual.uid)
+        self.assertEqual(1.5, actual.sweeps[0].phase)
+        self.assertTrue(actual.valid)
+
+    def test_that_calibration_is_read_without_cache(self):
+        # Fixture
+
+        # Test
+        actual = self._read_calib(MemoryCache())
+
+        # Assert
+        self.assertEqual(3, len(self.cf.sent))
+        self.assertEqual(0x12345678, actual.uid)
+
+    def _read_calib(self, cache):
+        memory = Memory(self.cf, cache=cache)
+        lh_mem = LighthouseMemory(self.MEM_ID, MemoryElement.TYPE_LH, 0x2000, memory)
+        memory.mem_read_cb.add_callback(lh_mem.new_data)
+
+        read_cb = MagicMock()
+        lh_mem.read_calib_data(0, read_cb)
+        self.cf.process()
+
+        read_cb.assert_called_once()
+        return read_cb.call_args[0][1]
+
+
+class TestOWElementCache(unittest.TestCase):
+    MEM_ID = 2
+
+    def setUp(self):
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.cf = FakeMemCrazyflie({self.MEM_ID: self._image('Deck A')})
+
+    def tearDown(self):
+        self.cache_dir.cleanup()
+
+    def test_that_cached_elements_are_read_without_the_elements(self):
+        # Fixture
+        self._read_ow(MemoryCache(rw_cache=self.cache_dir.name))
+        self.cf.sent.clear()
+
+        # Test
+        actual = self._read_ow(MemoryCache(rw_cache=self.cache_dir.name))
+
+        # Assert
+        self.assertEqual(2, len(self.cf.sent))
+        self.assertEqual('Deck A', actual.elements['Board name'])
+
+    def test_that_edited_elements_invalidate_the_cache(self):
+        # Fixture
+        self._read_ow(MemoryCache(rw_cache=self.cache_dir.name))
+        self.cf.images[self.MEM_ID] = self._image('Deck B')
+
+        # Test
+        actual = self._read_ow(MemoryCache(rw_cache=self.cache_dir.name))
+
+        # Assert
+        self.assertEqual('Deck B', actual.elements['Board name'])
+
+    def _image(self, name):
+        header = struct.pack('<BIBB', 0xEB, 0, 0xBC, 0x01)
+        header += struct.pack('B', crc32(header) & 0x0ff)
+        elem = struct.pack('BB', 1, len(name)) + name.encode('ISO-8859-1')
+        elem_data = struct.pack('BB', 0x00, len(elem)) + elem
+        elem_data += struct.pack('B', crc32(elem_data) & 0x0ff)
+        image = bytearray([0xFF] * 112)
+        image[0:len(header + elem_data)] = header + elem_data
+        return image
+
+    def _read_ow(self, cache):
+        memory = Memory(self.cf, cache=cache)
+        ow_mem = OWElement(self.MEM_ID, MemoryElement.TYPE_1W, 112, '0123456789ABCDEF', memory)
+        memory.mem_read_cb.add_callback(ow_mem.new_data)
+
+        update_cb = MagicMock()
+        ow_mem.update(update_cb)
+        self.cf.process()
+
+        update_cb.assert_called_once_with(ow_mem)
+        self.assertTrue(ow_mem.valid)
+        return ow_mem
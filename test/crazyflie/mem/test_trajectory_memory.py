@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+#
+# ,---------,       ____  _ __
+# |  ,-^-,  |      / __ )(_) /_______________ _____  ___
+# | (  O  ) |     / __  / / __/ ___/ ___/ __ `/_  / / _ \
+# | / ,--'  |    / /_/ / / /_/ /__/ /  / /_/ / / /_/  __/
+#    +------`   /_____/_/\__/\___/_/   \__,_/ /___/\___/
+#
+# Copyright (C) 2026 Bitcraze AB
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, in version 3.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+import unittest
+from unittest.mock import MagicMock
+
+import numpy as np
+
+from cflib.crazyflie.mem import CompressedSegment
+from cflib.crazyflie.mem import CompressedStart
+from cflib.crazyflie.mem import MemoryElement
+from cflib.crazyflie.mem import Poly4D
+from cflib.crazyflie.mem import TrajectoryMemory
+
+
+class TestTrajectoryMemory(unittest.TestCase):
+    def setUp(self):
+        self.rng = np.random.default_rng(17)
+        self.mem_handler = MagicMock()
+        self.sut = TrajectoryMemory(1, MemoryElement.TYPE_TRAJ, 4096, self.mem_handler)
+
+    def test_that_poly4d_array_is_packed_as_poly4d(self):
+        # Fixture
+        durations = self.rng.uniform(0.1, 3.0, 10)
+        coefficients = self.rng.uniform(-5.0, 5.0, (10, 4, 8))
+
+        expected = bytearray()
+        for duration, coeffs in zip(durations, coefficients):
+            expected += Poly4D(duration, *[Poly4D.Poly(list(axis)) for axis in coeffs]).pack()
+
+        # Test
+        actual = TrajectoryMemory.pack_poly4d_array(durations, coefficients)
+
+        # Assert
+        self.assertEqual(expected, actual)
+
+    def test_that_poly4d_with_wrong_number_of_coefficients_raises(self):
+        # Fixture
+        sut = Poly4D(1.0, z=Poly4D.Poly([0.0] * 7), y=Poly4D.Poly([0.0] * 9))
+
+        # Test
+        with self.assertRaises(ValueError) as context:
+            sut.pack()
+
+        # Assert
+        self.assertEqual('y must have 8 coefficients, not 9', str(context.exception))
+
+    def test_that_compressed_array_is_packed_as_compressed_segments(self):
+        # Fixture
+        for element_length in [0, 1, 3, 7]:
+            start = (0.5, -1.25, 1.0, 0.3)
+            durations = self.rng.uniform(0.1, 3.0, 10)
+            elements = self.rng.uniform(-5.0, 5.0, (10, 4, element_length))
+
+            expected = CompressedStart(*start).pack()
+            for duration, element in zip(durations, elements):
+                expected += CompressedSegment(duration, *[list(axis) for axis in element]).pack()
+
+            # Test
+            actual = TrajectoryMemory.pack_compressed_array(start, durations, elements)
+
+            # Assert
+            self.assertEqual(expected, actual)
+
+    def test_that_compressed_element_out_of_range_raises(self):
+        # Fixture
+        elements = np.zeros((1, 4, 1))
+        elements[0, 0, 0] = 40.0
+
+        # Test
+        # Assert
+        with self.assertRaises(ValueError):
+            TrajectoryMemory.pack_compressed_array((0, 0, 0, 0), [1.0], elements)
+
+    def test_that_too_large_image_raises_before_writing(self):
+        # Fixture
+        data = TrajectoryMemory.pack_poly4d_array(np.ones(32), np.zeros((32, 4, 8)))
+
+        # Test
+        # Assert
+        with self.assertRaises(ValueError):
+            self.sut.write_image(data, MagicMock())
+        self.mem_handler.write.assert_not_called()
+
+    def test_that_image_is_written(self):
+        # Fixture
+        data = TrajectoryMemory.pack_poly4d_array(np.ones(2), np.zeros((2, 4, 8)))
+
+        # Test
+        actual = self.sut.write_image(data, MagicMock(), start_addr=100)
+
+        # Assert
+        self.assertEqual(len(data), actual)
+        self.mem_handler.write.assert_called_once_with(self.sut, 100, data, flush_queue=True)
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+#
+#     ||          ____  _ __
+#  +------+      / __ )(_) /_______________ _____  ___
+#  | 0xBC |     / __  / / __/ ___/ ___/ __ `/_  / / _ \
+#  +------+    / /_/ / / /_/ /__/ /  / /_/ / / /_/  __/
+#   ||  ||    /_____/_/\__/\___/_/   \__,_/ /___/\___/
+#
+#  Copyright (C) 2026 Bitcraze AB
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+import struct
+import unittest
+from unittest.mock import MagicMock
+
+from cflib.crazyflie.broadcaster import Broadcaster
+from cflib.crazyflie.high_level_commander import HighLevelCommander
+from cflib.crtp.crtpstack import CRTPPort
+
+
+class TestBroadcaster(unittest.TestCase):
+
+    def setUp(self):
+        self.link = MagicMock()
+        self.sut = Broadcaster('radiobroadcast://0/80/2M')
+        self.sut.link = self.link
+
+    def test_that_high_level_command_is_sent_once_on_the_link(self):
+        # Fixture
+
+        # Test
+        self.sut.high_level_commander.takeoff(0.5, 2.0, group_mask=0x02)
+
+        # Assert
+        self.link.send_packet.assert_called_once()
+        pk = self.link.send_packet.call_args[0][0]
+        self.assertEqual(CRTPPort.SETPOINT_HL, pk.port)
+        self.assertEqual((HighLevelCommander.COMMAND_TAKEOFF_2, 0x02), struct.unpack('<BB', pk.data[0:2]))
+
+    def test_that_protocol_version_selects_the_command_format(self):
+        # Fixture
+        sut = Broadcaster('radiobroadcast://0/80/2M', protocol_version=7)
+        sut.link = self.link
+
+        # Test
+        sut.high_level_commander.start_trajectory(3)
+
+        # Assert
+        pk = self.link.send_packet.call_args[0][0]
+        self.assertEqual(HighLevelCommander.COMMAND_START_TRAJECTORY, pk.data[0])
+
+    def test_that_emergency_stop_is_sent_with_the_supervisor(self):
+        # Fixture
+
+        # Test
+        self.sut.supervisor.send_emergency_stop()
+
+        # Assert
+        pk = self.link.send_packet.call_args[0][0]
+        self.assertEqual(CRTPPort.SUPERVISOR, pk.port)
+
+    def test_that_nothing_is_sent_when_link_is_closed(self):
+        # Fixture
+        self.sut.close_link()
+
+        # Test
+        self.sut.loc.send_extpos((1.0, 2.0, 3.0))
+
+        # Assert
+        self.link.send_packet.assert_not_called()
+        self.link.close.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
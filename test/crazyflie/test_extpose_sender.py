@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+#
+#     ||          ____  _ __
+#  +------+      / __ )(_) /_______________ _____  ___
+#  | 0xBC |     / __  / / __/ ___/ ___/ __ `/_  / / _ \
+#  +------+    / /_/ / / /_/ /__/ /  / /_/ / / /_/  __/
+#   ||  ||    /_____/_/\__/\___/_/   \__,_/ /___/\___/
+#
+#  Copyright (C) 2026 Bitcraze AB
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+import time
+import unittest
+from unittest.mock import MagicMock
+
+from cflib.crazyflie.extpose_sender import PackedExtPoseSender
+
+QUAT = (0.0, 0.0, 0.0, 1.0)
+
+
+class TestPackedExtPoseSender(unittest.TestCase):
+
+    def setUp(self):
+        self.link_a = MagicMock()
+        self.link_a.loc.send_extpose_packed.return_value = 1
+        self.link_b = MagicMock()
+        self.link_b.loc.send_extpose_packed.return_value = 1
+        self.sut = PackedExtPoseSender({1: self.link_a, 2: self.link_a, 3: self.link_b})
+
+    def tearDown(self):
+        self.sut.stop()
+
+    def test_that_poses_are_grouped_by_link(self):
+        # Fixture
+        self.sut.update(1, (1.0, 0.0, 0.0), QUAT)
+        self.sut.update(3, (3.0, 0.0, 0.0), QUAT)
+        self.sut.update(2, (2.0, 0.0, 0.0), QUAT)
+
+        # Test
+        actual = self.sut.send_pending()
+
+        # Assert
+        self.assertEqual(2, actual)
+        self.link_a.loc.send_extpose_packed.assert_called_once_with(
+            [(1, (1.0, 0.0, 0.0), QUAT), (2, (2.0, 0.0, 0.0), QUAT)])
+        self.link_b.loc.send_extpose_packed.assert_called_once_with(
+            [(3, (3.0, 0.0, 0.0), QUAT)])
+
+    def test_that_latest_pose_wins(self):
+        # Fixture
+        self.sut.update(1, (1.0, 0.0, 0.0), QUAT)
+        self.sut.update(1, (1.5, 0.0, 0.0), QUAT)
+
+        # Test
+        self.sut.send_pending()
+
+        # Assert
+        self.link_a.loc.send_extpose_packed.assert_called_once_with(
+            [(1, (1.5, 0.0, 0.0), QUAT)])
+        self.assertEqual(1, self.sut.report()[1].superseded)
+
+    def test_that_nothing_is_sent_without_new_poses(self):
+        # Fixture
+        self.sut.update(1, (1.0, 0.0, 0.0), QUAT)
+        self.sut.send_pending()
+
+        # Test
+        actual = self.sut.send_pending()
+
+        # Assert
+        self.assertEqual(0, actual)
+        self.assertEqual(1, self.link_a.loc.send_extpose_packed.call_count)
+
+    def test_that_unknown_copter_raises(self):
+        # Fixture
+
+        # Test
+        # Assert
+        with self.assertRaises(ValueError):
+            self.sut.update(4, (1.0, 0.0, 0.0), QUAT)
+
+    def test_that_latency_is_measured_from_the_timestamp(self):
+        # Fixture
+        self.sut.update(1, (1.0, 0.0, 0.0), QUAT, timestamp=time.time() - 0.5)
+
+        # Test
+        self.sut.send_pending()
+        actual = self.sut.report()
+
+        # Assert
+        self.assertGreaterEqual(actual[1].latency, 0.5)
+        self.assertLess(actual[1].latency, 1.0)
+        self.assertGreater(actual[1].rate, 0.0)
+        self.assertIsNone(actual[2].latency)
+        self.assertEqual(0.0, actual[2].rate)
+
+    def test_that_report_resets_statistics(self):
+        # Fixture
+        self.sut.update(1, (1.0, 0.0, 0.0), QUAT)
+        self.sut.send_pending()
+        self.sut.report()
+
+        # Test
+        actual = self.sut.report()
+
+        # Assert
+        self.assertIsNone(actual[1].latency)
+        self.assertEqual(0, actual[1].superseded)
+
+    def test_that_sender_thread_sends_pending_poses(self):
+        # Fixture
+        sut = PackedExtPoseSender({1: self.link_a}, rate=200)
+        sut.start()
+
+        # Test
+        sut.update(1, (1.0, 0.0, 0.0), QUAT)
+        deadline = time.time() + 1.0
+        while not self.link_a.loc.send_extpose_packed.called and time.time() < deadline:
+            time.sleep(0.005)
+        sut.stop()
+
+        # Assert
+        self.link_a.loc.send_extpose_packed.assert_called_once_with(
+            [(1, (1.0, 0.0, 0.0), QUAT)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -29,6 +29,7 @@ from cflib.crazyflie import Crazyflie
 from cflib.crazyflie.localization import Localization
 from cflib.crtp.crtpstack import CRTPPacket
 from cflib.crtp.crtpstack import CRTPPort
+from cflib.utils.encoding import compress_quaternion
 
 
 class LocalizationTest(unittest.TestCase):
@@ -133,3 +134,31 @@ class LocalizationTest(unittest.TestCase):
             self.assertEqual(expected, actual)
         else:
             self.fail('Expect exception')
+
+    def test_that_extpose_packed_packs_two_poses_per_packet(self):
+        # fixture
+        quat = (0.0, 0.0, 0.0, 1.0)
+        poses = [(1, (1.0, -2.0, 0.5), quat),
+                 (2, (0.0, 0.0, 0.001), quat),
+                 (7, (32.767, 0.0, 0.0), quat)]
+
+        # test
+        actual = self.sut.send_extpose_packed(poses)
+
+        # assert
+        self.assertEqual(2, actual)
+        packets = [call[0][0] for call in self.cf_mock.send_packet.call_args_list]
+        self.assertEqual(2, len(packets))
+        for pk in packets:
+            self.assertEqual(CRTPPort.LOCALIZATION, pk.port)
+            self.assertEqual(self.sut.GENERIC_CH, pk.channel)
+            self.assertEqual(Localization.EXT_POSE_PACKED, pk.data[0])
+
+        quat_comp = compress_quaternion(quat)
+        self.assertEqual(23, len(packets[0].data))
+        self.assertEqual((1, 1000, -2000, 500, quat_comp),
+                         struct.unpack('<BhhhI', packets[0].data[1:12]))
+        self.assertEqual((2, 0, 0, 1, quat_comp),
+                         struct.unpack('<BhhhI', packets[0].data[12:23]))
+        self.assertEqual((7, 32767, 0, 0, quat_comp),
+                         struct.unpack('<BhhhI', packets[1].data[1:]))
@@ -19,11 +19,16 @@
 #  GNU General Public License for more details.
 # You should have received a copy of the GNU General Public License
 # along with this program. If not, see <https://www.gnu.org/licenses/>.
+import time
 import unittest
+from threading import Lock
+from threading import Thread
 from unittest.mock import MagicMock
 
 from cflib.crazyflie.swarm import Swarm
+from cflib.crazyflie.swarm import SwarmTrajectoryUploader
 from cflib.crazyflie.syncCrazyflie import SyncCrazyflie
+from cflib.crtp.radiodriver import RadioManager
 
 
 class TestSwarm(unittest.TestCase):
@@ -203,6 +208,127 @@ class TestSwarm(unittest.TestCase):
             self.sut.parallel_safe(func_fail, args_dict=args_dict)
 
 
+class TestSwarmTrajectoryUploader(unittest.TestCase):
+    URI1 = 'radio://0/80/2M/E7E7E7E701'
+    URI2 = 'radio://0/80/2M/E7E7E7E702'
+    URI3 = 'radio://0/80/2M/E7E7E7E703'
+    URI4 = 'radio://1/90/2M/E7E7E7E704'
+
+    def setUp(self):
+        self.uris = [self.URI1, self.URI2, self.URI3, self.URI4]
+        self.lock = Lock()
+        self.active = {}
+        self.max_active = {}
+        self.failures = {}
+        self.images = {}
+
+        self.scfs = {}
+        for uri in self.uris:
+            scf = MagicMock(name='CF-' + uri)
+            trajectory_mem = MagicMock(name='TRAJ-' + uri)
+            trajectory_mem.write_image.side_effect = \
+                lambda data, done_cb, write_failed_cb=None, start_addr=0, uri=uri: \
+                self._write_image(uri, data, done_cb, write_failed_cb)
+            scf.cf.mem.get_mems.return_value = [trajectory_mem]
+            self.scfs[uri] = scf
+
+        self.sut = SwarmTrajectoryUploader(self.scfs)
+
+    def test_that_trajectories_are_uploaded_to_all(self):
+        # Fixture
+        trajectories = {uri: bytes([i]) * 10 for i, uri in enumerate(self.uris)}
+
+        # Test
+        actual = self.sut.upload(trajectories, timeout=5)
+
+        # Assert
+        self.assertTrue(actual.success)
+        self.assertEqual(40, actual.bytes_written)
+        for uri in self.uris:
+            self.assertEqual(trajectories[uri], self.images[uri])
+            self.assertEqual(1, actual.results[uri].attempts)
+
+    def test_that_identical_trajectories_are_packed_once(self):
+        # Fixture
+        element = MagicMock()
+        element.pack.return_value = b'abcd'
+        trajectory = [element, element]
+        trajectories = {self.URI1: trajectory, self.URI2: trajectory, self.URI3: [element, element]}
+
+        # Test
+        actual = SwarmTrajectoryUploader.pack(trajectories)
+
+        # Assert
+        self.assertEqual(4, element.pack.call_count)
+        self.assertEqual(b'abcdabcd', actual[self.URI1])
+        self.assertIs(actual[self.URI1], actual[self.URI2])
+        self.assertIs(actual[self.URI1], actual[self.URI3])
+
+    def test_that_failed_upload_is_retried(self):
+        # Fixture
+        self.failures[self.URI2] = 1
+        completed = []
+
+        # Test
+        actual = self.sut.upload({self.URI1: b'1234', self.URI2: b'5678'}, timeout=5,
+                                 completed_cb=lambda uri, result: completed.append(uri))
+
+        # Assert
+        self.assertTrue(actual.success)
+        self.assertEqual(2, actual.results[self.URI2].attempts)
+        self.assertEqual({self.URI1, self.URI2}, set(completed))
+
+    def test_that_upload_fails_when_retries_are_exhausted(self):
+        # Fixture
+        self.failures[self.URI2] = 10
+
+        # Test
+        actual = self.sut.upload({self.URI1: b'1234', self.URI2: b'5678'}, timeout=5)
+
+        # Assert
+        self.assertFalse(actual.success)
+        self.assertTrue(actual.results[self.URI1].success)
+        self.assertFalse(actual.results[self.URI2].success)
+        self.assertEqual(SwarmTrajectoryUploader.DEFAULT_RETRIES + 1, actual.results[self.URI2].attempts)
+        self.assertEqual(4, actual.bytes_written)
+
+    def test_that_uploads_are_limited_per_dongle(self):
+        # Fixture
+        sut = SwarmTrajectoryUploader(self.scfs, active_per_dongle=1)
+        trajectories = {uri: b'1234' for uri in self.uris}
+
+        # Test
+        actual = sut.upload(trajectories, timeout=5)
+
+        # Assert
+        self.assertTrue(actual.success)
+        self.assertEqual({0: 1, 1: 1}, self.max_active)
+
+    def _write_image(self, uri, data, done_cb, failed_cb):
+        dongle = RadioManager.dongle_of(uri)
+        with self.lock:
+            self.active[dongle] = self.active.get(dongle, 0) + 1
+            self.max_active[dongle] = max(self.max_active.get(dongle, 0), self.active[dongle])
+
+        Thread(target=self._complete_write, args=(uri, dongle, data, done_cb, failed_cb)).start()
+        return len(data)
+
+    def _complete_write(self, uri, dongle, data, done_cb, failed_cb):
+        time.sleep(0.01)
+        with self.lock:
+            self.active[dongle] -= 1
+            failed = self.failures.get(uri, 0) > 0
+            if failed:
+                self.failures[uri] -= 1
+            else:
+                self.images[uri] = data
+
+        if failed:
+            failed_cb(None, 0)
+        else:
+            done_cb(None, 0)
+
+
 class MockFactory:
 
     def __init__(self):
@@ -31,6 +31,11 @@ class CRTPPacketTest(unittest.TestCase):
     def setUp(self):
         self.callback_count = 0
         self.sut = CRTPPacket()
+        self._free_list = CRTPPacket._free_list
+        CRTPPacket._free_list = []
+
+    def tearDown(self):
+        CRTPPacket._free_list = self._free_list
 
     def test_that_port_and_channle_is_encoded_in_header(self):
         # Fixture
@@ -100,3 +105,81 @@ class CRTPPacketTest(unittest.TestCase):
         self.assertEqual(0x2d, actual)
         self.assertEqual(2, sut.port)
         self.assertEqual(1, sut.channel)
+
+    def test_that_packet_is_created_from_buffer(self):
+        # Fixture
+        buffer = bytearray([0x21, 1, 2, 3])
+
+        # Test
+        actual = CRTPPacket.from_buffer(buffer)
+        buffer[1] = 0xff
+
+        # Assert
+        self.assertEqual(2, actual.port)
+        self.assertEqual(1, actual.channel)
+        self.assertEqual(0x2d, actual.header)
+        self.assertEqual(bytearray([1, 2, 3]), actual.data)
+
+    def test_that_packet_is_encoded_to_bytes(self):
+        # Fixture
+        self.sut.set_header(2, 1)
+        self.sut.data = (1, 2, 3)
+
+        # Test
+        actual = self.sut.to_bytes()
+
+        # Assert
+        self.assertEqual(bytes([0x2d, 1, 2, 3]), actual)
+        self.assertEqual(actual, CRTPPacket.from_buffer(actual).to_bytes())
+
+    def test_that_view_is_not_a_copy(self):
+        # Fixture
+        self.sut.data = (1, 2, 3)
+
+        # Test
+        self.sut.view[0] = 7
+
+        # Assert
+        self.assertEqual((7, 2, 3), self.sut.datat)
+        self.assertEqual([7, 2, 3], self.sut.datal)
+
+    def test_that_data_can_be_set_from_memoryview(self):
+        # Fixture
+        buffer = bytes([1, 2, 3, 4])
+
+        # Test
+        self.sut.data = memoryview(buffer)[1:3]
+
+        # Assert
+        self.assertEqual(bytearray([2, 3]), self.sut.data)
+
+    def test_that_released_packet_is_reused(self):
+        # Fixture
+        released = CRTPPacket(0x10, (1, 2, 3, 4))
+        CRTPPacket.release(released)
+
+        # Test
+        actual = CRTPPacket.from_buffer(bytes([0x21, 5]))
+
+        # Assert
+        self.assertIs(released, actual)
+        self.assertEqual(0x2d, actual.header)
+        self.assertEqual(bytearray([5]), actual.data)
+
+    def test_that_free_list_is_bounded(self):
+        # Fixture
+
+        # Test
+        for _ in range(CRTPPacket.FREE_LIST_SIZE + 1):
+            CRTPPacket.release(CRTPPacket())
+
+        # Assert
+        self.assertEqual(CRTPPacket.FREE_LIST_SIZE, len(CRTPPacket._free_list))
+
+    def test_that_attributes_can_not_be_added(self):
+        # Fixture
+
+        # Test
+        # Assert
+        with self.assertRaises(AttributeError):
+            self.sut.timestamp = 0
@@ -0,0 +1,249 @@
+# -*- coding: utf-8 -*-
+#
+#     ||          ____  _ __
+#  +------+      / __ )(_) /_______________ _____  ___
+#  | 0xBC |     / __  / / __/ ___/ ___/ __ `/_  / / _ \
+#  +------+    / /_/ / / /_/ /__/ /  / /_/ / / /_/  __/
+#   ||  ||    /_____/_/\__/\___/_/   \__,_/ /___/\___/
+#
+#  Copyright (C) 2026 Bitcraze AB
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+import queue
+import time
+import unittest
+
+from cflib.crtp import outqueue
+from cflib.crtp.crtpstack import CRTPPacket
+from cflib.crtp.crtpstack import CRTPPort
+from cflib.crtp.outqueue import PriorityOutQueue
+
+
+def _packet(port, channel, data=(0,)):
+    pk = CRTPPacket()
+    pk.set_header(port, channel)
+    pk.data = data
+    return pk
+
+
+class TestPriorityOutQueue(unittest.TestCase):
+
+    def setUp(self):
+        self.sut = PriorityOutQueue()
+
+    def test_that_packets_are_sent_by_priority_class(self):
+        # Fixture
+        mem = _packet(CRTPPort.MEM, 1)
+        param = _packet(CRTPPort.PARAM, 2)
+        setpoint = _packet(CRTPPort.COMMANDER_GENERIC, 0)
+        stop = _packet(CRTPPort.SUPERVISOR, 1)
+
+        # Test
+        for pk in (mem, param, setpoint, stop):
+            self.sut.put(pk)
+
+        # Assert
+        self.assertEqual([stop, setpoint, param, mem], self._get_all())
+
+    def test_that_packets_in_a_class_are_sent_in_order(self):
+        # Fixture
+        packets = [_packet(CRTPPort.PARAM, 2, (i,)) for i in range(3)]
+
+        # Test
+        for pk in packets:
+            self.sut.put(pk)
+
+        # Assert
+        self.assertEqual(packets, self._get_all())
+
+    def test_that_streamed_setpoints_are_coalesced(self):
+        # Fixture
+        first = _packet(CRTPPort.COMMANDER_GENERIC, 0, (1,))
+        other = _packet(CRTPPort.COMMANDER, 0, (0,))
+        latest = _packet(CRTPPort.COMMANDER_GENERIC, 0, (2,))
+
+        # Test
+        for pk in (first, other, latest):
+            self.sut.put(pk)
+
+        # Assert
+        self.assertEqual([other, latest], self._get_all())
+        self.assertEqual(1, self.sut.statistics()[outqueue.SETPOINT].coalesced)
+
+    def test_that_one_shot_commands_keep_their_order_with_requests(self):
+        # Fixture
+        param = _packet(CRTPPort.PARAM, 2)
+        takeoff = _packet(CRTPPort.SETPOINT_HL, 0, (7,))
+        stop = _packet(CRTPPort.COMMANDER_GENERIC, 1, (0,))
+
+        # Test
+        for pk in (param, takeoff, stop):
+            self.sut.put(pk)
+
+        # Assert
+        self.assertEqual([param, takeoff, stop], self._get_all())
+
+    def test_that_extpose_is_coalesced(self):
+        # Fixture
+        poses = [_packet(CRTPPort.LOCALIZATION, 1, (8, i)) for i in range(2)]
+
+        # Test
+        for pk in poses:
+            self.sut.put(pk)
+
+        # Assert
+        self.assertEqual([poses[1]], self._get_all())
+
+    def test_that_packed_poses_are_coalesced_per_set_of_crazyflies(self):
+        # Fixture
+        item = bytes(10)
+        first = _packet(CRTPPort.LOCALIZATION, 1, bytes([9, 1]) + item + bytes([2]) + item)
+        others = _packet(CRTPPort.LOCALIZATION, 1, bytes([9, 3]) + item + bytes([4]) + item)
+        latest = _packet(CRTPPort.LOCALIZATION, 1, bytes([9, 1]) + item + bytes([2]) + item)
+        param = _packet(CRTPPort.PARAM, 2)
+
+        # Test
+        for pk in (param, first, others, latest):
+            self.sut.put(pk)
+
+        # Assert
+        self.assertEqual(outqueue.SETPOINT, outqueue.classify(latest)[0])
+        self.assertEqual([others, latest, param], self._get_all())
+
+    def test_that_full_bulk_class_does_not_block_setpoints(self):
+        # Fixture
+        self.sut.put(_packet(CRTPPort.MEM, 2))
+
+        # Test
+        self.sut.put_nowait(_packet(CRTPPort.COMMANDER, 0))
+
+        # Assert
+        with self.assertRaises(queue.Full):
+            self.sut.put_nowait(_packet(CRTPPort.MEM, 2))
+        self.assertEqual(2, self.sut.qsize())
+
+    def test_that_class_depth_can_be_set(self):
+        # Fixture
+        sut = PriorityOutQueue({outqueue.BULK: 2})
+
+        # Test
+        sut.put_nowait(_packet(CRTPPort.MEM, 2))
+        sut.put_nowait(_packet(CRTPPort.MEM, 2))
+
+        # Assert
+        with self.assertRaises(queue.Full):
+            sut.put_nowait(_packet(CRTPPort.MEM, 2))
+
+    def test_that_depths_of_other_classes_are_kept(self):
+        # Fixture
+
+        # Test
+        sut = PriorityOutQueue({outqueue.REQUEST: 1, outqueue.BULK: 3})
+
+        # Assert
+        self.assertEqual([16, 16, 1, 3], [cls.depth for cls in sut._classes])
+
+    def test_that_depth_of_unknown_class_is_rejected(self):
+        # Fixture
+
+        # Test
+        # Assert
+        with self.assertRaises(ValueError):
+            PriorityOutQueue({7: 1})
+
+    def test_that_put_waits_for_space_until_timeout(self):
+        # Fixture
+        self.sut.put(_packet(CRTPPort.MEM, 2))
+
+        # Test
+        start = time.time()
+        with self.assertRaises(queue.Full):
+            self.sut.put(_packet(CRTPPort.MEM, 2), True, 0.05)
+
+        # Assert
+        self.assertGreaterEqual(time.time() - start, 0.05)
+
+    def test_that_get_times_out_when_empty(self):
+        # Fixture
+
+        # Test
+        # Assert
+        with self.assertRaises(queue.Empty):
+            self.sut.get(True, 0.01)
+        with self.assertRaises(queue.Empty):
+            self.sut.get_nowait()
+
+    def test_that_statistics_report_depth_and_age(self):
+        # Fixture
+        self.sut.put(_packet(CRTPPort.PARAM, 2))
+        self.sut.put(_packet(CRTPPort.PARAM, 2))
+        time.sleep(0.02)
+        self.sut.get()
+
+        # Test
+        actual = self.sut.statistics()
+
+        # Assert
+        request = actual[outqueue.REQUEST]
+        self.assertEqual(1, request.depth)
+        self.assertGreaterEqual(request.oldest_age, 0.02)
+        self.assertGreaterEqual(request.mean_wait, 0.02)
+        self.assertEqual(1, request.sent)
+        self.assertEqual(0, actual[outqueue.BULK].depth)
+
+    def test_that_clear_drops_all_packets(self):
+        # Fixture
+        self.sut.put(_packet(CRTPPort.COMMANDER, 0))
+        self.sut.put(_packet(CRTPPort.MEM, 2))
+
+        # Test
+        self.sut.clear()
+
+        # Assert
+        self.assertTrue(self.sut.empty())
+        self.sut.put_nowait(_packet(CRTPPort.COMMANDER, 0))
+
+    def test_that_packets_not_accepted_stay_queued(self):
+        # Fixture
+        extpos = _packet(CRTPPort.LOCALIZATION, 0)
+        param = _packet(CRTPPort.PARAM, 2)
+        self.sut.put(extpos)
+        self.sut.put(param)
+
+        # Test
+        actual = self.sut.get(True, 0.01, accept=lambda pk: pk.port != CRTPPort.LOCALIZATION)
+
+        # Assert
+        self.assertEqual(param, actual)
+        with self.assertRaises(queue.Empty):
+            self.sut.get(True, 0.01, accept=lambda pk: False)
+        self.assertEqual(extpos, self.sut.get_nowait())
+
+    def test_that_bootloader_packets_are_bulk(self):
+        # Fixture
+
+        # Test
+        actual = outqueue.classify(CRTPPacket(0xFF, (0xFF, 0x10)))
+
+        # Assert
+        self.assertEqual((outqueue.BULK, None), actual)
+
+    def _get_all(self):
+        packets = []
+        while not self.sut.empty():
+            packets.append(self.sut.get_nowait())
+        return packets
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+#
+#     ||          ____  _ __
+#  +------+      / __ )(_) /_______________ _____  ___
+#  | 0xBC |     / __  / / __/ ___/ ___/ __ `/_  / / _ \
+#  +------+    / /_/ / / /_/ /__/ /  / /_/ / / /_/  __/
+#   ||  ||    /_____/_/\__/\___/_/   \__,_/ /___/\___/
+#
+#  Copyright (C) 2026 Bitcraze AB
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+import unittest
+from unittest.mock import patch
+
+from cflib.crtp.crtpstack import CRTPPacket
+from cflib.crtp.crtpstack import CRTPPort
+from cflib.crtp.exceptions import WrongUriType
+from cflib.crtp.radiobroadcastdriver import RadioBroadcastDriver
+from cflib.crtp.radiodriver import RadioManager
+from test.support.fake_crazyradio import FakeCrazyradio
+
+
+@patch('cflib.crtp.radiodriver.Crazyradio', FakeCrazyradio)
+class TestRadioBroadcastDriver(unittest.TestCase):
+
+    def setUp(self):
+        self._radios = RadioManager._radios
+        RadioManager._radios = []
+        self.sut = RadioBroadcastDriver()
+
+    def tearDown(self):
+        self.sut.close()
+        RadioManager._radios = self._radios
+
+    def test_that_broadcast_address_is_used_by_default(self):
+        # Fixture
+
+        # Test
+        devid, channel, datarate, address, repeat = RadioBroadcastDriver.parse_uri('radiobroadcast://1/80/2M')
+
+        # Assert
+        self.assertEqual((1, 80, 2), (devid, channel, datarate))
+        self.assertEqual((0xff, 0xe7, 0xe7, 0xe7, 0xe7), tuple(address))
+        self.assertEqual(1, repeat)
+
+    def test_that_address_and_repeat_are_parsed(self):
+        # Fixture
+
+        # Test
+        devid, channel, datarate, address, repeat = RadioBroadcastDriver.parse_uri(
+            'radiobroadcast://0/60/1M/FFE7E7E701?repeat=3')
+
+        # Assert
+        self.assertEqual((0, 60, 1), (devid, channel, datarate))
+        self.assertEqual((0xff, 0xe7, 0xe7, 0xe7, 0x01), tuple(address))
+        self.assertEqual(3, repeat)
+
+    def test_that_radio_uri_is_not_accepted(self):
+        # Fixture
+
+        # Test
+        # Assert
+        with self.assertRaises(WrongUriType):
+            self.sut.connect('radio://0/80/2M', None, None)
+
+    def test_that_packet_is_repeated_without_acks(self):
+        # Fixture
+        self.sut.connect('radiobroadcast://0/80/2M?repeat=3', None, None)
+        pk = CRTPPacket()
+        pk.set_header(CRTPPort.SETPOINT_HL, 0)
+        pk.data = (1, 2, 3)
+
+        # Test
+        actual = self.sut.send_packet(pk)
+
+        # Assert
+        self.assertTrue(actual)
+        sent = RadioManager._radios[0]._radio.sent
+        self.assertEqual(3, len(sent))
+        for channel, address, datarate, data, ack_enabled in sent:
+            self.assertEqual(80, channel)
+            self.assertEqual((0xff, 0xe7, 0xe7, 0xe7, 0xe7), address)
+            self.assertEqual(bytes([pk.header, 1, 2, 3]), data)
+            self.assertFalse(ack_enabled)
+
+    def test_that_acks_are_enabled_again_for_unicast_links(self):
+        # Fixture
+        self.sut.connect('radiobroadcast://0/80/2M', None, None)
+        unicast = RadioManager.open(0)
+        self.sut.send_packet(CRTPPacket(0x80, (1,)))
+
+        # Test
+        ack = unicast.send_packet((0xff,))
+        unicast.close()
+
+        # Assert
+        self.assertTrue(ack.ack)
+        self.assertTrue(RadioManager._radios[0]._radio.sent[-1][4])
+
+    def test_that_nothing_is_received(self):
+        # Fixture
+        self.sut.connect('radiobroadcast://0/80/2M', None, None)
+
+        # Test
+        actual = self.sut.receive_packet(0.01)
+
+        # Assert
+        self.assertIsNone(actual)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,509 @@
+# -*- coding: utf-8 -*-
+#
+#     ||          ____  _ __
+#  +------+      / __ )(_) /_______________ _____  ___
+#  | 0xBC |     / __  / / __/ ___/ ___/ __ `/_  / / _ \
+#  +------+    / /_/ / / /_/ /__/ /  / /_/ / / /_/  __/
+#   ||  ||    /_____/_/\__/\___/_/   \__,_/ /___/\___/
+#
+#  Copyright (C) 2026 Bitcraze AB
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+import time
+import unittest
+from threading import Thread
+from unittest.mock import patch
+
+from cflib.crtp.crtpstack import CRTPPacket
+from cflib.crtp.crtpstack import CRTPPort
+from cflib.crtp.radiodriver import _AdaptivePolling
+from cflib.crtp.radiodriver import _FrameBuffers
+from cflib.crtp.radiodriver import RadioDriver
+from cflib.crtp.radiodriver import RadioManager
+from cflib.crtp.radiodriver import _SharedRadio
+from cflib.crtp.radiodriver import _SharedRadioStatistics
+from test.support.fake_crazyradio import FakeCrazyradio
+
+
+@patch('cflib.crtp.radiodriver.Crazyradio', FakeCrazyradio)
+class TestSharedRadio(unittest.TestCase):
+
+    def setUp(self):
+        self.instances = []
+
+    def tearDown(self):
+        for instance in self.instances:
+            instance.close()
+
+    def test_that_same_configuration_is_not_set_again(self):
+        # Fixture
+        sut = _SharedRadio(0)
+        instance = self._open(sut, channel=10)
+
+        # Test
+        for _ in range(5):
+            instance.send_packet((0xff,))
+
+        # Assert
+        self.assertEqual(1, sut.reconfigurations)
+        self.assertEqual(5, len(sut._radio.sent))
+
+    def test_that_no_ack_send_is_answered_without_an_ack(self):
+        # Fixture
+        sut = _SharedRadio(0)
+        instance = self._open(sut, channel=10)
+
+        # Test
+        actual = instance.send_packet_no_ack((0xff,))
+
+        # Assert
+        self.assertIsNotNone(actual)
+        self.assertFalse(actual.ack)
+        self.assertEqual([(10, False)], [(sent[0], sent[4]) for sent in sut._radio.sent])
+        self.assertEqual(0, instance.statistics.acks)
+
+    def test_that_sends_on_the_same_channel_are_grouped(self):
+        # Fixture
+        sut = _SharedRadio(0)
+        sut._radio.release.clear()
+        blocking = self._open(sut, channel=5)
+        instances = [self._open(sut, channel=channel) for channel in (10, 20, 10, 20)]
+
+        # The first send blocks the radio while the others are queued
+        threads = [self._send_in_thread(sut, blocking, 0)]
+        for (i, instance) in enumerate(instances):
+            threads.append(self._send_in_thread(sut, instance, i))
+
+        # Test
+        sut._radio.release.set()
+        for thread in threads:
+            thread.join()
+
+        # Assert
+        self.assertEqual([5, 10, 10, 20, 20], [sent[0] for sent in sut._radio.sent])
+        self.assertEqual([0, 0, 2, 1, 3], [sent[3][0] for sent in sut._radio.sent])
+        self.assertEqual(3, sut.reconfigurations)
+
+    def test_that_sends_of_a_group_are_sent_in_one_burst(self):
+        # Fixture
+        sut = _SharedRadio(0)
+        sut._radio.release.clear()
+        blocking = self._open(sut, channel=5)
+        instances = [self._open(sut, channel=channel) for channel in (10, 20, 10, 10)]
+        for (i, instance) in enumerate(instances):
+            instance.set_address((0xe7, 0xe7, 0xe7, 0xe7, 4 - i))
+
+        threads = [self._send_in_thread(sut, blocking, 0)]
+        for (i, instance) in enumerate(instances):
+            threads.append(self._send_in_thread(sut, instance, i))
+
+        # Test
+        sut._radio.release.set()
+        for thread in threads:
+            thread.join()
+
+        # Assert
+        self.assertEqual([1, 3, 1], sut._radio.bursts)
+        self.assertEqual(3, sut.bursts)
+        # Sorted by address within the burst
+        self.assertEqual([(10, 1), (10, 2), (10, 4)], [(sent[0], sent[1][4]) for sent in sut._radio.sent[1:4]])
+
+    def test_that_current_configuration_is_served_first(self):
+        # Fixture
+        sut = _SharedRadio(0)
+        sut._radio.release.clear()
+        blocking = self._open(sut, channel=20)
+        instances = [self._open(sut, channel=channel) for channel in (10, 20)]
+
+        threads = [self._send_in_thread(sut, blocking, 0)]
+        for (i, instance) in enumerate(instances):
+            threads.append(self._send_in_thread(sut, instance, i))
+
+        # Test
+        sut._radio.release.set()
+        for thread in threads:
+            thread.join()
+
+        # Assert
+        self.assertEqual([20, 20, 10], [sent[0] for sent in sut._radio.sent])
+
+    @patch.object(_SharedRadioStatistics, 'RATE_PERIOD', 0.0)
+    def test_that_packet_rate_is_reported_per_instance(self):
+        # Fixture
+        sut = _SharedRadio(0)
+        sending = self._open(sut, channel=10)
+        idle = self._open(sut, channel=20)
+
+        # Test
+        for _ in range(3):
+            sending.send_packet((0xff,))
+            time.sleep(0.001)
+
+        # Assert
+        self.assertEqual(3, sending.statistics.acks)
+        self.assertGreater(sending.packet_rate, 0.0)
+        self.assertEqual(0, idle.statistics.packets)
+        self.assertEqual(0.0, idle.packet_rate)
+        self.assertEqual(2, len(sut.statistics()))
+
+    def _open(self, sut, channel):
+        instance = sut.open_instance()
+        instance.set_channel(channel)
+        self.instances.append(instance)
+        return instance
+
+    def _send_in_thread(self, sut, instance, marker):
+        queued = sut._cmd_queue.qsize()
+        blocked = sut._radio.waiting.is_set()
+        thread = Thread(target=instance.send_packet, args=((marker,),))
+        thread.start()
+
+        # Wait until the first send is blocking the radio, and the others are queued
+        timeout = time.time() + 1.0
+        while time.time() < timeout:
+            if blocked and sut._cmd_queue.qsize() > queued:
+                break
+            if not blocked and sut._radio.waiting.is_set():
+                break
+            time.sleep(0.001)
+        return thread
+
+
+@patch('cflib.crtp.radiodriver.Crazyradio', FakeCrazyradio)
+class TestRadioManagerPool(unittest.TestCase):
+
+    def setUp(self):
+        self._saved = (RadioManager._radios, RadioManager._pool, RadioManager._pooled, RadioManager.migrations)
+        RadioManager._radios = []
+        RadioManager._pooled = []
+        RadioManager.migrations = 0
+        RadioManager.set_pool([0, 1])
+        self.instances = []
+
+    def tearDown(self):
+        for instance in self.instances:
+            instance.close()
+        RadioManager._radios, RadioManager._pool, RadioManager._pooled, RadioManager.migrations = self._saved
+
+    def test_that_star_uri_is_pooled(self):
+        # Fixture
+
+        # Test
+        devid, channel, datarate, address, rate_limit = RadioDriver.parse_uri('radio://*/80/2M')
+
+        # Assert
+        self.assertIsNone(devid)
+        self.assertEqual(80, channel)
+
+    def test_that_dongle_of_resolves_devid_and_serial(self):
+        # Fixture
+
+        # Test
+        with patch('cflib.crtp.radiodriver.crazyradio.get_serials', return_value=['E7E7E7E7A0', 'E7E7E7E7A1']):
+            actual = [RadioManager.dongle_of('radio://1/80/2M/E7E7E7E701'),
+                      RadioManager.dongle_of('radio://e7e7e7e7a1/90/2M/E7E7E7E702'),
+                      RadioManager.dongle_of('radio://0/80/2M')]
+
+        # Assert
+        self.assertEqual([1, 1, 0], actual)
+
+    def test_that_pooled_and_other_links_are_groups_of_their_own(self):
+        # Fixture
+        uris = ['radio://*/80/2M/E7E7E7E701', 'radio://*/80/2M/E7E7E7E702', 'usb://0']
+
+        # Test
+        actual = [RadioManager.dongle_of(uri) for uri in uris]
+
+        # Assert
+        self.assertEqual(uris, actual)
+
+    def test_that_port_rate_limits_are_parsed(self):
+        # Fixture
+
+        # Test
+        actual = RadioDriver.parse_port_rate_limits('radio://0/80/2M?rate_limit=200&port_rate_limit=6:50,3:100.5')
+
+        # Assert
+        self.assertEqual({6: 50.0, 3: 100.5}, actual)
+
+    def test_that_poll_latency_is_parsed(self):
+        # Fixture
+
+        # Test
+        actual = [RadioDriver.parse_poll_latency('radio://0/80/2M?rate_limit=200&poll_latency=5'),
+                  RadioDriver.parse_poll_latency('radio://0/80/2M')]
+
+        # Assert
+        self.assertEqual([0.005, None], actual)
+
+    def test_that_unmeasured_links_are_spread_over_the_pool(self):
+        # Fixture
+
+        # Test
+        actual = [self._open().devid for _ in range(4)]
+
+        # Assert
+        self.assertEqual([0, 1, 0, 1], actual)
+
+    def test_that_new_link_goes_to_least_loaded_radio(self):
+        # Fixture
+        busy = self._open(rate=500.0)
+        self._open(rate=100.0)
+        self._open(rate=100.0)
+
+        # Test
+        actual = self._open()
+
+        # Assert
+        self.assertEqual(0, busy.devid)
+        self.assertEqual(1, actual.devid)
+
+    def test_that_link_on_fixed_radio_counts_as_load(self):
+        # Fixture
+        fixed = RadioManager.open(0)
+        self.instances.append(fixed)
+        self._set_rate(fixed, 300.0)
+
+        # Test
+        actual = self._open()
+
+        # Assert
+        self.assertEqual(1, actual.devid)
+
+    def test_that_link_is_migrated_to_idle_radio(self):
+        # Fixture
+        moved = self._open(channel=42)
+        idle = self._open()
+        busy = self._open()
+
+        # The load shifts after the links were assigned
+        self._set_rate(moved, 400.0)
+        self._set_rate(idle, 50.0)
+        self._set_rate(busy, 400.0)
+
+        # Test
+        actual = RadioManager.rebalance()
+        moved.send_packet((0x01,))
+
+        # Assert
+        self.assertTrue(actual)
+        self.assertEqual(1, moved.devid)
+        self.assertEqual(1, RadioManager.migrations)
+        self.assertEqual([(42, 0x01)], [(sent[0], sent[3][0]) for sent in RadioManager._radios[1]._radio.sent])
+        self.assertEqual([], RadioManager._radios[0]._radio.sent)
+
+    def test_that_link_is_not_migrated_for_a_small_gain(self):
+        # Fixture
+        self._open(rate=100.0)
+        self._open(rate=60.0)
+
+        # Test
+        actual = RadioManager.rebalance()
+
+        # Assert
+        self.assertFalse(actual)
+        self.assertEqual(0, RadioManager.migrations)
+
+    def test_that_pool_statistics_sum_the_links_of_each_radio(self):
+        # Fixture
+        instances = [self._open() for _ in range(3)]
+        for instance, rate in zip(instances, (200.0, 50.0, 100.0)):
+            self._set_rate(instance, rate)
+
+        # Test
+        actual = RadioManager.pool_statistics()
+
+        # Assert
+        self.assertEqual({0, 1}, set(actual.dongles))
+        self.assertEqual(2, actual.dongles[0].links)
+        self.assertEqual(2, actual.dongles[0].pooled_links)
+        self.assertEqual(300.0, actual.dongles[0].packet_rate)
+        self.assertEqual(50.0, actual.dongles[1].packet_rate)
+        self.assertEqual(0, actual.migrations)
+
+    def test_that_balancer_stops_when_last_pooled_link_is_closed(self):
+        # Fixture
+        instance = RadioManager.open(None)
+
+        # Test
+        balancer = RadioManager._balancer
+        instance.close()
+        balancer.join(1.0)
+
+        # Assert
+        self.assertIsNone(RadioManager._balancer)
+        self.assertFalse(balancer.is_alive())
+
+    def _open(self, rate=None, channel=2):
+        instance = RadioManager.open(None)
+        instance.set_channel(channel)
+        self.instances.append(instance)
+        if rate is not None:
+            self._set_rate(instance, rate)
+        return instance
+
+    def _set_rate(self, instance, rate):
+        instance.statistics.packet_rate = rate
+        instance.statistics.measured = True
+
+
+class TestFrameBuffers(unittest.TestCase):
+
+    def setUp(self):
+        self.sut = _FrameBuffers()
+
+    def test_that_frame_holds_header_and_data(self):
+        # Fixture
+        pk = CRTPPacket(0x30, (1, 2, 3))
+
+        # Test
+        actual = self.sut.frame(pk)
+
+        # Assert
+        self.assertEqual(bytes([pk.header, 1, 2, 3]), actual.tobytes())
+
+    def test_that_frames_are_reused(self):
+        # Fixture
+        first = self.sut.frame(CRTPPacket(0x30, (1, 2)))
+
+        # Test
+        second = self.sut.frame(CRTPPacket(0x40, (3, 4)))
+
+        # Assert
+        self.assertIs(first, second)
+        self.assertEqual(bytes([0x4C, 3, 4]), second.tobytes())
+
+    def test_that_null_packet_is_reset(self):
+        # Fixture
+        frame = self.sut.null_packet()
+        frame[0] &= 0xF3
+
+        # Test
+        actual = self.sut.null_packet()
+
+        # Assert
+        self.assertEqual(b'\xff', actual.tobytes())
+
+
+class TestAdaptivePolling(unittest.TestCase):
+
+    def setUp(self):
+        self.sut = _AdaptivePolling(latency=0.02)
+
+    def test_that_polls_are_back_to_back_while_data_is_received(self):
+        # Fixture
+        self._idle()
+
+        # Test
+        self.sut.received(CRTPPacket(0x00, b'hello'))
+
+        # Assert
+        self.assertEqual(0, self.sut.wait_time())
+
+    def test_that_idle_link_waits_for_the_latency_budget(self):
+        # Fixture
+
+        # Test
+        self._idle()
+
+        # Assert
+        self.assertEqual(0.02, self.sut.wait_time())
+
+    def test_that_null_packets_from_the_crazyflie_are_empty(self):
+        # Fixture
+
+        # Test
+        for _ in range(_AdaptivePolling.EMPTY_ACKS_BEFORE_IDLE):
+            self.sut.received(CRTPPacket(0xF7, (0x01, 0x40)))
+
+        # Assert
+        self.assertEqual(0.02, self.sut.wait_time())
+
+    def test_that_polls_are_back_to_back_while_a_reply_is_outstanding(self):
+        # Fixture
+        self.sut.sent(CRTPPacket(CRTPPort.PARAM << 4, (0x00, 0x01)))
+
+        # Test
+        self._idle()
+        waiting = self.sut.wait_time()
+        self.sut.received(CRTPPacket(CRTPPort.PARAM << 4, (0x00, 0x01, 0x02)))
+        self._idle()
+
+        # Assert
+        self.assertEqual(0, waiting)
+        self.assertEqual(0.02, self.sut.wait_time())
+
+    def test_that_log_data_does_not_answer_requests(self):
+        # Fixture
+        self.sut.sent(CRTPPacket((CRTPPort.LOGGING << 4) | 0, (0x03,)))
+
+        # Test
+        self.sut.received(CRTPPacket((CRTPPort.LOGGING << 4) | 2, (0x01, 0x00, 0x00, 0x00)))
+        self.sut.received(CRTPPacket((CRTPPort.LOGGING << 4) | 2, (0x01, 0x00, 0x00, 0x00)))
+        self._idle()
+        waiting = self.sut.wait_time()
+        self.sut.received(CRTPPacket((CRTPPort.LOGGING << 4) | 0, (0x03, 0x10)))
+        self._idle()
+
+        # Assert
+        self.assertEqual(0, waiting)
+        self.assertEqual(0.02, self.sut.wait_time())
+
+    def test_that_setpoints_do_not_expect_replies(self):
+        # Fixture
+        self.sut.sent(CRTPPacket(CRTPPort.COMMANDER << 4, bytes(14)))
+
+        # Test
+        self._idle()
+
+        # Assert
+        self.assertEqual(0.02, self.sut.wait_time())
+
+    def test_that_started_log_blocks_set_the_poll_rate(self):
+        # Fixture
+        self._send_log_settings(3, 1, 10)
+        self._send_log_settings(3, 2, 5)
+
+        # Test
+        self._idle()
+
+        # Assert
+        # 10 + 20 log packets per second, two polls per packet
+        self.assertAlmostEqual(30.0, self.sut.log_rate)
+        self.assertAlmostEqual(1.0 / 60.0, self.sut.wait_time())
+
+    def test_that_stopped_log_blocks_are_removed(self):
+        # Fixture
+        self._send_log_settings(3, 1, 10)
+        self._send_log_settings(3, 2, 1)
+
+        # Test
+        self._send_log_settings(4, 2)
+        self._idle()
+
+        # Assert
+        self.assertAlmostEqual(10.0, self.sut.log_rate)
+        self.assertEqual(0.02, self.sut.wait_time())
+
+    def _send_log_settings(self, *data):
+        self.sut.sent(CRTPPacket((CRTPPort.LOGGING << 4) | 1, data))
+        # The answer to the log settings request
+        self.sut.received(CRTPPacket((CRTPPort.LOGGING << 4) | 1, data[0:2] + (0,)))
+
+    def _idle(self):
+        for _ in range(_AdaptivePolling.EMPTY_ACKS_BEFORE_IDLE):
+            self.sut.received(None)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+#
+#     ||          ____  _ __
+#  +------+      / __ )(_) /_______________ _____  ___
+#  | 0xBC |     / __  / / __/ ___/ ___/ __ `/_  / / _ \
+#  +------+    / /_/ / / /_/ /__/ /  / /_/ / / /_/  __/
+#   ||  ||    /_____/_/\__/\___/_/   \__,_/ /___/\___/
+#
+#  Copyright (C) 2026 Bitcraze AB
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+import time
+import unittest
+
+from cflib.crtp.crtpstack import CRTPPacket
+from cflib.crtp.crtpstack import CRTPPort
+from cflib.crtp.ratelimiter import RateLimiter
+
+
+def _packet(port, channel=0):
+    pk = CRTPPacket()
+    pk.set_header(port, channel)
+    return pk
+
+
+class TestRateLimiter(unittest.TestCase):
+
+    def setUp(self):
+        self.sut = RateLimiter()
+
+    def test_that_unlimited_packets_are_always_taken(self):
+        # Fixture
+
+        # Test
+        actual = [self.sut.take(_packet(CRTPPort.LOGGING)) for _ in range(100)]
+
+        # Assert
+        self.assertTrue(all(actual))
+        self.assertFalse(self.sut.limited)
+
+    def test_that_port_limit_only_applies_to_the_port(self):
+        # Fixture
+        self.sut.set_rate(1, port=CRTPPort.LOCALIZATION)
+
+        # Test
+        first = self.sut.take(_packet(CRTPPort.LOCALIZATION))
+        second = self.sut.take(_packet(CRTPPort.LOCALIZATION))
+        other = self.sut.take(_packet(CRTPPort.LOGGING))
+
+        # Assert
+        self.assertEqual((True, False, True), (first, second, other))
+
+    def test_that_burst_packets_are_sent_back_to_back(self):
+        # Fixture
+        self.sut.set_rate(1, burst=3)
+
+        # Test
+        actual = [self.sut.take(_packet(CRTPPort.PARAM)) for _ in range(4)]
+
+        # Assert
+        self.assertEqual([True, True, True, False], actual)
+
+    def test_that_bucket_refills_at_the_rate(self):
+        # Fixture
+        self.sut.set_rate(100, port=CRTPPort.LOCALIZATION, burst=1)
+        self.sut.take(_packet(CRTPPort.LOCALIZATION))
+
+        # Test
+        time.sleep(0.02)
+        actual = self.sut.take(_packet(CRTPPort.LOCALIZATION))
+
+        # Assert
+        self.assertTrue(actual)
+
+    def test_that_port_token_is_not_used_when_link_is_empty(self):
+        # Fixture
+        self.sut.set_rate(1)
+        self.sut.set_rate(1, port=CRTPPort.LOCALIZATION)
+        self.sut.take(_packet(CRTPPort.PARAM))
+
+        # Test
+        actual = self.sut.take(_packet(CRTPPort.LOCALIZATION))
+
+        # Assert
+        self.assertFalse(actual)
+        self.assertAlmostEqual(1.0, self.sut.levels()[CRTPPort.LOCALIZATION], places=2)
+
+    def test_that_emergency_stop_bypasses_the_buckets(self):
+        # Fixture
+        self.sut.set_rate(1)
+        self.sut.set_rate(1, port=CRTPPort.SUPERVISOR)
+
+        # Test
+        actual = [self.sut.take(_packet(CRTPPort.SUPERVISOR, 1)) for _ in range(3)]
+
+        # Assert
+        self.assertEqual([True, True, True], actual)
+        self.assertTrue(self.sut.take(_packet(CRTPPort.LOGGING)))
+
+    def test_that_levels_report_the_fill_of_each_bucket(self):
+        # Fixture
+        self.sut.set_rate(1, burst=2)
+        self.sut.set_rate(1, port=CRTPPort.LOCALIZATION)
+        self.sut.take(_packet(CRTPPort.LOCALIZATION))
+
+        # Test
+        actual = self.sut.levels()
+
+        # Assert
+        self.assertEqual({None, CRTPPort.LOCALIZATION}, set(actual))
+        self.assertAlmostEqual(0.5, actual[None], places=2)
+        self.assertAlmostEqual(0.0, actual[CRTPPort.LOCALIZATION], places=2)
+
+    def test_that_limit_can_be_removed(self):
+        # Fixture
+        self.sut.set_rate(1, port=CRTPPort.LOCALIZATION)
+        self.sut.take(_packet(CRTPPort.LOCALIZATION))
+
+        # Test
+        self.sut.set_rate(None, port=CRTPPort.LOCALIZATION)
+
+        # Assert
+        self.assertTrue(self.sut.take(_packet(CRTPPort.LOCALIZATION)))
+        self.assertEqual({}, self.sut.levels())
+
+
+if __name__ == '__main__':
+    unittest.main()
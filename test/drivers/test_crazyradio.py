@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+#
+#     ||          ____  _ __
+#  +------+      / __ )(_) /_______________ _____  ___
+#  | 0xBC |     / __  / / __/ ___/ ___/ __ `/_  / / _ \
+#  +------+    / /_/ / / /_/ /__/ /  / /_/ / / /_/  __/
+#   ||  ||    /_____/_/\__/\___/_/   \__,_/ /___/\___/
+#
+#  Copyright (C) 2026 Bitcraze AB
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+import unittest
+
+from cflib.drivers.crazyradio import Crazyradio
+from test.support.fake_usb_device import FakeUsbDevice
+
+
+class TestCrazyradio(unittest.TestCase):
+
+    def setUp(self):
+        self.device = FakeUsbDevice()
+        self.sut = Crazyradio(device=self.device)
+        self.device.transfers.clear()
+
+    def tearDown(self):
+        self.sut.close()
+
+    def test_that_send_packet_writes_and_reads(self):
+        # Fixture
+        self.device.ack_data = (0x12, 0x34)
+
+        # Test
+        actual = self.sut.send_packet((0xff,))
+
+        # Assert
+        self.assertTrue(actual.ack)
+        self.assertEqual((0x12, 0x34), tuple(actual.data))
+        self.assertEqual([('write', b'\xff'), ('read',)], self.device.transfers)
+
+    def test_that_send_packet_no_ack_only_writes(self):
+        # Fixture
+
+        # Test
+        self.sut.send_packet_no_ack((0xff, 0x01))
+
+        # Assert
+        self.assertEqual([('write', b'\xff\x01')], self.device.transfers)
+
+    def test_that_burst_returns_the_acks_in_order(self):
+        # Fixture
+        packets = [(0x10, i) for i in range(5)]
+
+        # Test
+        actual = self.sut.send_packets(packets)
+
+        # Assert
+        self.assertEqual(5, len(actual))
+        self.assertTrue(all(ack.ack for ack in actual))
+        self.assertEqual([bytes(packet) for packet in packets],
+                         [transfer[1] for transfer in self.device.transfers if transfer[0] == 'write'])
+
+    def test_that_next_write_is_done_before_the_ack_is_read(self):
+        # Fixture
+        packets = [(0x10, i) for i in range(3)]
+        self.device.burst_size = len(packets)
+        self.device.read_overlap_timeout = 1.0
+
+        # Test
+        self.sut.send_packets(packets)
+
+        # Assert
+        transfers = [transfer[0] for transfer in self.device.transfers]
+        self.assertEqual(['write', 'write'], transfers[0:2])
+        self.assertEqual(3, transfers.count('read'))
+
+    def test_that_failed_write_gives_no_ack(self):
+        # Fixture
+        packets = [(0x10, 0), (0x10, 1), (0x10, 2)]
+        self.device.failing_writes.add(bytes(packets[1]))
+
+        # Test
+        actual = self.sut.send_packets(packets)
+
+        # Assert
+        self.assertTrue(actual[0].ack)
+        self.assertIsNone(actual[1])
+        self.assertTrue(actual[2].ack)
+
+    def test_that_address_is_changed_when_the_sent_packets_are_acked(self):
+        # Fixture
+        packets = [(0x10, i) for i in range(4)]
+        addresses = [(0xe7,) * 4 + (1,), (0xe7,) * 4 + (1,), (0xe7,) * 4 + (2,), (0xe7,) * 4 + (2,)]
+        self.device.echo = True
+
+        # Test
+        actual = self.sut.send_packets(packets, addresses)
+
+        # Assert
+        self.assertEqual(packets, [tuple(ack.data) for ack in actual])
+        transfers = self.device.transfers
+        second_address = transfers.index(('address', addresses[2]))
+        self.assertEqual(2, transfers[:second_address].count(('read',)))
+        self.assertEqual(2, transfers[second_address:].count(('read',)))
+        self.assertEqual([('address', addresses[0]), ('address', addresses[2])],
+                         [transfer for transfer in transfers if transfer[0] == 'address'])
+
+    def test_that_burst_is_stopped_after_a_failed_read(self):
+        # Fixture
+        packets = [(0x10, i) for i in range(5)]
+        self.device.echo = True
+        self.device.failing_reads.add(1)
+
+        # Test
+        actual = self.sut.send_packets(packets)
+
+        # Assert
+        self.assertIsNone(actual[1])
+        self.assertEqual([packets[0]] + packets[2:], [tuple(actual[n].data) for n in (0, 2, 3, 4)])
+        writes = [transfer[1] for transfer in self.device.transfers if transfer[0] == 'write']
+        self.assertEqual([bytes(packet) for packet in packets], writes)
+
+    def test_that_single_packet_burst_is_a_send(self):
+        # Fixture
+
+        # Test
+        actual = self.sut.send_packets([(0xff,)])
+
+        # Assert
+        self.assertEqual(1, len(actual))
+        self.assertEqual([('write', b'\xff'), ('read',)], self.device.transfers)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+#
+#     ||          ____  _ __
+#  +------+      / __ )(_) /_______________ _____  ___
+#  | 0xBC |     / __  / / __/ ___/ ___/ __ `/_  / / _ \
+#  +------+    / /_/ / / /_/ /__/ /  / /_/ / / /_/  __/
+#   ||  ||    /_____/_/\__/\___/_/   \__,_/ /___/\___/
+#
+#  Copyright (C) 2026 Bitcraze AB
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+import struct
+import time
+from threading import Condition
+
+from cflib.crtp.crtpstack import CRTPPacket
+
+CMD_LOAD_BUFFER = 0x14
+CMD_WRITE_FLASH = 0x18
+CMD_READ_FLASH = 0x1C
+
+
+class FakeBootloaderLink:
+    """
+    Stand in for a link to a Crazyflie bootloader. Buffer, flash write and
+    flash read commands are handled and answered after latency seconds, to
+    simulate the round trip time of the radio.
+    """
+
+    def __init__(self, target_id=0xFF, page_size=1024, buffer_pages=10, flash_pages=64, latency=0.0):
+        self.target_id = target_id
+        self.page_size = page_size
+        self.buffers = bytearray(page_size * buffer_pages)
+        self.flash = bytearray(page_size * flash_pages)
+        self.latency = latency
+
+        # Number of requests to not answer
+        self.drop_next = 0
+        self.sent = []
+        self.max_in_flight = 0
+        self._in_flight = 0
+        # (due time, packet)
+        self._replies = []
+        self._condition = Condition()
+
+    def send_packet(self, pk):
+        self.sent.append(pk)
+        target_id, cmd = struct.unpack('<BB', pk.data[0:2])
+        if target_id != self.target_id:
+            return True
+
+        reply = None
+        if cmd == CMD_LOAD_BUFFER:
+            page, addr = struct.unpack('<HH', pk.data[2:6])
+            start = page * self.page_size + addr
+            self.buffers[start:start + len(pk.data) - 6] = pk.data[6:]
+        elif cmd == CMD_WRITE_FLASH:
+            buffer_page, flash_page, count = struct.unpack('<HHH', pk.data[2:8])
+            length = count * self.page_size
+            source = buffer_page * self.page_size
+            self.flash[flash_page * self.page_size:flash_page * self.page_size + length] = \
+                self.buffers[source:source + length]
+            reply = struct.pack('<BBBB', target_id, cmd, 1, 0)
+        elif cmd == CMD_READ_FLASH:
+            page, addr = struct.unpack('<HH', pk.data[2:6])
+            start = page * self.page_size + addr
+            reply = bytes(pk.data[0:6]) + self.flash[start:start + 25]
+
+        if reply is not None:
+            with self._condition:
+                if self.drop_next > 0:
+                    self.drop_next -= 1
+                    return True
+                self._in_flight += 1
+                self.max_in_flight = max(self.max_in_flight, self._in_flight)
+                self._replies.append((time.time() + self.latency, CRTPPacket(0xFF, reply)))
+                self._condition.notify()
+        return True
+
+    def receive_packet(self, wait=0):
+        deadline = time.time() + wait
+        with self._condition:
+            while True:
+                now = time.time()
+                if len(self._replies) > 0 and self._replies[0][0] <= now:
+                    self._in_flight -= 1
+                    return self._replies.pop(0)[1]
+                if now >= deadline:
+                    return None
+                next_time = deadline
+                if len(self._replies) > 0:
+                    next_time = min(next_time, self._replies[0][0])
+                self._condition.wait(next_time - now)
+
+    def close(self):
+        pass
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+#
+#     ||          ____  _ __
+#  +------+      / __ )(_) /_______________ _____  ___
+#  | 0xBC |     / __  / / __/ ___/ ___/ __ `/_  / / _ \
+#  +------+    / /_/ / / /_/ /__/ /  / /_/ / / /_/  __/
+#   ||  ||    /_____/_/\__/\___/_/   \__,_/ /___/\___/
+#
+#  Copyright (C) 2026 Bitcraze AB
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+from threading import Event
+
+from cflib.drivers.crazyradio import _radio_ack
+
+
+class FakeCrazyradio:
+    """
+    Stand in for the Crazyradio driver. The configuration is cached like in
+    the real driver and every packet is acked with an empty payload. With
+    auto ack disabled nothing is acked and send_packet() gets no answer.
+    """
+
+    DR_250KPS = 0
+    DR_1MPS = 1
+    DR_2MPS = 2
+
+    def __init__(self, device=None, devid=0, serial=None):
+        self.devid = devid
+        self.version = 0.5
+        self.current_channel = 2
+        self.current_address = (0xe7,) * 5
+        self.current_datarate = self.DR_2MPS
+        self.arc = 3
+        self.ack_enabled = True
+
+        # Packets sent as (channel, address, datarate, data, ack enabled)
+        self.sent = []
+        # Number of packets of each send_packets() call
+        self.bursts = []
+        self.closed = False
+        # Cleared to make send_packet() block, waiting is set while blocked
+        self.release = Event()
+        self.release.set()
+        self.waiting = Event()
+
+    def close(self):
+        self.closed = True
+
+    def set_channel(self, channel):
+        self.current_channel = channel
+
+    def set_address(self, address):
+        self.current_address = address
+
+    def set_data_rate(self, datarate):
+        self.current_datarate = datarate
+
+    def set_arc(self, arc):
+        self.arc = arc
+
+    def set_ack_enable(self, enable):
+        self.ack_enabled = enable
+
+    def send_packet(self, dataOut):
+        if not self.release.is_set():
+            self.waiting.set()
+            self.release.wait()
+        self.sent.append((self.current_channel, self.current_address, self.current_datarate, bytes(dataOut),
+                          self.ack_enabled))
+        if not self.ack_enabled:
+            return None
+        ack = _radio_ack()
+        ack.ack = True
+        ack.data = ()
+        return ack
+
+    def send_packet_no_ack(self, dataOut):
+        self.sent.append((self.current_channel, self.current_address, self.current_datarate, bytes(dataOut),
+                          self.ack_enabled))
+
+    def send_packets(self, packets, addresses=None):
+        self.bursts.append(len(packets))
+        acks = []
+        for n, packet in enumerate(packets):
+            if addresses is not None and addresses[n] is not None:
+                self.set_address(addresses[n])
+            acks.append(self.send_packet(packet))
+        return acks
@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+#
+#     ||          ____  _ __
+#  +------+      / __ )(_) /_______________ _____  ___
+#  | 0xBC |     / __  / / __/ ___/ ___/ __ `/_  / / _ \
+#  +------+    / /_/ / / /_/ /__/ /  / /_/ / / /_/  __/
+#   ||  ||    /_____/_/\__/\___/_/   \__,_/ /___/\___/
+#
+#  Copyright (C) 2026 Bitcraze AB
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+import queue
+import struct
+
+from cflib.crtp.crtpstack import CRTPPacket
+from cflib.crtp.crtpstack import CRTPPort
+from cflib.utils.callbacks import Caller
+
+CHAN_INFO = 0
+CHAN_READ = 1
+CHAN_WRITE = 2
+
+CMD_INFO_NBR = 1
+CMD_INFO_DETAILS = 2
+
+
+class _FakeMemAnswers:
+    """
+    Answers memory read and write packets from an in-memory image. Memory
+    info requests are answered from details, a list of (type, size) of the
+    memories. A None entry gets an empty reply, like a broken 1-wire memory.
+    """
+
+    def __init__(self, images, details=()):
+        self.images = {mem_id: bytearray(image) for mem_id, image in images.items()}
+        self.details = list(details)
+
+    def _answer(self, pk):
+        if pk.channel == CHAN_INFO:
+            return self._answer_info(pk)
+
+        mem_id, addr = struct.unpack('<BI', pk.data[0:5])
+        image = self.images[mem_id]
+        reply = CRTPPacket()
+        if pk.channel == CHAN_READ:
+            length = pk.data[5]
+            reply.set_header(CRTPPort.MEM, CHAN_READ)
+            reply.data = struct.pack('<BIB', mem_id, addr, 0) + image[addr:addr + length]
+        else:
+            data = pk.data[5:]
+            image[addr:addr + len(data)] = data
+            reply.set_header(CRTPPort.MEM, CHAN_WRITE)
+            reply.data = struct.pack('<BIB', mem_id, addr, 0)
+        return reply
+
+    def _answer_info(self, pk):
+        reply = CRTPPacket()
+        reply.set_header(CRTPPort.MEM, CHAN_INFO)
+        if pk.data[0] == CMD_INFO_NBR:
+            reply.data = struct.pack('<BB', CMD_INFO_NBR, len(self.details))
+        else:
+            mem_id = pk.data[1]
+            reply.data = struct.pack('<BB', CMD_INFO_DETAILS, mem_id)
+            if mem_id < len(self.details) and self.details[mem_id] is None:
+                reply.data = struct.pack('<B', CMD_INFO_DETAILS)
+            elif mem_id < len(self.details):
+                mem_type, size = self.details[mem_id]
+                reply.data += struct.pack('<BI8s', mem_type, size, bytes(8))
+        return reply
+
+
+class FakeMemCrazyflie(_FakeMemAnswers):
+    """
+    Stand in for a Crazyflie that answers memory packets. Packets are queued
+    when sent and answered when process() is called, which makes it possible
+    to inspect what is in flight.
+    """
+
+    def __init__(self, images, details=()):
+        _FakeMemAnswers.__init__(self, images, details)
+        self.link_uri = 'radio://0/80/2M/E7E7E7E7E7'
+        self.disconnected = Caller()
+        self.sent = []
+        self.pending = []
+        self.drop_next = 0
+        self._port_cb = None
+
+    def add_port_callback(self, port, cb):
+        self._port_cb = cb
+
+    def send_packet(self, pk, expected_reply=(), resend=False, timeout=0.2):
+        self.sent.append(pk)
+        if self.drop_next > 0:
+            self.drop_next -= 1
+        else:
+            self.pending.append(pk)
+
+    def process(self, count=None):
+        """Answer count pending packets, or all (including new ones) if None"""
+        answered = 0
+        while len(self.pending) > 0 and (count is None or answered < count):
+            pk = self.pending.pop(0)
+            self._port_cb(self._answer(pk))
+            answered += 1
+
+
+class FakeMemLink(_FakeMemAnswers):
+    """
+    Stand in for a link to a Crazyflie that answers memory packets right
+    away. The next drop_next packets are lost, for the retransmission of the
+    Crazyflie class to send them again.
+    """
+
+    needs_resending = True
+
+    def __init__(self, images, details=()):
+        _FakeMemAnswers.__init__(self, images, details)
+        self.sent = []
+        self.drop_next = 0
+        self._replies = queue.Queue()
+
+    def send_packet(self, pk):
+        self.sent.append(pk)
+        if self.drop_next > 0:
+            self.drop_next -= 1
+        else:
+            self._replies.put(self._answer(pk))
+
+    def receive_packet(self, wait=0):
+        try:
+            return self._replies.get(True, wait) if wait > 0 else self._replies.get_nowait()
+        except queue.Empty:
+            return None
+
+    def close(self):
+        pass
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+#
+#     ||          ____  _ __
+#  +------+      / __ )(_) /_______________ _____  ___
+#  | 0xBC |     / __  / / __/ ___/ ___/ __ `/_  / / _ \
+#  +------+    / /_/ / / /_/ /__/ /  / /_/ / / /_/  __/
+#   ||  ||    /_____/_/\__/\___/_/   \__,_/ /___/\___/
+#
+#  Copyright (C) 2026 Bitcraze AB
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+from collections import deque
+from threading import Condition
+
+import usb
+
+from cflib.drivers.crazyradio import SET_RADIO_ADDRESS
+
+
+class _FakeContext:
+
+    def dispose(self, device):
+        device.disposed = True
+
+
+class FakeUsbDevice:
+    """
+    Stand in for the pyusb device of a Crazyradio. Every packet written is
+    acked with the ack_data payload, or the packet itself if echo is set.
+
+    The read of the ack of a packet waits, up to read_overlap_timeout, for
+    the write of the next packet of the burst. This shows if writes are
+    overlapped with reads.
+    """
+
+    def __init__(self, bcd_device=0x0500):
+        self.bcdDevice = bcd_device
+        self.disposed = False
+        self._ctx = _FakeContext()
+        self.ack_data = (0x01,)
+        self.echo = False
+        # Packets where the write fails
+        self.failing_writes = set()
+        # Reads that fail, counted from 0, the ack is lost
+        self.failing_reads = set()
+        self.read_overlap_timeout = 0.0
+        self.burst_size = 0
+
+        # ('write', data), ('read',) and ('address', address) in the order
+        # they were done
+        self.transfers = []
+        self._pending_acks = deque()
+        self._writes = 0
+        self._reads = 0
+        self._condition = Condition()
+
+    def set_configuration(self, configuration):
+        pass
+
+    def reset(self):
+        pass
+
+    def ctrl_transfer(self, request_type, request, wValue=0, wIndex=0, timeout=None, data_or_wLength=None):
+        if request == SET_RADIO_ADDRESS:
+            with self._condition:
+                self.transfers.append(('address', tuple(data_or_wLength)))
+        return ()
+
+    def write(self, endpoint, data, timeout):
+        with self._condition:
+            if bytes(data) in self.failing_writes:
+                raise usb.USBError('Write failed')
+            self.transfers.append(('write', bytes(data)))
+            self._writes += 1
+            self._pending_acks.append(bytes(data))
+            self._condition.notify_all()
+
+    def read(self, endpoint, length, timeout):
+        with self._condition:
+            if self.read_overlap_timeout:
+                next_write = min(self._reads + 2, self.burst_size)
+                self._condition.wait_for(lambda: self._writes >= next_write, self.read_overlap_timeout)
+            if not self._pending_acks:
+                raise usb.USBError('Timeout')
+            packet = self._pending_acks.popleft()
+            self._reads += 1
+            if self._reads - 1 in self.failing_reads:
+                raise usb.USBError('Read failed')
+            self.transfers.append(('read',))
+            return bytearray((0x01,) + tuple(packet if self.echo else self.ack_data))
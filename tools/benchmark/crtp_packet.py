@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# ,---------,       ____  _ __
+# |  ,-^-,  |      / __ )(_) /_______________ _____  ___
+# | (  O  ) |     / __  / / __/ ___/ ___/ __ `/_  / / _ \
+# | / ,--'  |    / /_/ / / /_/ /__/ /  / /_/ / / /_/  __/
+#    +------`   /_____/_/\__/\___/_/   \__,_/ /___/\___/
+#
+# Copyright (C) 2026 Bitcraze AB
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, in version 3.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+Micro-benchmark of creating, encoding and decoding CRTP packets, the way
+the library does it. The from_buffer()/to_bytes() cases are skipped on
+versions without them, to compare with older versions.
+
+Usage: crtp_packet.py [iterations]
+"""
+import struct
+import sys
+import timeit
+
+from cflib.crtp.crtpstack import CRTPPacket
+from cflib.crtp.crtpstack import CRTPPort
+
+FRAME = bytes([0x52] + list(range(28)))
+
+
+def create():
+    pk = CRTPPacket()
+    pk.port = CRTPPort.COMMANDER_GENERIC
+    pk.channel = 0
+    pk.data = struct.pack('<Bffff', 7, 1.0, 2.0, 3.0, 0.0)
+    return pk
+
+
+def encode(pk):
+    return bytes((pk.get_header(),)) + pk.data
+
+
+def decode():
+    pk = CRTPPacket(FRAME[0], list(FRAME[1:]))
+    return pk.port, pk.channel, struct.unpack('<Bfff', bytes(pk.datat[1:14]))
+
+
+def encode_to_bytes(pk):
+    return pk.to_bytes()
+
+
+def decode_from_buffer():
+    pk = CRTPPacket.from_buffer(FRAME)
+    return pk.port, pk.channel, struct.unpack_from('<Bfff', pk.view, 1)
+
+
+def decode_from_free_list():
+    pk = CRTPPacket.from_buffer(FRAME)
+    result = pk.port, pk.channel, struct.unpack_from('<Bfff', pk.view, 1)
+    CRTPPacket.release(pk)
+    return result
+
+
+def main(iterations):
+    pk = create()
+    benchmarks = [
+        ('create', create),
+        ('encode, header + data', lambda: encode(pk)),
+        ('decode, list and datat', decode),
+    ]
+    if hasattr(CRTPPacket, 'from_buffer'):
+        benchmarks += [
+            ('encode, to_bytes()', lambda: encode_to_bytes(pk)),
+            ('decode, from_buffer() and view', decode_from_buffer),
+            ('decode, with the free list', decode_from_free_list),
+        ]
+
+    for name, function in benchmarks:
+        seconds = min(timeit.repeat(function, number=iterations, repeat=5))
+        print('{:32} {:6.3f} us'.format(name, seconds / iterations * 1e6))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# ,---------,       ____  _ __
+# |  ,-^-,  |      / __ )(_) /_______________ _____  ___
+# | (  O  ) |     / __  / / __/ ___/ ___/ __ `/_  / / _ \
+# | / ,--'  |    / /_/ / / /_/ /__/ /  / /_/ / / /_/  __/
+#    +------`   /_____/_/\__/\___/_/   \__,_/ /___/\___/
+#
+# Copyright (C) 2026 Bitcraze AB
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, in version 3.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+Measures the packets per second the radio driver thread handles, with a
+fake radio that acks every packet at once with a log packet. The result is
+the cost of the Python packet path, without USB or radio.
+
+Usage: radio_driver_thread.py [seconds]
+"""
+import array
+import queue
+import sys
+import threading
+import time
+
+from cflib.crtp.crtpstack import CRTPPacket
+from cflib.crtp.crtpstack import CRTPPort
+from cflib.crtp import outqueue
+from cflib.crtp.outqueue import PriorityOutQueue
+from cflib.crtp.radiodriver import _RadioDriverThread
+from cflib.drivers.crazyradio import _radio_ack
+
+
+class FakeRadio:
+    version = 0.5
+
+    def __init__(self):
+        self.packets = 0
+        self.data_packets = 0
+        self._log = array.array('B', [0x01, 0x52] + list(range(28)))
+
+    def send_packet(self, data):
+        self.packets += 1
+        if len(data) > 1:
+            self.data_packets += 1
+        ack = _radio_ack()
+        ack.ack = True
+        if tuple(data) == (0xff, 0x05, 0x01):
+            # Enable safelink
+            ack.data = array.array('B', data)
+        else:
+            # The safelink bit of the downlink is expected to toggle
+            self._log[1] ^= 0x04
+            ack.data = self._log[1:]
+        return ack
+
+
+class FakeLink:
+    needs_resending = False
+
+
+def _produce(out_queue, stop):
+    pk = CRTPPacket()
+    pk.set_header(CRTPPort.PARAM, 2)
+    pk.data = bytes(range(10))
+    while not stop.is_set():
+        try:
+            out_queue.put(pk, True, 0.1)
+        except queue.Full:
+            pass
+
+
+def _consume(in_queue, stop):
+    while not stop.is_set():
+        try:
+            in_queue.get(True, 0.1)
+        except queue.Empty:
+            pass
+
+
+def main(duration):
+    radio = FakeRadio()
+    in_queue = queue.Queue()
+    # Deep enough for the producer to keep up
+    out_queue = PriorityOutQueue({outqueue.REQUEST: 1000})
+    stop = threading.Event()
+
+    thread = _RadioDriverThread(radio, in_queue, out_queue, None, None, FakeLink())
+    helpers = [threading.Thread(target=_produce, args=(out_queue, stop), daemon=True),
+               threading.Thread(target=_consume, args=(in_queue, stop), daemon=True)]
+    for helper in helpers:
+        helper.start()
+    thread.start()
+
+    time.sleep(0.5)
+    start_packets = radio.packets
+    start_data_packets = radio.data_packets
+    start = time.time()
+    time.sleep(duration)
+    packets = radio.packets - start_packets
+    data_packets = radio.data_packets - start_data_packets
+    elapsed = time.time() - start
+
+    thread.stop()
+    stop.set()
+
+    print('{:.0f} packets/s, {:.0f} with data ({} packets in {:.1f} s)'.format(
+        packets / elapsed, data_packets / elapsed, packets, elapsed))
+
+
+if __name__ == '__main__':
+    main(float(sys.argv[1]) if len(sys.argv) > 1 else 5.0)